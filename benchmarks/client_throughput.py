@@ -0,0 +1,64 @@
+"""
+Compare the throughput of the asynchronous client with that of the former \
+    thread-pool path, against a local stand-in for the Crossref API.
+
+Run from the root of the project:
+
+    python -m benchmarks.client_throughput --requests 200 --latency 0.1
+"""
+
+import asyncio
+import time
+
+import click
+from minet.executors import HTTPThreadPoolExecutor
+
+from src.api.client import AsyncClient
+from tests.stand_in_server import StandInServer
+
+
+def run_thread_pool(urls: list[str]) -> int:
+    ok = 0
+    with HTTPThreadPoolExecutor() as executor:
+        for result in executor.request(urls):
+            if result.response is not None and result.response.status == 200:
+                result.response.json()
+                ok += 1
+    return ok
+
+
+def run_async(urls: list[str], concurrency: int) -> int:
+    async def main() -> int:
+        ok = 0
+        async with AsyncClient(concurrency=concurrency) as client:
+            async for _ in client.request(urls):
+                ok += 1
+        return ok
+
+    return asyncio.run(main())
+
+
+@click.command()
+@click.option("--requests", "n", type=click.INT, default=200, show_default=True)
+@click.option("--latency", type=click.FLOAT, default=0.1, show_default=True)
+@click.option("--concurrency", type=click.INT, default=100, show_default=True)
+def main(n: int, latency: float, concurrency: int):
+    with StandInServer(latency=latency) as server:
+        urls = [f"{server.base_url}/works?sample=100"] * n
+        for name, run in [
+            ("thread pool", lambda: run_thread_pool(urls)),
+            ("async", lambda: run_async(urls, concurrency)),
+        ]:
+            server.connections = 0
+            start = time.perf_counter()
+            ok = run()
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>12}: {ok}/{n} requests in {elapsed:.2f}s "
+                f"({ok / elapsed:.1f} req/s, "
+                f"{server.connections} connections)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare the per-item and the batch parsing of works' dates, on synthetic \
+    pages of works. The per-item path parses each work's date-times with \
+    datetime.fromisoformat and subtracts them row by row, like \
+    CreativeWork.load_json. The batch path extracts a page's date-time \
+    strings, parses each column in Arrow's kernels and subtracts the \
+    columns at once, like CreativeWork.load_arrow. Both the dates alone and \
+    the whole loaders are timed.
+
+Run from the root of the project:
+
+    python -m benchmarks.date_parsing --items 200000
+"""
+
+import time
+
+import click
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.api.models.batch import CreativeWorkBatch
+from src.api.models.work import CreativeWork
+from tests.stand_in_server import make_item
+
+PAGE_ROWS = 1000
+
+
+def dates_per_item(page: list[dict]) -> list[int]:
+    delays = []
+    for item in page:
+        created = CreativeWork.parse_date(item["created"])
+        deposited = CreativeWork.parse_date(item["deposited"])
+        delays.append((deposited - created).days)
+    return delays
+
+
+def dates_in_batch(page: list[dict]) -> pa.Array:
+    created = CreativeWork.parse_date_column([i["created"]["date-time"] for i in page])
+    deposited = CreativeWork.parse_date_column(
+        [i["deposited"]["date-time"] for i in page]
+    )
+    seconds = pc.subtract(deposited, created).cast(pa.int64())
+    return pc.floor(pc.divide(seconds.cast(pa.float64()), 86400))
+
+
+def load_per_item(page: list[dict]) -> list[CreativeWork]:
+    return [CreativeWork.load_json(item=i, has_refs=False) for i in page]
+
+
+def load_in_batch(page: list[dict]) -> CreativeWorkBatch:
+    return CreativeWorkBatch.load_json(items=page, has_refs=False)
+
+
+def measure(run, pages: list[list[dict]]) -> float:
+    start = time.perf_counter()
+    for page in pages:
+        run(page)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--items", type=click.INT, default=200_000, show_default=True)
+def main(items: int):
+    pages = [
+        [make_item(i) for i in range(start, min(start + PAGE_ROWS, items))]
+        for start in range(0, items, PAGE_ROWS)
+    ]
+    runs = [
+        ("dates per item", dates_per_item),
+        ("dates in batch", dates_in_batch),
+        ("load_json", load_per_item),
+        ("load_arrow", load_in_batch),
+    ]
+    for name, run in runs:
+        elapsed = measure(run, pages)
+        print(f"{name:>15}: {items / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
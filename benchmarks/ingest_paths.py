@@ -0,0 +1,125 @@
+"""
+Compare the dataclass and the Arrow ingest paths on synthetic works, from \
+    parsed JSON items to the payload sent to ClickHouse. The rows are \
+    buffered like the buffered inserter does, and each full buffer is turned \
+    into its payload: the row lists that insert_records hands to \
+    clickhouse-connect, or the Arrow stream that insert_arrow sends. Each \
+    path runs in a fresh process, so that their peak memory is measured \
+    apart. Python allocations are traced with tracemalloc and Arrow's own \
+    allocations are read from its memory pool.
+
+With a --database, the buffers are also inserted into that ClickHouse \
+    database's works table.
+
+Run from the root of the project:
+
+    python -m benchmarks.ingest_paths --items 1000000
+"""
+
+import multiprocessing
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+import pyarrow as pa
+
+from src.api.models.work import CreativeWork
+from tests.stand_in_server import make_item
+
+PAGE_ROWS = 1000
+
+
+def pages(items: int):
+    for start in range(0, items, PAGE_ROWS):
+        stop = min(start + PAGE_ROWS, items)
+        yield [make_item(i) for i in range(start, stop)]
+
+
+def run_dataclasses(items: int, buffer: int, database: str | None) -> dict:
+    db = None
+    if database:
+        from src.api.database import ClickHouseDB
+
+        db = ClickHouseDB(database_name=database)
+        db.create_table(CreativeWork)
+
+    def flush(records):
+        if db:
+            db.insert_records(records=records)
+        else:
+            list(map(CreativeWork.schema.values, records))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = []
+    for page in pages(items):
+        records.extend(CreativeWork.load_json(item=i, has_refs=False) for i in page)
+        if len(records) >= buffer:
+            flush(records)
+            records = []
+    if records:
+        flush(records)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"elapsed": elapsed, "python": peak, "arrow": 0}
+
+
+def run_arrow(items: int, buffer: int, database: str | None) -> dict:
+    db = None
+    if database:
+        from src.api.database import ClickHouseDB
+
+        db = ClickHouseDB(database_name=database)
+        db.create_table(CreativeWork)
+
+    def flush(batches):
+        table = pa.Table.from_batches(batches)
+        if db:
+            db.insert_arrow(table=CreativeWork, batch=table)
+        else:
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            sink.getvalue()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    batches, rows = [], 0
+    for page in pages(items):
+        batches.append(CreativeWork.load_arrow(items=page, has_refs=False))
+        rows += batches[-1].num_rows
+        if rows >= buffer:
+            flush(batches)
+            batches, rows = [], 0
+    if batches:
+        flush(batches)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "elapsed": elapsed,
+        "python": peak,
+        "arrow": pa.default_memory_pool().max_memory(),
+    }
+
+
+@click.command()
+@click.option("--items", type=click.INT, default=1_000_000, show_default=True)
+@click.option("--buffer", type=click.INT, default=100_000, show_default=True)
+@click.option("--database", type=click.STRING)
+def main(items: int, buffer: int, database: str | None):
+    context = multiprocessing.get_context("spawn")
+    for name, run in [("dataclasses", run_dataclasses), ("arrow", run_arrow)]:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run, items, buffer, database).result()
+        print(
+            f"{name:>12}: {items / result['elapsed']:,.0f} rows/s, "
+            f"peak {result['python'] / 1024**2:,.1f} MiB Python + "
+            f"{result['arrow'] / 1024**2:,.1f} MiB Arrow"
+        )
+
+
+if __name__ == "__main__":
+    main()
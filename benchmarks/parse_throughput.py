@@ -0,0 +1,65 @@
+"""
+Measure how the parse stage's throughput scales with the number of worker \
+    processes, on synthetic responses of 100 works each.
+
+Run from the root of the project:
+
+    python -m benchmarks.parse_throughput --responses 2000
+"""
+
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import click
+
+from src.api.parse import parse_works
+from tests.stand_in_server import make_item
+
+
+def make_bodies(n: int) -> list[bytes]:
+    return [
+        json.dumps(
+            {"message": {"items": [make_item(i * 100 + j) for j in range(100)]}}
+        ).encode()
+        for i in range(n)
+    ]
+
+
+@click.command()
+@click.option("--responses", type=click.INT, default=2000, show_default=True)
+@click.option(
+    "--workers",
+    type=click.STRING,
+    default="1,2,4,8",
+    show_default=True,
+)
+def main(responses: int, workers: str):
+    bodies = make_bodies(responses)
+    rows = responses * 100
+    parse = partial(parse_works, has_refs=False)
+
+    start = time.perf_counter()
+    for body in bodies:
+        parse(body)
+    elapsed = time.perf_counter() - start
+    print(f"{'inline':>10}: {rows / elapsed:,.0f} rows/s")
+
+    for n in [int(w) for w in workers.split(",")]:
+        with ProcessPoolExecutor(
+            max_workers=n,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            # Warm the workers up before timing them
+            list(pool.map(parse, bodies[:n]))
+            start = time.perf_counter()
+            for _ in pool.map(parse, bodies, chunksize=4):
+                pass
+            elapsed = time.perf_counter() - start
+        print(f"{f'{n} workers':>10}: {rows / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,12 @@ from rich.progress import (
 )
 
 from src.analysis.constants import WORKS_TABLE, MEMBERS_TABLE
-from src.analysis.utils import select_parquet_columns
+from src.analysis.utils import (
+    choose_model,
+    create_enum_statements,
+    read_parquet_source,
+    select_parquet_columns,
+)
 
 
 def load_parquet_table(
@@ -28,8 +33,12 @@ def load_parquet_table(
         _ = p.add_task("Creating table")
         conn.execute(f"DROP TABLE IF EXISTS {table_name}")
         selection = select_parquet_columns(table_name=table_name)
+        source = read_parquet_source(infile=infile, table_name=table_name)
+        model = choose_model(table_name=table_name)
+        for stmt in create_enum_statements(model=model, source=source):
+            conn.execute(stmt)
         create_stmt = f"""
-CREATE TABLE {table_name} AS SELECT {selection} FROM read_parquet('{infile}')
+CREATE TABLE {table_name} AS SELECT {selection} FROM {source}
 """
         conn.execute(create_stmt)
         console.rule(f"Table '{table_name}'")
@@ -41,11 +50,11 @@ CREATE TABLE {table_name} AS SELECT {selection} FROM read_parquet('{infile}')
 @click.command()
 @click.option(
     "--members",
-    type=click.Path(exists=True, file_okay=True, dir_okay=False),
+    type=click.Path(exists=True, file_okay=True, dir_okay=True),
 )
 @click.option(
     "--works",
-    type=click.Path(exists=True, file_okay=True, dir_okay=False),
+    type=click.Path(exists=True, file_okay=True, dir_okay=True),
     required=True,
 )
 @click.option("--database", required=True)
@@ -1,4 +1,7 @@
+from pathlib import Path
+
 from src.analysis.constants import MEMBERS_TABLE, WORKS_TABLE
+from src.api.manifest import MANIFEST_NAME, ExportManifest, select_latest_rows
 from src.api.models.base import BaseModel
 from src.api.models.member import CrossrefMember
 from src.api.models.work import CreativeWork
@@ -15,31 +18,127 @@ def list_date_cols(model: BaseModel) -> list[str]:
         list[str]: Names of columns for date data.
     """
 
-    return [
-        c
-        for c, t in zip(
-            model.__annotations__.keys(),
-            model.list_column_type_names(),
-        )
-        if t == "DateTime"
-    ]
+    return list(model.schema.date_columns)
+
+
+def enum_type_name(model: BaseModel, column: str) -> str:
+    return f"{model.name_table()}_{column}"
+
+
+def create_enum_statements(model: BaseModel, source: str) -> list[str]:
+    """
+    Compose the statements creating an ENUM type for each of the model's \
+        low-cardinality columns, whose values are the distinct values of \
+        the column in the parquet source, in sorted order. A column of that \
+        type stores each value as a small integer code.
+
+    Args:
+        model (BaseModel): Data model for the table.
+        source (str): DuckDB function reading the parquet backup.
+
+    Returns:
+        list[str]: SQL statements, to run after dropping the table that \
+            uses the types.
+    """
+
+    statements = []
+    for k in model.schema.low_cardinality:
+        name = enum_type_name(model=model, column=k)
+        statements.append(f"DROP TYPE IF EXISTS {name}")
+        statements.append(f"""
+CREATE TYPE {name} AS ENUM (
+    SELECT DISTINCT {k} FROM {source} WHERE {k} IS NOT NULL ORDER BY {k}
+)
+""")
+    return statements
 
 
 def recast_columns(model: BaseModel) -> str:
     cols = []
-    date_cols = list_date_cols(model=model)
-    for k in model.__annotations__.keys():
-        if k in date_cols:
+    for k in model.schema.columns:
+        if k in model.schema.date_columns:
             cols.append(f"""strptime({k}, '%Y-%m-%d') AS {k}""")
+        elif k in model.schema.low_cardinality:
+            name = enum_type_name(model=model, column=k)
+            cols.append(f"CAST({k} AS {name}) AS {k}")
         else:
             cols.append(k)
     return ", ".join(cols)
 
 
+def choose_model(table_name: str) -> BaseModel:
+    if table_name == WORKS_TABLE:
+        return CreativeWork
+    elif table_name == MEMBERS_TABLE:
+        return CrossrefMember
+    else:
+        raise ValueError("Invalid table name")
+
+
+def list_hive_types(directory: Path, model: BaseModel) -> dict[str, str]:
+    """
+    From the directory names of a hive-style dataset, list its partition \
+        keys and their DuckDB types. A key named after one of the model's \
+        columns has that column's type, while a key for the year of a date \
+        column, such as "deposited_year", is an integer.
+
+    Args:
+        directory (Path): Directory of the dataset.
+        model (BaseModel): Data model for the table.
+
+    Returns:
+        dict[str, str]: DuckDB type of each partition key.
+    """
+
+    fp = next(directory.rglob("*.parquet"), None)
+    if fp is None:
+        return {}
+    hive_types = {}
+    for part in fp.relative_to(directory).parent.parts:
+        key = part.split("=", 1)[0]
+        if key in model.schema.columns:
+            hive_types[key] = model.schema.duckdb_type(key)
+        else:
+            hive_types[key] = "BIGINT"
+    return hive_types
+
+
+def read_parquet_source(infile: str, table_name: str) -> str:
+    """
+    Compose the DuckDB function reading a parquet backup, which is either a \
+        single file, a hive-style directory of partitioned files or the \
+        directory of an incremental export. The parts of an incremental \
+        export are read in the order listed by its manifest, keeping only \
+        the latest exported version of each row, as compacting them would.
+
+    Args:
+        infile (str): Path to the parquet file or dataset directory.
+        table_name (str): Name of a table to be created in the DuckDB database.
+
+    Returns:
+        str: Call of DuckDB's read_parquet function, or a subquery reading \
+            an incremental export.
+    """
+
+    path = Path(infile)
+    if not path.is_dir():
+        return f"read_parquet('{infile}')"
+    model = choose_model(table_name=table_name)
+    if path.joinpath(MANIFEST_NAME).is_file():
+        manifest = ExportManifest(directory=path, table=model.name_table())
+        parts = [str(fp) for fp in manifest.list_part_paths()]
+        key = model.order_by if model.deduplicates() else None
+        return f"({select_latest_rows(parts=parts, key=key)})"
+    hive_types = list_hive_types(directory=path, model=model)
+    types = ", ".join(f"'{k}': {t}" for k, t in hive_types.items())
+    return f"""read_parquet('{path.joinpath("**", "*.parquet")}', \
+hive_partitioning = true, hive_types = {{{types}}})"""
+
+
 def select_parquet_columns(table_name: str) -> str:
     """
-    Select and, when a date, recast the columns of the parquet file for \
-        inserting into a DuckDB database table.
+    Select and, when a date or a low-cardinality column, recast the columns \
+        of the parquet file for inserting into a DuckDB database table.
 
     Args:
         table_name (str): Name of a table to be created in the DuckDB database.
@@ -48,9 +147,4 @@ def select_parquet_columns(table_name: str) -> str:
         str: Column portion of the query for selecting the parquet data.
     """
 
-    if table_name == WORKS_TABLE:
-        return recast_columns(model=CreativeWork)
-    elif table_name == MEMBERS_TABLE:
-        return recast_columns(model=CrossrefMember)
-    else:
-        raise ValueError("Invalid table name")
+    return recast_columns(model=choose_model(table_name=table_name))
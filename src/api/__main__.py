@@ -1,31 +1,112 @@
 import click
 
-from src.api.cli.export_table import TABLE_CHOICES, export_table
+from src.api.cache import CACHE_DIR
+from src.api.cli.compact_export import compact_export
+from src.api.cli.export_table import (
+    EXPORT_WORKERS,
+    MAX_BUFFER_BYTES,
+    ROW_GROUP_SIZE,
+    TABLE_CHOICES,
+    choose_table,
+    export_table,
+    parse_partition_key,
+)
+from src.api.cli.harvest_works import harvest_works
 from src.api.cli.insert_members import insert_members
 from src.api.cli.insert_works import insert_works
-from src.api.constants import CLICKHOUSE_DATABASE
-from src.api.database import ClickHouseDB
+from src.api.cli.migrate_tables import migrate_tables
+from src.api.cli.replay_quarantine import replay_quarantine
+from src.api.cli.summarize_works import summarize_works
+from src.api.client import CURSOR_ROWS, DEFAULT_RETRIES
+from src.api.constants import (
+    CLICKHOUSE_ASYNC_INSERT,
+    CLICKHOUSE_COMPRESSION,
+    CLICKHOUSE_DATABASE,
+    CLICKHOUSE_SEND_RECEIVE_TIMEOUT,
+)
+from src.api.database import (
+    COMPRESSION_CHOICES,
+    ClickHouseDB,
+    configure_connections,
+)
 from src.api.models.member import CrossrefMember
 from src.api.models.work import CreativeWork
+from src.api.quarantine import QUARANTINE_DIR
 
 
 @click.group()
-def cli():
-    pass
+@click.option(
+    "--compression",
+    type=click.Choice(COMPRESSION_CHOICES),
+    default=CLICKHOUSE_COMPRESSION,
+    show_default=True,
+    help="Compression of the data exchanged with ClickHouse. Also set by \
+the CLICKHOUSE_COMPRESSION environment variable.",
+)
+@click.option(
+    "--send-receive-timeout",
+    type=click.IntRange(min=1),
+    default=CLICKHOUSE_SEND_RECEIVE_TIMEOUT,
+    show_default=True,
+    help="Seconds before a ClickHouse request times out. Also set by the \
+CLICKHOUSE_SEND_RECEIVE_TIMEOUT environment variable.",
+)
+@click.option(
+    "--async-insert/--no-async-insert",
+    default=CLICKHOUSE_ASYNC_INSERT,
+    show_default=True,
+    help="Let ClickHouse buffer small inserts and write them together. Also \
+set by CLICKHOUSE_ASYNC_INSERT=1.",
+)
+def cli(compression, send_receive_timeout, async_insert):
+    configure_connections(
+        compression=compression,
+        send_receive_timeout=send_receive_timeout,
+        async_insert=async_insert,
+    )
 
 
 @cli.command("drop-works")
-def drop_works():
-    db = ClickHouseDB()
+@click.option(
+    "--database",
+    type=click.STRING,
+    default=CLICKHOUSE_DATABASE,
+    show_default=True,
+)
+def drop_works(database):
+    db = ClickHouseDB(database_name=database)
     db.recreate_table(table=CreativeWork)
 
 
 @cli.command("drop-members")
-def drop_members():
-    db = ClickHouseDB()
+@click.option(
+    "--database",
+    type=click.STRING,
+    default=CLICKHOUSE_DATABASE,
+    show_default=True,
+)
+def drop_members(database):
+    db = ClickHouseDB(database_name=database)
     db.recreate_table(table=CrossrefMember)
 
 
+@cli.command("migrate")
+@click.option(
+    "--database",
+    type=click.STRING,
+    default=CLICKHOUSE_DATABASE,
+    show_default=True,
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Print the statements of the migrations without applying them.",
+)
+def migrate(database, dry_run):
+    migrate_tables(database_name=database, dry_run=dry_run)
+
+
 @cli.command("insert-members")
 @click.option(
     "--database",
@@ -33,13 +114,50 @@ def drop_members():
     default=CLICKHOUSE_DATABASE,
     show_default=True,
 )
-def members(database):
-    insert_members(database_name=database)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, dir_okay=True),
+    default=CACHE_DIR,
+    show_default=True,
+    help="Directory of the on-disk cache of member responses.",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=DEFAULT_RETRIES,
+    show_default=True,
+    help="Number of times a failed request is retried.",
+)
+@click.option(
+    "--resume",
+    type=click.STRING,
+    help="ID of an interrupted run to resume.",
+)
+@click.option(
+    "--bulk",
+    is_flag=True,
+    default=False,
+    help="Page through the list of all members instead of requesting \
+each member.",
+)
+def members(database, cache_dir, retries, resume, bulk):
+    insert_members(
+        database_name=database,
+        cache_dir=cache_dir,
+        retries=retries,
+        resume=resume,
+        bulk=bulk,
+    )
 
 
 @cli.command("insert-samples")
 @click.option("--mailto", type=click.STRING)
-@click.option("--samples", type=click.INT, required=True)
+@click.option(
+    "--samples",
+    type=click.INT,
+    help="Number of samples, of 100 works each, to deliver. The samples of \
+failed requests are requested again for as long as the API answers some.",
+)
 @click.option("--has-references", is_flag=True, default=False)
 @click.option(
     "--database",
@@ -47,12 +165,88 @@ def members(database):
     default=CLICKHOUSE_DATABASE,
     show_default=True,
 )
-def works(mailto, samples, has_references, database):
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=DEFAULT_RETRIES,
+    show_default=True,
+    help="Number of times a failed request is retried.",
+)
+@click.option(
+    "--resume",
+    type=click.STRING,
+    help="ID of an interrupted run to resume, with its parameters.",
+)
+@click.option(
+    "--unique-target",
+    type=click.IntRange(min=1),
+    help="Drop duplicate works and stop once this many distinct works are \
+stored, or once samples stop bringing new works.",
+)
+@click.option(
+    "--parse-workers",
+    type=click.IntRange(min=1),
+    help="Parse the responses in a pool of this many processes.",
+)
+def works(
+    mailto,
+    samples,
+    has_references,
+    database,
+    retries,
+    resume,
+    parse_workers,
+    unique_target,
+):
+    if samples is None and unique_target is None and resume is None:
+        raise click.UsageError("Missing option '--samples'.")
     insert_works(
         mailto=mailto,
         samples=samples,
         has_references=has_references,
         database=database,
+        retries=retries,
+        resume=resume,
+        parse_workers=parse_workers,
+        unique_target=unique_target,
+    )
+
+
+@cli.command("harvest")
+@click.option("--mailto", type=click.STRING)
+@click.option("--has-references", is_flag=True, default=False)
+@click.option(
+    "--limit",
+    type=click.INT,
+    help="Stop after harvesting this many works.",
+)
+@click.option(
+    "--rows",
+    type=click.IntRange(1, CURSOR_ROWS),
+    default=CURSOR_ROWS,
+    show_default=True,
+)
+@click.option(
+    "--database",
+    type=click.STRING,
+    default=CLICKHOUSE_DATABASE,
+    show_default=True,
+)
+@click.option(
+    "--arrow",
+    is_flag=True,
+    default=False,
+    help="Parse pages column by column, in Arrow's kernels, rather than \
+work by work.",
+)
+def harvest(mailto, has_references, limit, rows, database, arrow):
+    harvest_works(
+        mailto=mailto,
+        has_references=has_references,
+        limit=limit,
+        rows=rows,
+        database=database,
+        arrow=arrow,
     )
 
 
@@ -60,8 +254,9 @@ def works(mailto, samples, has_references, database):
 @click.option("--table", required=True, type=click.Choice(TABLE_CHOICES))
 @click.option(
     "--outfile",
-    type=click.Path(file_okay=True, dir_okay=False),
+    type=click.Path(file_okay=True, dir_okay=True),
     required=True,
+    help="Parquet file, or directory of a partitioned dataset.",
 )
 @click.option(
     "--database",
@@ -69,8 +264,117 @@ def works(mailto, samples, has_references, database):
     default=CLICKHOUSE_DATABASE,
     show_default=True,
 )
-def export(table: str, outfile: str, database: str):
-    export_table(table_choice=table, outfile=outfile, database=database)
+@click.option(
+    "--row-group-size",
+    type=click.IntRange(min=1),
+    default=ROW_GROUP_SIZE,
+    show_default=True,
+    help="Rows per row group of the parquet file.",
+)
+@click.option(
+    "--max-memory",
+    type=click.IntRange(min=1),
+    default=MAX_BUFFER_BYTES // 1024**2,
+    show_default=True,
+    help="Megabytes of rows held in memory before they are written.",
+)
+@click.option(
+    "--partition-by",
+    multiple=True,
+    help="Write a hive-style dataset partitioned by a column, such as \
+'has_refs', or by the year of a date column, such as 'year(deposited)'. \
+Can be repeated.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=EXPORT_WORKERS,
+    show_default=True,
+    help="Number of partitions written at the same time, when the dataset is \
+partitioned like the table, i.e. by the year of 'created' for the works.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="Append only the rows inserted since the last incremental export, \
+as a new part in the outfile's directory. The parts can hold several versions \
+of a row, of which crossref-duck loads only the latest.",
+)
+def export(
+    table: str,
+    outfile: str,
+    database: str,
+    row_group_size: int,
+    max_memory: int,
+    partition_by: tuple[str],
+    workers: int,
+    incremental: bool,
+):
+    if incremental and partition_by:
+        raise click.UsageError("--incremental cannot be combined with --partition-by.")
+    for spec in partition_by:
+        try:
+            parse_partition_key(spec=spec, table=choose_table(table))
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--partition-by")
+    export_table(
+        table_choice=table,
+        outfile=outfile,
+        database=database,
+        row_group_size=row_group_size,
+        max_buffer_bytes=max_memory * 1024**2,
+        partition_by=partition_by,
+        workers=workers,
+        incremental=incremental,
+    )
+
+
+@cli.command("compact-parquet")
+@click.option("--table", required=True, type=click.Choice(TABLE_CHOICES))
+@click.option(
+    "--directory",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    required=True,
+    help="Directory of an incremental export.",
+)
+def compact(table: str, directory: str):
+    compact_export(table_choice=table, directory=directory)
+
+
+@cli.command("summary")
+@click.option(
+    "--database",
+    type=click.STRING,
+    default=CLICKHOUSE_DATABASE,
+    show_default=True,
+)
+def summary(database: str):
+    """Print the works' breakdowns kept up to date by ClickHouse."""
+    summarize_works(database_name=database)
+
+
+@cli.group("quarantine")
+def quarantine():
+    """Items and rows that could not be modelled or inserted."""
+
+
+@quarantine.command("replay")
+@click.option(
+    "--database",
+    type=click.STRING,
+    default=CLICKHOUSE_DATABASE,
+    show_default=True,
+)
+@click.option(
+    "--directory",
+    type=click.Path(file_okay=False, dir_okay=True),
+    default=QUARANTINE_DIR,
+    show_default=True,
+    help="Directory of the quarantine.",
+)
+def replay(database: str, directory: str):
+    replay_quarantine(database_name=database, directory=directory)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from src.api.cli.logs import LOG_DIR
+
+CACHE_DIR = LOG_DIR.joinpath("cache")
+
+# Member metadata changes slowly, so cached responses are kept for weeks
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 1024**3
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of API responses. Each response is stored in a \
+        file named after the hash of its URL, with a one-line JSON header \
+        holding the URL and the entry's expiry. When the cache outgrows its \
+        size cap, the least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str = CACHE_DIR,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """
+        Index the entries already stored in the cache's directory.
+
+        Args:
+            directory (Path | str, optional): Directory of the cache. \
+                Defaults to CACHE_DIR.
+            ttl (float, optional): Seconds before an entry expires. Defaults \
+                to DEFAULT_TTL.
+            max_bytes (int, optional): Size cap of the cache. Defaults to \
+                DEFAULT_MAX_BYTES.
+        """
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        # Entries ordered from least to most recently used
+        entries = []
+        for fp in self.directory.glob("*/*"):
+            if fp.suffix == ".tmp":
+                continue
+            stat = fp.stat()
+            entries.append((stat.st_mtime, fp.name, stat.st_size))
+        self.index: OrderedDict[str, int] = OrderedDict(
+            (key, size) for _, key, size in sorted(entries)
+        )
+        self.size = sum(self.index.values())
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory.joinpath(key[:2], key)
+
+    def get(self, url: str) -> bytes | None:
+        """
+        Return the cached response for a URL, unless it is missing or expired.
+
+        Args:
+            url (str): URL of the API request.
+
+        Returns:
+            bytes | None: Body of the cached response.
+        """
+
+        key = self.key(url)
+        if key in self.index:
+            fp = self.path(key)
+            try:
+                with open(fp, "rb") as f:
+                    header = json.loads(f.readline())
+                    body = f.read()
+            except (OSError, ValueError):
+                header = None
+            if header and header["url"] == url:
+                if header["expires"] > time.time():
+                    # Mark the entry as the most recently used
+                    os.utime(fp)
+                    self.index.move_to_end(key)
+                    self.hits += 1
+                    return body
+            self.evict(key)
+        self.misses += 1
+        return None
+
+    def put(self, url: str, body: bytes, ttl: float | None = None) -> None:
+        """
+        Store a response, then evict the least recently used entries until \
+            the cache fits under its size cap.
+
+        Args:
+            url (str): URL of the API request.
+            body (bytes): Body of the API response.
+            ttl (float | None, optional): Seconds before the entry expires. \
+                Defaults to the cache's TTL.
+        """
+
+        key = self.key(url)
+        fp = self.path(key)
+        fp.parent.mkdir(exist_ok=True)
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        header = json.dumps({"url": url, "expires": expires}).encode()
+        tmp = fp.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(header + b"\n" + body)
+        os.replace(tmp, fp)
+
+        self.size -= self.index.pop(key, 0)
+        self.index[key] = fp.stat().st_size
+        self.size += self.index[key]
+        while self.size > self.max_bytes and len(self.index) > 1:
+            self.evict(next(iter(self.index)))
+
+    def evict(self, key: str) -> None:
+        """Delete an entry from the cache."""
+
+        self.size -= self.index.pop(key, 0)
+        self.path(key).unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        """Report the cache's hit and miss counters and its size."""
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.index),
+            "bytes": self.size,
+        }
@@ -0,0 +1,163 @@
+import json
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from src.api.cli.logs import LOG_DIR
+
+RUNS_DIR = LOG_DIR.joinpath("runs")
+
+
+class UnknownRunException(Exception):
+    """There is no journal of this command's run to resume. Make sure to \
+        copy the run ID printed when the run started."""
+
+
+class CheckpointJournal:
+    """
+    Append-only journal of a collection run. The journal is a JSON-lines \
+        file in which the run records its parameters, the items it plans to \
+        collect and every batch it has inserted, so that a run that dies \
+        can resume from its last inserted batch. A plan that is recorded in \
+        parts is closed by a marker, so that a run that died while planning \
+        knows that its plan is incomplete. Entries can be appended from \
+        several threads.
+    """
+
+    def __init__(self, run_id: str, directory: Path | str = RUNS_DIR) -> None:
+        """
+        Replay the journal of a run, if it already exists.
+
+        Args:
+            run_id (str): ID of the run.
+            directory (Path | str, optional): Directory of the journals. \
+                Defaults to RUNS_DIR.
+        """
+
+        self.run_id = run_id
+        self.path = Path(directory).joinpath(f"{run_id}.jsonl")
+        self.command: str | None = None
+        self.params: dict = {}
+        self.planned: list[str] = []
+        self.plan_complete = False
+        self.completed: set[str] = set()
+        self.batches = 0
+        self.rows = 0
+        self.finished = False
+        self._lock = threading.Lock()
+        if self.path.is_file():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # The run died while writing its last entry
+                        continue
+                    self.replay(entry)
+
+    @classmethod
+    def start(
+        cls,
+        command: str,
+        params: dict,
+        directory: Path | str = RUNS_DIR,
+    ) -> "CheckpointJournal":
+        """
+        Start the journal of a new run.
+
+        Args:
+            command (str): Name of the CLI command.
+            params (dict): Parameters needed to resume the run.
+            directory (Path | str, optional): Directory of the journals. \
+                Defaults to RUNS_DIR.
+
+        Returns:
+            CheckpointJournal: The new run's journal.
+        """
+
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        run_id = f"{stamp}-{uuid.uuid4().hex[:6]}"
+        journal = cls(run_id=run_id, directory=directory)
+        journal.append({"event": "start", "command": command, "params": params})
+        return journal
+
+    @classmethod
+    def resume(
+        cls,
+        run_id: str,
+        command: str,
+        directory: Path | str = RUNS_DIR,
+    ) -> "CheckpointJournal":
+        """
+        Reopen the journal of an earlier run of a command.
+
+        Args:
+            run_id (str): ID of the run.
+            command (str): Name of the CLI command.
+            directory (Path | str, optional): Directory of the journals. \
+                Defaults to RUNS_DIR.
+
+        Raises:
+            UnknownRunException: No run of the command has this ID.
+
+        Returns:
+            CheckpointJournal: The run's journal.
+        """
+
+        journal = cls(run_id=run_id, directory=directory)
+        if journal.command != command:
+            raise UnknownRunException(run_id)
+        journal.append({"event": "resume"})
+        return journal
+
+    def replay(self, entry: dict) -> None:
+        event = entry["event"]
+        if event == "start":
+            self.command = entry["command"]
+            self.params = entry["params"]
+        elif event == "plan":
+            self.planned.extend(entry["keys"])
+        elif event == "planned":
+            self.plan_complete = True
+        elif event == "batch":
+            self.batches += 1
+            self.rows += entry["rows"]
+            self.completed.update(entry["keys"])
+        elif event == "finish":
+            self.finished = True
+
+    def append(self, entry: dict) -> None:
+        """Write an entry at the end of the journal and apply it."""
+
+        entry = {**entry, "time": str(datetime.now())}
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+            self.replay(entry)
+
+    def record_plan(self, keys: Iterable[str]) -> None:
+        """Record the keys of the items that the run plans to collect."""
+
+        self.append({"event": "plan", "keys": list(keys)})
+
+    def complete_plan(self) -> None:
+        """Mark the plan as complete, once all its keys are recorded."""
+
+        self.append({"event": "planned"})
+
+    def record_batch(self, rows: int, keys: Iterable[str] = ()) -> None:
+        """Record an inserted batch, with the keys of its collected items."""
+
+        self.append({"event": "batch", "rows": rows, "keys": list(keys)})
+
+    def finish(self) -> None:
+        self.append({"event": "finish"})
+
+    def remaining(self) -> list[str]:
+        """List the planned keys whose items have not been inserted yet."""
+
+        return [k for k in self.planned if k not in self.completed]
@@ -0,0 +1,60 @@
+import duckdb
+from rich.console import Console
+
+from src.api.cli.export_table import choose_table
+from src.api.manifest import ExportManifest, select_latest_rows
+from src.api.models.base import BaseModel
+
+
+def build_compaction_query(
+    table: BaseModel,
+    parts: list[str],
+    outfile: str,
+) -> str:
+    """
+    Compose the DuckDB statement that merges the parts of an incremental \
+        export into one parquet file. For a table whose rows are replaced, \
+        only the latest exported version of each row is kept, which is the \
+        one in the part written last.
+
+    Args:
+        table (BaseModel): Dataclass storing metadata about a table.
+        parts (list[str]): Paths of the parts, in the order they were written.
+        outfile (str): Path of the merged parquet file.
+
+    Returns:
+        str: SQL statement.
+    """
+
+    key = table.order_by if table.deduplicates() else None
+    selection = select_latest_rows(parts=parts, key=key)
+    return f"COPY ({selection}) TO '{outfile}' (FORMAT parquet)"
+
+
+def compact_export(table_choice: str, directory: str):
+    console = Console()
+    table = choose_table(table_choice=table_choice)
+    manifest = ExportManifest(directory=directory, table=table.name_table())
+    parts = manifest.list_part_paths()
+    if len(parts) < 2:
+        console.print(f"Nothing to compact: {len(parts)} part(s)")
+        return
+
+    # Merge the parts into a new part, then point the manifest at it before
+    # deleting the merged parts
+    fp = manifest.next_part()
+    conn = duckdb.connect()
+    conn.execute(
+        build_compaction_query(
+            table=table,
+            parts=[str(p) for p in parts],
+            outfile=str(fp),
+        )
+    )
+    rows = conn.execute(f"SELECT count(*) FROM '{fp}'").fetchone()[0]
+    conn.close()
+    replaced = manifest.replace_parts(fp=fp, rows=rows)
+    manifest.save()
+    for old in replaced:
+        old.unlink(missing_ok=True)
+    console.print(f"Compacted {len(parts)} parts into {fp.name}: {rows} rows")
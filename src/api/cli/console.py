@@ -7,9 +7,15 @@ from src.api.models.work import CreativeWork
 class ConsoleLog:
     """Cosmetic helper for remembering the ongoing collection's parameters."""
 
-    def __init__(self, db: ClickHouseDB, refs: bool) -> None:
+    def __init__(
+        self,
+        db: ClickHouseDB,
+        refs: bool,
+        run_id: str | None = None,
+    ) -> None:
         self.db = db.database_name
         self.refs = refs
+        self.run_id = run_id
         self.table = CreativeWork.name_table()
         self.console = Console()
         self.console.clear()
@@ -18,6 +24,8 @@ class ConsoleLog:
         self.console.print(f"\tConnected to database '{self.db}'")
         self.console.print(f"\tInserting values into table '{self.table}'")
         self.console.print(f"\tHas references: {self.refs}")
+        if self.run_id:
+            self.console.print(f"\tRun ID: {self.run_id}")
 
     def refresh(self) -> None:
         self.console.clear()
@@ -1,10 +1,26 @@
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
+from urllib.parse import quote
 
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    TextColumn,
+    TimeElapsedColumn,
+)
 
 from src.api.database import ClickHouseDB
+from src.api.manifest import ExportManifest
+from src.api.migration import normalize_key
 from src.api.models.base import BaseModel
 from src.api.models.member import CrossrefMember
 from src.api.models.work import CreativeWork
@@ -24,6 +40,58 @@ class Members:
 
 TABLE_CHOICES = [Works.choice, Members.choice]
 
+# Rows per row group of the exported parquet file
+ROW_GROUP_SIZE = 100_000
+
+# Bytes of streamed rows held in memory before they are written
+MAX_BUFFER_BYTES = 256 * 1024**2
+
+# Rows per block streamed from ClickHouse
+STREAM_BLOCK_ROWS = 65_536
+
+# Settings under which ClickHouse sends LowCardinality columns as
+# dictionary-encoded Arrow arrays, rather than repeating their values
+ARROW_SETTINGS = {"output_format_arrow_low_cardinality_as_dictionary": 1}
+
+# Seconds during which newly inserted rows are left to the next incremental
+# export, so that inserts still in flight are not skipped
+INGEST_LAG = 60
+
+# Number of partitions of a dataset exported at the same time
+EXPORT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Partitioning by the year of a date column, such as "year(deposited)"
+YEAR_PATTERN = re.compile(r"^year\((\w+)\)$")
+
+# SQL expression of a partition key for the year of a date column
+YEAR_EXPRESSION = re.compile(r"^toYear\((\w+)\)$")
+
+# Directory value of a partition whose key is null, as read by DuckDB
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+
+# Types of the query parameters matching partition keys' values
+PARAMETER_TYPES = {
+    bool: "Bool",
+    int: "Int64",
+    float: "Float64",
+    str: "String",
+}
+
+
+class NotIngestedException(Exception):
+    """The table predates the column stamping each row's insertion time, \
+        from which an incremental export finds its new rows. Add the column \
+        with the 'migrate' command before exporting increments."""
+
+
+def choose_table(table_choice: str) -> BaseModel:
+    if table_choice == Works.choice:
+        return Works.table
+    elif table_choice == Members.choice:
+        return Members.table
+    else:
+        raise ValueError("This table is not yet implemented")
+
 
 def make_sure_outfile_is_parquet(outfile: str) -> Path:
     """
@@ -44,41 +112,101 @@ def make_sure_outfile_is_parquet(outfile: str) -> Path:
     return fp.with_suffix(".parquet")
 
 
-def build_query_for_selecting_distinct_rows(table: BaseModel) -> str:
+def build_query_for_selecting_distinct_rows(
+    table: BaseModel,
+    exclude: Iterable[str] = (),
+    where: str | None = None,
+    deduplicates: bool = False,
+    latest: bool = False,
+) -> str:
     """
     Compose the select part of a query that ignores a table's duplicates rows.
+    A table with a replacing engine is read with the FINAL modifier, which \
+        collapses rows with the same sorting key; any other table falls back \
+        to a distinct over all of its columns. A window of rows, such as an \
+        increment, can instead keep the latest version of each of its rows, \
+        ordered as the model's engine replaces them, without merging the \
+        whole table.
     Because ClickHouse stores and represents dates in Unix, convert hem to a \
         date format.
 
     Args:
         table (BaseModel): Dataclass storing metadata about a table.
+        exclude (Iterable[str], optional): Columns left out of the selection. \
+            Defaults to ().
+        where (str | None, optional): Condition on the selected rows. \
+            Defaults to None.
+        deduplicates (bool, optional): Whether the table's engine, as it \
+            exists in the database, replaces rows with the same key. \
+            Defaults to False.
+        latest (bool, optional): Whether to keep the latest version of each \
+            selected row of a model with a replacing engine, rather than \
+            read the table as FINAL. Defaults to False.
 
     Returns:
         str: SQL select query.
     """
 
     # Patch for handling ClickHouse's date representations in Unix.
-    date_cols = [
-        c
-        for c, t in zip(
-            table.__annotations__.keys(),
-            table.list_column_type_names(),
-        )
-        if t == "DateTime"
-    ]
-
     def reformat(col_name: str) -> str:
-        if col_name in date_cols:
+        if col_name in table.schema.date_columns:
             return f"formatDateTime({col_name}, '%Y-%m-%d') AS {col_name}"
         return col_name
 
     column_names = ", ".join(
-        [f"{reformat(k)}" for k in table.__annotations__.keys()],
+        [f"{reformat(k)}" for k in table.schema.columns if k not in exclude],
     )
-    columns = ", ".join(table.__annotations__.keys())
+    condition = f" WHERE {where}" if where else ""
     table_name = table.name_table()
+    if latest and table.deduplicates():
+        return f"""
+SELECT {column_names} FROM (
+    SELECT * FROM {table_name}{condition}
+    ORDER BY {latest_first(table)} LIMIT 1 BY {table.order_by}
+)
+"""
+    if deduplicates:
+        return f"SELECT {column_names} FROM {table_name} FINAL{condition}"
+    columns = ", ".join(table.schema.columns)
     query = f"SELECT DISTINCT ON ({columns}) {column_names} FROM {table_name}"
-    return query
+    return query + condition
+
+
+def latest_first(table: BaseModel) -> str:
+    """
+    Compose the ordering that puts first the version of a row that a \
+        replacing engine keeps: the highest version, or else the last \
+        inserted.
+    """
+
+    ordering = [f"{table.ingested_column} DESC"]
+    if table.version:
+        ordering.insert(0, f"{table.version} DESC")
+    return ", ".join(ordering)
+
+
+def encode_dictionaries(block: pa.Table, table: BaseModel) -> pa.Table:
+    """
+    Dictionary-encode the low-cardinality columns of a block of rows, with \
+        the index type of the table's Arrow schema, so that the blocks of a \
+        stream share one schema and the parquet file keeps the encoding.
+
+    Args:
+        block (pa.Table): Rows selected from the table.
+        table (BaseModel): Dataclass storing metadata about a table.
+
+    Returns:
+        pa.Table: Rows with their low-cardinality columns encoded.
+    """
+
+    for name in table.schema.low_cardinality:
+        index = block.schema.get_field_index(name)
+        if index < 0:
+            continue
+        field = table.schema.arrow.field(name)
+        column = block.column(index).cast(field.type)
+        block = block.set_column(index, field, column)
+    return block
 
 
 def fetch_unique_rows_in_pyarrow(
@@ -96,23 +224,703 @@ def fetch_unique_rows_in_pyarrow(
         Table: Pyarrow table.
     """
 
-    selection_query = build_query_for_selecting_distinct_rows(table=table)
-    return db.client.query_arrow(query=selection_query)
+    selection_query = build_query_for_selecting_distinct_rows(
+        table=table,
+        deduplicates=db.deduplicates(table=table),
+    )
+    result = db.client.query_arrow(
+        query=selection_query,
+        settings=ARROW_SETTINGS,
+    )
+    return encode_dictionaries(block=result, table=table)
+
+
+def stream_unique_rows_in_pyarrow(
+    table: BaseModel,
+    db: ClickHouseDB,
+    block_rows: int = STREAM_BLOCK_ROWS,
+    exclude: Iterable[str] = (),
+    where: str | None = None,
+    parameters: dict | None = None,
+    latest: bool = False,
+) -> Iterator[pa.Table]:
+    """
+    Select the unique rows from a table and stream them block by block, so \
+        that the table is never held in memory as a whole.
+
+    Args:
+        table (BaseModel): Dataclass storing metadata about a table.
+        db (ClickHouseDB): ClickHouse database class instance.
+        block_rows (int, optional): Maximum number of rows per streamed \
+            block. Defaults to STREAM_BLOCK_ROWS.
+        exclude (Iterable[str], optional): Columns left out of the selection. \
+            Defaults to ().
+        where (str | None, optional): Condition on the selected rows, which \
+            refers to the table's columns rather than to the reformatted \
+            dates. Defaults to None.
+        parameters (dict | None, optional): Values of the condition's query \
+            parameters. Defaults to None.
+        latest (bool, optional): Whether to keep the latest version of each \
+            selected row rather than read the table as FINAL, which suits a \
+            condition selecting few rows. Defaults to False.
+
+    Yields:
+        Iterator[pa.Table]: Pyarrow tables of consecutive blocks of rows.
+    """
+
+    selection_query = build_query_for_selecting_distinct_rows(
+        table=table,
+        exclude=exclude,
+        where=where,
+        deduplicates=not latest and db.deduplicates(table=table),
+        latest=latest,
+    )
+    with db.client.query_arrow_stream(
+        query=selection_query,
+        parameters=parameters,
+        settings={
+            "max_block_size": block_rows,
+            "prefer_column_name_to_alias": 1,
+            **ARROW_SETTINGS,
+        },
+    ) as stream:
+        for block in stream:
+            if isinstance(block, pa.RecordBatch):
+                block = pa.Table.from_batches([block])
+            yield encode_dictionaries(block=block, table=table)
+
+
+def count_unique_rows(
+    table: BaseModel,
+    db: ClickHouseDB,
+    where: str | None = None,
+    parameters: dict | None = None,
+    latest: bool = False,
+) -> int:
+    if latest and table.deduplicates():
+        condition = f" WHERE {where}" if where else ""
+        query = f"SELECT uniqExact({table.order_by}) FROM {table.name_table()}"
+        query += condition
+    elif db.deduplicates(table=table):
+        condition = f" WHERE {where}" if where else ""
+        query = f"SELECT count() FROM {table.name_table()} FINAL{condition}"
+    else:
+        selection = build_query_for_selecting_distinct_rows(
+            table=table,
+            where=where,
+        )
+        query = f"SELECT count() FROM ({selection})"
+    return db.client.command(query, parameters=parameters)
+
+
+def find_watermark(table: BaseModel, db: ClickHouseDB) -> str | None:
+    """
+    Find the latest insertion time of a table's rows, leaving out the rows \
+        inserted in the last INGEST_LAG seconds, whose inserts may not all \
+        be visible yet.
+
+    Args:
+        table (BaseModel): Dataclass storing metadata about a table.
+        db (ClickHouseDB): ClickHouse database class instance.
+
+    Raises:
+        NotIngestedException: The table has no insertion time column.
+
+    Returns:
+        str | None: Latest insertion time, or None if there are no rows.
+    """
+
+    column = table.ingested_column
+    if column not in db.describe_table(table=table):
+        raise NotIngestedException(table.name_table())
+    query = f"""
+SELECT toString(max({column})), count()
+FROM {table.name_table()}
+WHERE {column} <= now64(6) - INTERVAL {INGEST_LAG} SECOND
+"""
+    watermark, rows = db.client.query(query).result_rows[0]
+    return watermark if rows else None
+
+
+def ingested_between(
+    table: BaseModel,
+    after: str | None,
+    until: str,
+) -> tuple[str, dict]:
+    """
+    Compose the condition that selects the rows inserted after a watermark \
+        and until another.
+
+    Args:
+        table (BaseModel): Dataclass storing metadata about a table.
+        after (str | None): Watermark of the previous export, if any.
+        until (str): Watermark of this export.
+
+    Returns:
+        tuple[str, dict]: SQL condition and the values of its parameters.
+    """
+
+    column = table.ingested_column
+    where = f"{column} <= {{until:DateTime64(6)}}"
+    parameters = {"until": until}
+    if after is not None:
+        where = f"{column} > {{after:DateTime64(6)}} AND {where}"
+        parameters["after"] = after
+    return where, parameters
+
+
+def export_increment(
+    table: BaseModel,
+    db: ClickHouseDB,
+    directory: Path,
+    row_group_size: int = ROW_GROUP_SIZE,
+    max_buffer_bytes: int = MAX_BUFFER_BYTES,
+    on_counted: Callable[[int], None] | None = None,
+    on_written: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Append the rows inserted since the previous export to an incremental \
+        export, as a new parquet part, and move the manifest's watermark \
+        forward. Only the rows of the increment are read, rather than the \
+        table as FINAL, and the latest version of each is kept; versions \
+        exported by earlier parts are left to the readers of the export.
+
+    Args:
+        table (BaseModel): Dataclass storing metadata about a table.
+        db (ClickHouseDB): ClickHouse database class instance.
+        directory (Path): Directory of the export.
+        row_group_size (int, optional): Rows per row group. Defaults to \
+            ROW_GROUP_SIZE.
+        max_buffer_bytes (int, optional): Bytes of buffered rows that \
+            trigger a write. Defaults to MAX_BUFFER_BYTES.
+        on_counted (Callable[[int], None] | None, optional): Called with the \
+            number of new rows before they are written. Defaults to None.
+        on_written (Callable[[int], None] | None, optional): Called with the \
+            number of rows after each write. Defaults to None.
+
+    Returns:
+        int: Number of written rows.
+    """
+
+    manifest = ExportManifest(directory=directory, table=table.name_table())
+    watermark = find_watermark(table=table, db=db)
+    if watermark is None or watermark == manifest.watermark:
+        if on_counted:
+            on_counted(0)
+        return 0
+
+    where, parameters = ingested_between(
+        table=table,
+        after=manifest.watermark,
+        until=watermark,
+    )
+    if on_counted:
+        on_counted(
+            count_unique_rows(
+                table=table,
+                db=db,
+                where=where,
+                parameters=parameters,
+                latest=True,
+            )
+        )
+    directory.mkdir(parents=True, exist_ok=True)
+    fp = manifest.next_part()
+    rows = write_pyarrow_stream_to_parquet(
+        blocks=stream_unique_rows_in_pyarrow(
+            table=table,
+            db=db,
+            block_rows=min(row_group_size, STREAM_BLOCK_ROWS),
+            where=where,
+            parameters=parameters,
+            latest=True,
+        ),
+        fp=fp,
+        row_group_size=row_group_size,
+        max_buffer_bytes=max_buffer_bytes,
+        on_written=on_written,
+    )
+    # The watermark moves forward even without new unique rows, so that
+    # the same rows are not looked at again
+    if rows:
+        manifest.add_part(fp=fp, rows=rows, watermark=watermark)
+    else:
+        manifest.watermark = watermark
+    manifest.save()
+    return rows
 
 
 def write_pyarrow_table_to_parquet(pyarrow_table: pa.Table, fp: Path) -> None:
     pq.write_table(pyarrow_table, fp)
 
 
-def export_table(table_choice: str, outfile: str, database: str):
-    if table_choice == Works.choice:
-        table = Works.table
-    elif table_choice == Members.choice:
-        table = Members.table
+def write_pyarrow_stream_to_parquet(
+    blocks: Iterable[pa.Table],
+    fp: Path,
+    row_group_size: int = ROW_GROUP_SIZE,
+    max_buffer_bytes: int = MAX_BUFFER_BYTES,
+    on_written: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Write a stream of Pyarrow tables to a parquet file. Blocks are buffered \
+        until they fill a row group, or until the buffer reaches its memory \
+        ceiling, and are then written and released, so that memory use does \
+        not grow with the size of the stream.
+
+    Args:
+        blocks (Iterable[pa.Table]): Pyarrow tables sharing a schema.
+        fp (Path): Path to the parquet file.
+        row_group_size (int, optional): Rows per row group. Defaults to \
+            ROW_GROUP_SIZE.
+        max_buffer_bytes (int, optional): Bytes of buffered blocks that \
+            trigger a write, even if the row group is not full. Defaults to \
+            MAX_BUFFER_BYTES.
+        on_written (Callable[[int], None] | None, optional): Called with the \
+            number of rows after each write. Defaults to None.
+
+    Returns:
+        int: Number of written rows.
+    """
+
+    writer = None
+    buffer, buffered_rows, buffered_bytes, written = [], 0, 0, 0
+
+    def flush():
+        nonlocal buffer, buffered_rows, buffered_bytes, written
+        writer.write_table(
+            pa.concat_tables(buffer),
+            row_group_size=row_group_size,
+        )
+        written += buffered_rows
+        if on_written:
+            on_written(buffered_rows)
+        buffer, buffered_rows, buffered_bytes = [], 0, 0
+
+    try:
+        for block in blocks:
+            if writer is None:
+                writer = pq.ParquetWriter(fp, block.schema)
+            buffer.append(block)
+            buffered_rows += block.num_rows
+            buffered_bytes += block.nbytes
+            if buffered_rows >= row_group_size or buffered_bytes >= max_buffer_bytes:
+                flush()
+        if writer is None:
+            return 0
+        if buffer:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+@dataclass
+class PartitionKey:
+    name: str
+    expression: str
+    # Column whose values are held by the directories rather than the files
+    column: str | None = None
+
+
+def parse_partition_key(spec: str, table: BaseModel) -> PartitionKey:
+    """
+    Parse a partitioning option, which is either one of the table's columns, \
+        such as "work_type", or the year of one of its date columns, such as \
+        "year(deposited)".
+
+    Args:
+        spec (str): Value of the partitioning option.
+        table (BaseModel): Dataclass storing metadata about a table.
+
+    Raises:
+        ValueError: The table cannot be partitioned by this option.
+
+    Returns:
+        PartitionKey: Name of the partition key and its SQL expression.
+    """
+
+    columns = dict(zip(table.schema.columns, table.schema.column_types))
+    spec = spec.strip()
+    match = YEAR_PATTERN.match(spec)
+    if match:
+        column = match.group(1)
+        if columns.get(column) != "DateTime":
+            raise ValueError(f"'{column}' is not a date column")
+        return PartitionKey(
+            name=f"{column}_year",
+            expression=f"toYear({column})",
+        )
+    if columns.get(spec) == "DateTime":
+        raise ValueError(f"Partition by the year of '{spec}' instead")
+    if spec in columns:
+        return PartitionKey(name=spec, expression=spec, column=spec)
+    raise ValueError(f"Cannot partition by '{spec}'")
+
+
+def list_partitions(
+    table: BaseModel,
+    db: ClickHouseDB,
+    keys: list[PartitionKey],
+) -> list[tuple[tuple, int]]:
+    """
+    List the values of the partition keys found in a table's unique rows.
+
+    Args:
+        table (BaseModel): Dataclass storing metadata about a table.
+        db (ClickHouseDB): ClickHouse database class instance.
+        keys (list[PartitionKey]): Partition keys.
+
+    Returns:
+        list[tuple[tuple, int]]: Each partition's key values and row count.
+    """
+
+    expressions = ", ".join(k.expression for k in keys)
+    query = f"""
+SELECT {expressions}, count()
+FROM {db.select_from(table=table)}
+GROUP BY {expressions}
+"""
+    result = db.client.query(query)
+    return [(tuple(row[:-1]), row[-1]) for row in result.result_rows]
+
+
+def hive_value(value) -> str:
+    """Format a partition key's value as a directory name's value."""
+
+    if value is None:
+        return HIVE_NULL
+    if isinstance(value, bool):
+        return str(value).lower()
+    return quote(str(value), safe="")
+
+
+def partition_filter(
+    keys: list[PartitionKey],
+    values: tuple,
+) -> tuple[str, dict]:
+    """
+    Compose the condition that selects a partition's rows.
+
+    Args:
+        keys (list[PartitionKey]): Partition keys.
+        values (tuple): The partition's values of the keys.
+
+    Returns:
+        tuple[str, dict]: SQL condition and the values of its parameters.
+    """
+
+    conditions, parameters = [], {}
+    for i, (key, value) in enumerate(zip(keys, values)):
+        if value is None:
+            conditions.append(f"{key.expression} IS NULL")
+        else:
+            param_type = PARAMETER_TYPES[type(value)]
+            conditions.append(f"{key.expression} = {{p{i}:{param_type}}}")
+            parameters[f"p{i}"] = value
+    return " AND ".join(conditions), parameters
+
+
+def partition_path(
+    directory: Path,
+    keys: list[PartitionKey],
+    values: tuple,
+    part: int = 0,
+) -> Path:
+    """Compose the path of a partition's nth file in a hive-style dataset."""
+
+    parts = [f"{k.name}={hive_value(v)}" for k, v in zip(keys, values)]
+    return directory.joinpath(*parts, f"part-{part}.parquet")
+
+
+def split_partitions(
+    block: pa.Table,
+    keys: list[PartitionKey],
+) -> Iterator[tuple[tuple, pa.Table]]:
+    """
+    Split a block of rows by the values of the partition keys, leaving out \
+        the columns that the directory names hold. The year of a date \
+        column is read from the date, as formatted by the selection query. \
+        The rows are grouped by Arrow, so that only the distinct values of \
+        the keys are converted to Python.
+
+    Args:
+        block (pa.Table): Rows selected from the table.
+        keys (list[PartitionKey]): Partition keys.
+
+    Yields:
+        Iterator[tuple[tuple, pa.Table]]: Each partition's key values and \
+            rows.
+    """
+
+    columns = {}
+    for i, key in enumerate(keys):
+        if key.column:
+            column = block.column(key.column)
+            if pa.types.is_dictionary(column.type):
+                column = column.cast(column.type.value_type)
+        else:
+            dates = block.column(YEAR_EXPRESSION.match(key.expression).group(1))
+            column = pc.year(pc.strptime(dates, format="%Y-%m-%d", unit="s"))
+        columns[f"key{i}"] = column
+    columns["row"] = pa.array(range(block.num_rows), type=pa.int64())
+    groups = (
+        pa.table(columns)
+        .group_by([f"key{i}" for i in range(len(keys))], use_threads=False)
+        .aggregate([("row", "list")])
+    )
+    rows = block.drop_columns([k.column for k in keys if k.column])
+    indices = groups.column("row_list")
+    for g in range(groups.num_rows):
+        values = tuple(groups.column(f"key{i}")[g].as_py() for i in range(len(keys)))
+        yield values, rows.take(indices[g].values)
+
+
+def write_partitions_from_stream(
+    blocks: Iterable[pa.Table],
+    keys: list[PartitionKey],
+    directory: Path,
+    row_group_size: int = ROW_GROUP_SIZE,
+    max_buffer_bytes: int = MAX_BUFFER_BYTES,
+    on_written: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Split a stream of Pyarrow tables into the files of a hive-style \
+        dataset. Each partition's rows are buffered until they fill a row \
+        group, and all the buffers are written once together they reach \
+        their memory ceiling. Each write is a new file of its partition, \
+        closed at once, so that a key with many values, such as the member, \
+        never holds a file open per partition.
+
+    Args:
+        blocks (Iterable[pa.Table]): Pyarrow tables sharing a schema.
+        keys (list[PartitionKey]): Partition keys.
+        directory (Path): Directory of the dataset.
+        row_group_size (int, optional): Rows per row group. Defaults to \
+            ROW_GROUP_SIZE.
+        max_buffer_bytes (int, optional): Bytes of buffered rows, across \
+            the partitions, that trigger a write. Defaults to \
+            MAX_BUFFER_BYTES.
+        on_written (Callable[[int], None] | None, optional): Called with the \
+            number of rows after each write. Defaults to None.
+
+    Returns:
+        int: Number of written rows.
+    """
+
+    # Files written so far to each partition
+    parts: dict[tuple, int] = {}
+    buffers: dict[tuple, list[pa.Table]] = {}
+    buffered_bytes, written = 0, 0
+
+    def flush(values: tuple):
+        nonlocal buffered_bytes, written
+        buffer = buffers.pop(values)
+        buffered_bytes -= sum(b.nbytes for b in buffer)
+        rows = pa.concat_tables(buffer)
+        part = parts.get(values, 0)
+        parts[values] = part + 1
+        fp = partition_path(directory=directory, keys=keys, values=values, part=part)
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(rows, fp, row_group_size=row_group_size)
+        written += rows.num_rows
+        if on_written:
+            on_written(rows.num_rows)
+
+    for block in blocks:
+        for values, rows in split_partitions(block=block, keys=keys):
+            buffer = buffers.setdefault(values, [])
+            buffer.append(rows)
+            buffered_bytes += rows.nbytes
+            if sum(b.num_rows for b in buffer) >= row_group_size:
+                flush(values)
+        if buffered_bytes >= max_buffer_bytes:
+            for values in list(buffers):
+                flush(values)
+    for values in list(buffers):
+        flush(values)
+    return written
+
+
+def export_partitioned_table(
+    table: BaseModel,
+    db: ClickHouseDB,
+    keys: list[PartitionKey],
+    directory: Path,
+    workers: int = EXPORT_WORKERS,
+    row_group_size: int = ROW_GROUP_SIZE,
+    max_buffer_bytes: int = MAX_BUFFER_BYTES,
+    on_written: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Write a table's unique rows to a hive-style dataset, in which each \
+        partition is a directory named after its keys' values, such as \
+        "has_refs=true/work_type=journal-article". When the keys are those \
+        of the table's own PARTITION BY, each partition is read from its \
+        parts alone, so the partitions are streamed from ClickHouse and \
+        written concurrently by a pool of workers. Otherwise each partition \
+        would be a scan of the whole table, so the table is streamed once \
+        and its rows are split as they arrive. Columns used as partition \
+        keys are held by the directory names and left out of the files.
+
+    Args:
+        table (BaseModel): Dataclass storing metadata about a table.
+        db (ClickHouseDB): ClickHouse database class instance.
+        keys (list[PartitionKey]): Partition keys.
+        directory (Path): Directory of the dataset.
+        workers (int, optional): Number of partitions written at the same \
+            time. Defaults to EXPORT_WORKERS.
+        row_group_size (int, optional): Rows per row group. Defaults to \
+            ROW_GROUP_SIZE.
+        max_buffer_bytes (int, optional): Bytes of buffered rows per worker \
+            that trigger a write. Defaults to MAX_BUFFER_BYTES.
+        on_written (Callable[[int], None] | None, optional): Called with the \
+            number of rows after each write. Defaults to None.
+
+    Returns:
+        int: Number of written rows.
+    """
+
+    expressions = ", ".join(k.expression for k in keys)
+    partition_key = db.describe_engine(table=table).get("partition_key")
+    if normalize_key(expressions) != normalize_key(partition_key):
+        return write_partitions_from_stream(
+            blocks=stream_unique_rows_in_pyarrow(
+                table=table,
+                db=db,
+                block_rows=min(row_group_size, STREAM_BLOCK_ROWS),
+            ),
+            keys=keys,
+            directory=directory,
+            row_group_size=row_group_size,
+            max_buffer_bytes=max_buffer_bytes,
+            on_written=on_written,
+        )
+
+    exclude = [k.column for k in keys if k.column]
+
+    def export_partition(values: tuple) -> int:
+        where, parameters = partition_filter(keys=keys, values=values)
+        fp = partition_path(directory=directory, keys=keys, values=values)
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        return write_pyarrow_stream_to_parquet(
+            blocks=stream_unique_rows_in_pyarrow(
+                table=table,
+                db=db,
+                block_rows=min(row_group_size, STREAM_BLOCK_ROWS),
+                exclude=exclude,
+                where=where,
+                parameters=parameters,
+            ),
+            fp=fp,
+            row_group_size=row_group_size,
+            max_buffer_bytes=max_buffer_bytes,
+            on_written=on_written,
+        )
+
+    # Start with the largest partitions, so that a large one is not left to
+    # a single worker at the end
+    partitions = list_partitions(table=table, db=db, keys=keys)
+    partitions.sort(key=lambda p: p[1], reverse=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(export_partition, [v for v, _ in partitions]))
+
+
+def replace_directory(staging: Path, directory: Path) -> None:
+    """Replace a directory with a fully written staging directory."""
+
+    if directory.exists():
+        old = directory.with_name(f".{directory.name}.old")
+        shutil.rmtree(old, ignore_errors=True)
+        directory.rename(old)
+        staging.rename(directory)
+        shutil.rmtree(old)
     else:
-        raise ValueError("This table is not yet implemented")
+        staging.rename(directory)
 
-    fp = make_sure_outfile_is_parquet(outfile=outfile)
+
+def export_table(
+    table_choice: str,
+    outfile: str,
+    database: str,
+    row_group_size: int = ROW_GROUP_SIZE,
+    max_buffer_bytes: int = MAX_BUFFER_BYTES,
+    partition_by: Iterable[str] = (),
+    workers: int = EXPORT_WORKERS,
+    incremental: bool = False,
+):
+    table = choose_table(table_choice=table_choice)
+    keys = [parse_partition_key(spec=s, table=table) for s in partition_by]
     db = ClickHouseDB(database_name=database)
-    selection = fetch_unique_rows_in_pyarrow(table=table, db=db)
-    write_pyarrow_table_to_parquet(pyarrow_table=selection, fp=fp)
+
+    if incremental:
+        directory = Path(outfile).with_suffix("")
+        with Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+        ) as p:
+            t = p.add_task(f"Exporting new {table_choice}", total=None)
+            export_increment(
+                table=table,
+                db=db,
+                directory=directory,
+                row_group_size=row_group_size,
+                max_buffer_bytes=max_buffer_bytes,
+                on_counted=lambda rows: p.update(t, total=rows),
+                on_written=lambda rows: p.update(t, advance=rows),
+            )
+        return
+
+    total = count_unique_rows(table=table, db=db)
+
+    if keys:
+        # Write the dataset next to its destination, then swap it in, so
+        # that an interrupted export leaves the previous dataset intact
+        directory = Path(outfile).with_suffix("")
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        staging = directory.with_name(f".{directory.name}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        with Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+        ) as p:
+            t = p.add_task(f"Exporting {table_choice}", total=total)
+            export_partitioned_table(
+                table=table,
+                db=db,
+                keys=keys,
+                directory=staging,
+                workers=workers,
+                row_group_size=row_group_size,
+                max_buffer_bytes=max_buffer_bytes,
+                on_written=lambda rows: p.update(t, advance=rows),
+            )
+        replace_directory(staging=staging, directory=directory)
+        return
+
+    fp = make_sure_outfile_is_parquet(outfile=outfile)
+
+    # Set up a progress bar for tracking the exported rows
+    with Progress(
+        TextColumn("{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+    ) as p:
+        t = p.add_task(f"Exporting {table_choice}", total=total)
+        # Stream the rows into the parquet file, one row group at a time
+        write_pyarrow_stream_to_parquet(
+            blocks=stream_unique_rows_in_pyarrow(
+                table=table,
+                db=db,
+                block_rows=min(row_group_size, STREAM_BLOCK_ROWS),
+            ),
+            fp=fp,
+            row_group_size=row_group_size,
+            max_buffer_bytes=max_buffer_bytes,
+            on_written=lambda rows: p.update(t, advance=rows),
+        )
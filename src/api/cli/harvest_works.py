@@ -0,0 +1,70 @@
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    TextColumn,
+    TimeElapsedColumn,
+)
+
+from src.api.cli.console import ConsoleLog
+from src.api.client import CURSOR_ROWS, Client
+from src.api.constants import CLICKHOUSE_DATABASE
+from src.api.database import ClickHouseDB
+from src.api.models.work import CreativeWork
+from src.api.rate_limit import AdaptiveRateLimiter
+
+
+def harvest_works(
+    mailto: str | None,
+    has_references: bool,
+    limit: int | None = None,
+    rows: int = CURSOR_ROWS,
+    database: str = CLICKHOUSE_DATABASE,
+    arrow: bool = False,
+):
+    # Set up the client for calling the Crossref API
+    client = Client(mailto=mailto, limiter=AdaptiveRateLimiter())
+    try:
+        # Set up a connection to the ClickHouse database
+        db = ClickHouseDB(database_name=database)
+        # Set up a stdout log for the console
+        console = ConsoleLog(db=db, refs=has_references)
+        # Affirm that the table for inserting values is created
+        db.create_table(CreativeWork)
+
+        total = client.count_works(has_references=has_references)
+        if limit is not None:
+            total = min(total, limit)
+
+        # Set up a progress bar for tracking the harvested works, and a buffer
+        # that inserts them in large batches from a background thread
+        with db.buffered_inserter() as inserter, Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            TextColumn("{task.fields[rate]}"),
+            console=console.console,
+        ) as p:
+            # Show the collection's parameters
+            console.print_log()
+            t = p.add_task("Harvesting works", total=total, rate="")
+
+            # Walk the deep-paging cursor, page by page
+            for records in client.harvest(
+                has_references=has_references,
+                rows=rows,
+                limit=limit,
+                arrow=arrow,
+            ):
+                # Buffer the page's data for insertion
+                inserter.add(records=records)
+                p.update(
+                    t,
+                    advance=len(records),
+                    rate=client.limiter.describe(),
+                )
+    finally:
+        # Release the connection pool and the event loop even if the
+        # harvest is interrupted, once the buffered works are flushed
+        client.close()
@@ -1,3 +1,9 @@
+import itertools
+from functools import partial
+from pathlib import Path
+from typing import Iterator
+
+from rich.console import Console
 from rich.progress import (
     BarColumn,
     MofNCompleteColumn,
@@ -5,11 +11,14 @@ from rich.progress import (
     TextColumn,
     TimeElapsedColumn,
 )
-from src.api.client import Client
+from src.api.cache import CACHE_DIR, ResponseCache
+from src.api.checkpoint import CheckpointJournal
+from src.api.client import DEFAULT_RETRIES, Client
 from src.api.constants import CLICKHOUSE_DATABASE
 from src.api.database import ClickHouseDB
 from src.api.models.member import CrossrefMember
 from src.api.models.work import CreativeWork
+from src.api.rate_limit import AdaptiveRateLimiter
 
 
 class NotEnoughDataException(Exception):
@@ -17,50 +26,193 @@ class NotEnoughDataException(Exception):
         Make sure to run the commands in the correct order."""
 
 
+def build_unique_members_query(select: str = "m.member") -> str:
+    """
+    Compose the query of the member IDs that have not yet been entered into \
+        the members table. The IDs are read from the works' distinct \
+        members, which a materialized view keeps up to date, so that the \
+        query does not scan the works table.
+
+    Args:
+        select (str, optional): Selection of the query. Defaults to the IDs.
+
+    Returns:
+        str: SQL query.
+    """
+
+    view = CreativeWork.materialized_views[0].name
+    members = CrossrefMember.name_table()
+    return f"""
+SELECT {select}
+FROM (SELECT DISTINCT member FROM {view}) m
+LEFT ANTI JOIN {members} c ON m.member = c.id
+"""
+
+
+def count_unique_members(db: ClickHouseDB) -> int:
+    return db.client.command(build_unique_members_query(select="count()"))
+
+
+def stream_unique_members(db: ClickHouseDB) -> Iterator[list[str]]:
+    """
+    Stream the IDs of the members not yet entered into the members table, \
+        block by block.
+
+    Args:
+        db (ClickHouseDB): ClickHouse database class instance.
+
+    Yields:
+        Iterator[list[str]]: Blocks of member IDs, in order.
+    """
+
+    query = build_unique_members_query() + "ORDER BY m.member"
+    with db.client.query_column_block_stream(query) as stream:
+        for block in stream:
+            yield list(block[0])
+
+
 def get_unique_members(db: ClickHouseDB) -> list[str]:
     """
     From the table of works, get a unique set of member IDs that have not yet \
         been entered into the members table.
     """
 
-    works = CreativeWork.name_table()
-    members = CrossrefMember.name_table()
+    return [id for block in stream_unique_members(db=db) for id in block]
 
-    query = f"""
-SELECT DISTINCT(w."member")
-FROM {works} w
-LEFT JOIN {members} m ON w.`member` = m.id
-WHERE m.id  = ''
-ORDER BY w."member"
-"""
-    result = db.client.query(query=query)
-    return [row[0] for row in result.result_rows]
 
+def plan_unique_members(
+    db: ClickHouseDB,
+    journal: CheckpointJournal,
+) -> Iterator[str]:
+    """
+    Stream the IDs of the members to collect, recording each block in the \
+        run's plan before its IDs are handed over, and mark the plan as \
+        complete once the last block is recorded. The members that the \
+        run already planned are skipped, so that the plan of a run that \
+        died while planning can be completed when it resumes.
+
+    Args:
+        db (ClickHouseDB): ClickHouse database class instance.
+        journal (CheckpointJournal): Journal of the run.
+
+    Yields:
+        Iterator[str]: IDs of the members newly planned.
+    """
+
+    planned = set(journal.planned)
+    for block in stream_unique_members(db=db):
+        block = [id for id in block if id not in planned]
+        if block:
+            journal.record_plan(block)
+            yield from block
+    journal.complete_plan()
 
-def insert_members(database_name: str = CLICKHOUSE_DATABASE):
-    # Set up the client for calling the Crossref API
-    client = Client()
+
+def insert_members(
+    database_name: str = CLICKHOUSE_DATABASE,
+    cache_dir: Path | str = CACHE_DIR,
+    retries: int = DEFAULT_RETRIES,
+    resume: str | None = None,
+    bulk: bool = False,
+):
+    console = Console()
+    # Set up the client for calling the Crossref API, which first looks for
+    # the members in the on-disk cache of earlier responses
+    cache = ResponseCache(directory=cache_dir)
+    client = Client(
+        limiter=AdaptiveRateLimiter(),
+        cache=cache,
+        retries=retries,
+    )
     # Set up a connection to the ClickHouse database
     db = ClickHouseDB(database_name=database_name)
-    # Affirm that the table for inserting values is created
+    # Affirm that the table for inserting values is created, and that the
+    # works' view of their distinct members is too
     db.create_table(CrossrefMember)
+    db.create_table(CreativeWork)
 
-    member_ids = get_unique_members(db=db)
-    if len(member_ids) < 1:
-        raise NotEnoughDataException
+    # Either resume the journal of an earlier run, whose plan lists the
+    # members to collect, or start a new run, whose members are streamed
+    # from the database and planned as they arrive
+    if resume:
+        journal = CheckpointJournal.resume(run_id=resume, command="insert-members")
+        member_ids = journal.remaining()
+        done = len(journal.planned) - len(member_ids)
+        total = len(journal.planned)
+        if not journal.plan_complete:
+            # The run died while planning, so the members it had not yet
+            # planned are streamed from the database after the planned ones
+            total = done + count_unique_members(db=db)
+            member_ids = itertools.chain(
+                member_ids,
+                plan_unique_members(db=db, journal=journal),
+            )
+    else:
+        total = count_unique_members(db=db)
+        if total < 1:
+            raise NotEnoughDataException
+        journal = CheckpointJournal.start(
+            command="insert-members",
+            params={"database": database_name},
+        )
+        member_ids = plan_unique_members(db=db, journal=journal)
+        done = 0
+    console.print(f"Run ID: {journal.run_id}")
 
-    # Set up a progress bar for tracking the API calls
-    with Progress(
+    # Set up a progress bar for tracking the API calls, and a buffer that
+    # inserts the members in large batches from a background thread
+    with db.buffered_inserter() as inserter, Progress(
         TextColumn("{task.description}"),
         BarColumn(),
         MofNCompleteColumn(),
         TimeElapsedColumn(),
+        TextColumn("{task.fields[rate]}"),
     ) as p:
         # Show the collection's parameters
-        t = p.add_task("Collecting members", total=len(member_ids))
+        t = p.add_task(
+            "Collecting members",
+            total=total,
+            completed=done,
+            rate="",
+        )
+
+        # In bulk mode, page through the list of all members and insert each
+        # page's wanted members at once
+        if bulk:
+            for records in client.get_member_pages(ids=member_ids):
+                inserter.add(
+                    records=records,
+                    on_inserted=partial(
+                        journal.record_batch,
+                        rows=len(records),
+                        keys=records.column("id").to_pylist(),
+                    ),
+                )
+                p.update(
+                    t,
+                    advance=len(records),
+                    rate=client.limiter.describe(),
+                )
+            # The members missing from the list are requested one by one
+            inserter.flush()
+            member_ids = journal.remaining()
 
-        # Run the multi-threaded API calls
+        # Run the concurrent API calls
         for record in client.get_members(ids=member_ids):
-            # Insert the sample's data into the table
-            db.insert_single_record(record=record)
-            p.advance(t)
+            # Buffer the member's data, which is journaled once inserted
+            inserter.add(
+                records=[record],
+                on_inserted=partial(
+                    journal.record_batch,
+                    rows=1,
+                    keys=[record.id],
+                ),
+            )
+            p.update(t, advance=1, rate=client.limiter.describe())
+
+    journal.finish()
+    stats = cache.stats()
+    console.print(f"Member cache: {stats['hits']} hits, {stats['misses']} misses")
+    if client.failures:
+        console.print(f"{len(client.failures)} members could not be collected")
+    client.close()
@@ -1,3 +1,6 @@
+from collections import deque
+from functools import partial
+
 from rich.progress import (
     BarColumn,
     MofNCompleteColumn,
@@ -6,47 +9,203 @@ from rich.progress import (
     TimeElapsedColumn,
 )
 
+from src.api.checkpoint import CheckpointJournal
 from src.api.cli.console import ConsoleLog
 from src.api.constants import CLICKHOUSE_DATABASE
-from src.api.client import Client
+from src.api.client import DEFAULT_RETRIES, Client
 from src.api.database import ClickHouseDB
 from src.api.models.work import CreativeWork
+from src.api.rate_limit import AdaptiveRateLimiter
+from src.api.seen import SeenSet
+
+# Consecutive samples without a new DOI after which a unique-target
+# collection stops, the filtered population being likely exhausted
+MAX_STALE_SAMPLES = 20
+
+
+def seed_seen_dois(db: ClickHouseDB, has_references: bool) -> SeenSet:
+    """
+    Seed a set of seen DOIs with the works already stored in the database \
+        for one value of the has-references filter, since the works \
+        collected for the other value do not count towards the target.
+
+    Args:
+        db (ClickHouseDB): ClickHouse database class instance.
+        has_references (bool): Value of the API's has-references filter.
+
+    Returns:
+        SeenSet: DOIs of the stored works.
+    """
+
+    seen = SeenSet()
+    query = (
+        f"SELECT doi FROM {CreativeWork.name_table()} "
+        "WHERE has_refs = {has_refs:Bool}"
+    )
+    with db.client.query_column_block_stream(
+        query,
+        parameters={"has_refs": has_references},
+    ) as stream:
+        for block in stream:
+            seen.update(block[0])
+    return seen
 
 
 def insert_works(
     mailto: str | None,
-    samples: int,
+    samples: int | None,
     has_references: bool,
     database: str = CLICKHOUSE_DATABASE,
+    retries: int = DEFAULT_RETRIES,
+    resume: str | None = None,
+    parse_workers: int | None = None,
+    unique_target: int | None = None,
 ):
+    # Either resume the journal of an earlier run, and its parameters, or
+    # start a new run
+    if resume:
+        journal = CheckpointJournal.resume(run_id=resume, command="insert-samples")
+        samples = journal.params["samples"]
+        unique_target = journal.params.get("unique_target")
+        has_references = journal.params["has_references"]
+        database = journal.params["database"]
+    else:
+        journal = CheckpointJournal.start(
+            command="insert-samples",
+            params={
+                "samples": samples,
+                "unique_target": unique_target,
+                "has_references": has_references,
+                "database": database,
+            },
+        )
+
     # Set up the client for calling the Crossref API
-    client = Client(mailto=mailto)
-    # Set up a connection to the ClickHouse database
-    db = ClickHouseDB(database_name=database)
-    # Set up a stdout log for the console
-    console = ConsoleLog(db=db, refs=has_references)
-    # Affirm that the table for inserting values is created
-    db.create_table(CreativeWork)
-
-    # Set up a progress bar for tracking the API calls
-    with Progress(
-        TextColumn("{task.description}"),
-        BarColumn(),
-        MofNCompleteColumn(),
-        TimeElapsedColumn(),
-        console=console.console,
-    ) as p:
-        # Show the collection's parameters
-        console.print_log()
-        t = p.add_task("Collecting samples", total=samples)
-
-        # Run the multi-threaded API calls
-        for records in client.get_samples(
-            has_references=has_references,
-            n=samples,
-        ):
-            # Refresh the stdout log
-            console.refresh()
-            # Insert the sample's data into the table
-            db.insert_records(records=records)
-            p.advance(t)
+    client = Client(
+        mailto=mailto,
+        limiter=AdaptiveRateLimiter(),
+        retries=retries,
+        parse_workers=parse_workers,
+    )
+    try:
+        # Set up a connection to the ClickHouse database
+        db = ClickHouseDB(database_name=database)
+        # Set up a stdout log for the console
+        console = ConsoleLog(db=db, refs=has_references, run_id=journal.run_id)
+        # Affirm that the table for inserting values is created
+        db.create_table(CreativeWork)
+
+        # In unique-target mode, track the DOIs already stored so that
+        # duplicates are dropped before they are inserted. A DOI is seen
+        # once its insert is confirmed, and until then it is in flight
+        seen = None
+        if unique_target:
+            seen = seed_seen_dois(db=db, has_references=has_references)
+            in_flight: set[str] = set()
+            # DOIs whose insert the inserter's thread has confirmed, to be
+            # moved into the seen set by the main thread
+            confirmed: deque[list[str]] = deque()
+            # Works queued for insertion, which decide when to stop sampling,
+            # and works actually stored, counted once their insert succeeds
+            queued = stored = len(seen)
+            stale = 0
+
+        # Set up a progress bar for tracking the API calls, and a buffer that
+        # inserts the samples in large batches from a background thread
+        with db.buffered_inserter() as inserter, Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            TextColumn("{task.fields[rate]}"),
+            console=console.console,
+        ) as p:
+            # Show the collection's parameters
+            console.print_log()
+            if seen is None:
+                t = p.add_task(
+                    "Collecting samples",
+                    total=samples,
+                    completed=journal.batches,
+                    rate="",
+                )
+                n = samples - journal.batches
+            else:
+                t = p.add_task(
+                    "Collecting unique works",
+                    total=unique_target,
+                    completed=min(stored, unique_target),
+                    rate="",
+                )
+                n = None if stored < unique_target else 0
+
+            def on_inserted(rows: int, dois: list[str] = ()) -> None:
+                # Called from the inserter's thread once the works are stored
+                nonlocal stored
+                journal.record_batch(rows=rows)
+                if seen is not None:
+                    confirmed.append(dois)
+                    stored += rows
+                    p.update(t, advance=rows)
+
+            # Run the concurrent API calls for the samples not yet inserted
+            for records in client.get_samples(
+                has_references=has_references,
+                n=n,
+            ):
+                # Refresh the stdout log
+                console.refresh()
+                dois = []
+                if seen is not None:
+                    while confirmed:
+                        for doi in confirmed.popleft():
+                            seen.add(doi)
+                            in_flight.discard(doi)
+                    # Drop the works already stored or queued, and those
+                    # repeated in the sample, and stop at the target
+                    keep, sampled = [], set()
+                    for doi in records.column("doi").to_pylist():
+                        doi = doi.lower()
+                        keep.append(
+                            doi not in sampled
+                            and doi not in in_flight
+                            and doi not in seen
+                        )
+                        sampled.add(doi)
+                    records = records.filter(keep)[: unique_target - queued]
+                    dois = [doi.lower() for doi in records.column("doi").to_pylist()]
+                    in_flight.update(dois)
+                    queued += len(records)
+                    stale = 0 if records else stale + 1
+                # Buffer the sample's data, which is journaled once inserted
+                inserter.add(
+                    records=records,
+                    on_inserted=partial(on_inserted, rows=len(records), dois=dois),
+                )
+                p.update(
+                    t,
+                    advance=1 if seen is None else 0,
+                    rate=client.limiter.describe(),
+                )
+                if seen is not None and (
+                    queued >= unique_target or stale >= MAX_STALE_SAMPLES
+                ):
+                    break
+
+        journal.finish()
+
+        if seen is not None and stored < unique_target:
+            if stale >= MAX_STALE_SAMPLES:
+                reason = f"No new works in {MAX_STALE_SAMPLES} samples"
+            else:
+                reason = "The API stopped answering"
+            console.console.print(f"{reason}: stopped with {stored} distinct works")
+    finally:
+        # Release the connection pool and the event loop even if the
+        # collection is interrupted, once the buffered works are flushed
+        client.close()
+
+    # Report the samples that could not be collected, even from the
+    # failure queue at the end of the run
+    if client.failures:
+        console.console.print(f"{len(client.failures)} samples could not be collected")
@@ -0,0 +1,37 @@
+from rich.console import Console
+
+from src.api.database import ClickHouseDB
+from src.api.migration import MigrationLog
+from src.api.models.member import CrossrefMember
+from src.api.models.work import CreativeWork
+
+
+def migrate_tables(database_name: str, dry_run: bool = False):
+    """
+    Migrate the works and members tables to their models in place, and \
+        print the statements of each migration.
+
+    Args:
+        database_name (str): Name of the database in the ClickHouse server \
+            instance.
+        dry_run (bool, optional): Whether to only print the statements, \
+            without applying them. Defaults to False.
+    """
+
+    console = Console()
+    db = ClickHouseDB(database_name=database_name)
+    log = MigrationLog(client=db.client)
+    for table in (CreativeWork, CrossrefMember):
+        statements = db.migrate_table(table=table, dry_run=dry_run)
+        if not dry_run:
+            db.create_materialized_views(table=table)
+        version = log.version(table=table)
+        if not statements:
+            console.print(f"{table.name_table()}: up to date, v{version}")
+            continue
+        if dry_run:
+            console.print(f"{table.name_table()}: v{version}, pending")
+        else:
+            console.print(f"{table.name_table()}: migrated to v{version}")
+        for stmt in statements:
+            console.print(f"\t{stmt.strip()}")
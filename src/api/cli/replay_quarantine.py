@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from rich.console import Console
+
+from src.api.database import ClickHouseDB
+from src.api.models.base import BaseModel
+from src.api.models.member import CrossrefMember
+from src.api.models.work import CreativeWork
+from src.api.quarantine import (
+    PARSE_STAGE,
+    QUARANTINE_DIR,
+    InvalidItemException,
+    Quarantine,
+)
+
+# Rows inserted at a time when replaying
+REPLAY_ROWS = 100_000
+
+
+def model_entry(table: BaseModel, entry: dict) -> BaseModel | None:
+    """
+    Model a quarantined entry anew. An item that failed to be modelled is \
+        modelled from its raw JSON, and is quarantined again if it still \
+        fails. A row that failed to be inserted is modelled from its \
+        serialized form.
+
+    Args:
+        table (BaseModel): Dataclass of the entry's table.
+        entry (dict): Quarantined entry.
+
+    Returns:
+        BaseModel | None: Modelled row, unless the item is still invalid.
+    """
+
+    if entry["stage"] == PARSE_STAGE:
+        try:
+            return table.load_json(entry["item"], **entry["context"])
+        except InvalidItemException:
+            return None
+    return table.deserialize(entry["item"])
+
+
+def replay_quarantine(
+    database_name: str,
+    directory: Path | str = QUARANTINE_DIR,
+):
+    """
+    Retry the quarantined rows of every table, inserting them in bulk. The \
+        rows failing again stay quarantined. If the replay is interrupted, \
+        its rows are replayed again next time, and those already inserted \
+        are deduplicated by the tables' replacing engines.
+
+    Args:
+        database_name (str): Name of the database in the ClickHouse server \
+            instance.
+        directory (Path | str, optional): Directory of the quarantine. \
+            Defaults to QUARANTINE_DIR.
+    """
+
+    console = Console()
+    quarantine = Quarantine(directory=directory)
+    db = ClickHouseDB(database_name=database_name, quarantine=quarantine)
+    for table in (CreativeWork, CrossrefMember):
+        inserted, rejected = 0, 0
+        with quarantine.drain(table=table.name_table()) as entries:
+            records = []
+            for entry in entries:
+                record = model_entry(table=table, entry=entry)
+                if record is None:
+                    rejected += 1
+                else:
+                    records.append(record)
+                if len(records) == REPLAY_ROWS:
+                    db.create_table(table)
+                    failed = db.insert_records(records=records)
+                    inserted += len(records) - failed
+                    rejected += failed
+                    records = []
+            if records:
+                db.create_table(table)
+                failed = db.insert_records(records=records)
+                inserted += len(records) - failed
+                rejected += failed
+        console.print(
+            f"{table.name_table()}: {inserted} rows inserted, "
+            f"{rejected} quarantined again"
+        )
@@ -0,0 +1,203 @@
+import math
+from dataclasses import dataclass
+
+from rich.console import Console
+from rich.table import Table
+
+from src.api.database import ClickHouseDB
+
+# Columns of the works' summary view, summed again at read time because
+# ClickHouse merges the partial sums of its parts in the background
+SUMMARY_COLUMNS = [
+    "works",
+    "citations_incoming_works",
+    "citations_incoming_sum",
+    "citations_incoming_sumsq",
+    "citations_outgoing_sum",
+    "citations_outgoing_sumsq",
+]
+
+
+# Views of the works read by the summary
+SUMMARY_VIEWS = ["worksummary", "workdelay"]
+
+# Caption of the summary's tables, whose views count the inserted rows
+# rather than the distinct works that the analysis counts
+PER_SAMPLE_CAPTION = "Counts every inserted sample: a work sampled twice counts twice"
+
+
+class NoSummaryException(Exception):
+    """The works' summary views are missing or empty. Create them, with the \
+        'migrate' command or by inserting works, before summarising them."""
+
+
+@dataclass
+class Moments:
+    """Count, sum and sum of squares of a variable, from which its mean and \
+        variance are derived."""
+
+    n: int = 0
+    total: int = 0
+    squares: int = 0
+
+    def __add__(self, other: "Moments") -> "Moments":
+        return Moments(
+            n=self.n + other.n,
+            total=self.total + other.total,
+            squares=self.squares + other.squares,
+        )
+
+    @property
+    def mean(self) -> float | None:
+        if not self.n:
+            return None
+        return self.total / self.n
+
+    @property
+    def pvariance(self) -> float | None:
+        if not self.n:
+            return None
+        # Exact integer arithmetic before the single division
+        return (self.n * self.squares - self.total**2) / self.n**2
+
+    def describe(self) -> str:
+        if not self.n:
+            return "-"
+        return f"{self.mean:,.2f} ± {math.sqrt(self.pvariance):,.2f}"
+
+
+def point_biserial(without: Moments, with_: Moments) -> float | None:
+    """
+    Correlate a dichotomous variable with a continuous one from the moments \
+        of the continuous variable in each of the two groups. The result is \
+        Pearson's correlation coefficient of the two variables.
+
+    Args:
+        without (Moments): Moments of the group coded 0.
+        with_ (Moments): Moments of the group coded 1.
+
+    Returns:
+        float | None: Correlation coefficient, unless it is undefined.
+    """
+
+    both = without + with_
+    if not without.n or not with_.n or not both.pvariance:
+        return None
+    p = with_.n / both.n
+    difference = with_.mean - without.mean
+    return difference * math.sqrt(p * (1 - p)) / math.sqrt(both.pvariance)
+
+
+def build_summary_query() -> str:
+    sums = ", ".join(f"sum({c}) AS {c}" for c in SUMMARY_COLUMNS)
+    return f"""
+SELECT work_type, has_refs, {sums}
+FROM {SUMMARY_VIEWS[0]}
+GROUP BY work_type, has_refs
+ORDER BY works DESC
+"""
+
+
+def build_delay_query() -> str:
+    return f"""
+SELECT has_refs, delay_years, sum(works) AS works
+FROM {SUMMARY_VIEWS[1]}
+GROUP BY has_refs, delay_years
+ORDER BY delay_years, has_refs
+"""
+
+
+def citation_moments(row: dict) -> tuple[Moments, Moments]:
+    """Moments of the incoming and outgoing citations of a summary row."""
+
+    incoming = Moments(
+        n=row["citations_incoming_works"],
+        total=row["citations_incoming_sum"],
+        squares=row["citations_incoming_sumsq"],
+    )
+    outgoing = Moments(
+        n=row["works"],
+        total=row["citations_outgoing_sum"],
+        squares=row["citations_outgoing_sumsq"],
+    )
+    return incoming, outgoing
+
+
+def summarize_works(database_name: str):
+    console = Console()
+    db = ClickHouseDB(database_name=database_name)
+    # The summary only reads the views, which the commands that migrate or
+    # insert into the works table create
+    for view in SUMMARY_VIEWS:
+        if not db.client.command(f"EXISTS TABLE {view}"):
+            raise NoSummaryException(database_name)
+    rows = list(db.client.query(build_summary_query()).named_results())
+    if not rows:
+        raise NoSummaryException(database_name)
+    delays = list(db.client.query(build_delay_query()).named_results())
+
+    # Fold the work types into each value of has_refs
+    works = {False: 0, True: 0}
+    incoming = {False: Moments(), True: Moments()}
+    outgoing = {False: Moments(), True: Moments()}
+    types: dict[str, dict[bool, int]] = {}
+    for row in rows:
+        has_refs = bool(row["has_refs"])
+        row_incoming, row_outgoing = citation_moments(row)
+        works[has_refs] += row["works"]
+        incoming[has_refs] += row_incoming
+        outgoing[has_refs] += row_outgoing
+        counts = types.setdefault(row["work_type"] or "unknown", {})
+        counts[has_refs] = counts.get(has_refs, 0) + row["works"]
+    total = sum(works.values())
+
+    table = Table(title="Sampled works by references", caption=PER_SAMPLE_CAPTION)
+    for column in ["Has references", "Samples", "Share"]:
+        table.add_column(column, justify="right")
+    table.add_column("Incoming citations", justify="right")
+    table.add_column("Outgoing citations", justify="right")
+    for has_refs in (False, True):
+        table.add_row(
+            str(has_refs),
+            f"{works[has_refs]:,}",
+            f"{works[has_refs] / total:.1%}",
+            incoming[has_refs].describe(),
+            outgoing[has_refs].describe(),
+        )
+    console.print(table)
+    r = point_biserial(without=incoming[False], with_=incoming[True])
+    if r is not None:
+        console.print(
+            f"Point-biserial correlation of has_refs and incoming "
+            f"citations: {r:.4f}"
+        )
+
+    table = Table(title="Sampled work types", caption=PER_SAMPLE_CAPTION)
+    table.add_column("Type of work")
+    table.add_column("Samples", justify="right")
+    table.add_column("With references", justify="right")
+    by_size = sorted(types.items(), key=lambda t: -sum(t[1].values()))
+    for work_type, counts in by_size:
+        n = sum(counts.values())
+        table.add_row(
+            work_type,
+            f"{n:,}",
+            f"{counts.get(True, 0) / n:.1%}",
+        )
+    console.print(table)
+
+    table = Table(title="Sampled deposit delay", caption=PER_SAMPLE_CAPTION)
+    table.add_column("Years", justify="right")
+    table.add_column("Without references", justify="right")
+    table.add_column("With references", justify="right")
+    histogram: dict[int, dict[bool, int]] = {}
+    for row in delays:
+        counts = histogram.setdefault(row["delay_years"], {})
+        counts[bool(row["has_refs"])] = row["works"]
+    for years, counts in histogram.items():
+        table.add_row(
+            str(years),
+            f"{counts.get(False, 0):,}",
+            f"{counts.get(True, 0):,}",
+        )
+    console.print(table)
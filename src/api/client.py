@@ -1,29 +1,111 @@
+import asyncio
+import itertools
+import json
+import multiprocessing
 import os
-from typing import Generator
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncGenerator, Callable, Generator, Iterable
+from urllib.parse import quote
 
-from minet.executors import HTTPThreadPoolExecutor
+import aiohttp
 
+from src.api.cache import ResponseCache
+from src.api.models.batch import CreativeWorkBatch, CrossrefMemberBatch
 from src.api.models.member import CrossrefMember
-from src.api.models.work import CreativeWork
+from src.api.parse import load_member, load_works, parse_works
+from src.api.rate_limit import AdaptiveRateLimiter
 
-MEMBERS_BASE = "https://api.crossref.org/members/"
-WORKS_BASE = "https://api.crossref.org/works?sample=100"
+API_BASE = "https://api.crossref.org"
 SELECT_FILTER = "&select=DOI%2Cmember%2Cdeposited%2Ccreated%2Ctype%2Creferences-count%2Cis-referenced-by-count"
 
+# Maximum number of requests kept in flight at the same time
+DEFAULT_CONCURRENCY = 25
 
-class Client:
+# Largest page size accepted by the API's deep paging and list endpoints
+CURSOR_ROWS = 1000
+
+# Retries of a failed request, with exponential backoff (in seconds)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+# Statuses of responses that are worth requesting again
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Samples requested per round when their number is not bounded, so that the
+# failures of a round are known before the next round starts
+SAMPLE_ROUND = 500
+
+
+class RequestFailedException(Exception):
+    """The API request did not return a successful response."""
+
+    def __init__(self, url: str, status: int | None = None) -> None:
+        super().__init__(url, status)
+        self.url = url
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        """Transport errors and transient statuses are worth retrying."""
+
+        return self.status is None or self.status in RETRY_STATUSES
+
+
+class HarvestInterruptedException(Exception):
+    """A page of the deep-paging cursor could not be collected, so the \
+        harvest cannot continue from where it stopped."""
+
+
+class AsyncClient:
     """
-    High-level Python API client for the Crossref API and for collecting \
-        select data according to pre-defined models.
+    Asynchronous Python API client for the Crossref API. All requests share \
+        one connection pool, whose keep-alive connections are reused from \
+        one call to the next, and no more than `concurrency` requests are \
+        in flight at any time. When a rate limiter is given, every request \
+        waits for its turn and the limiter may lower the concurrency further. \
+        When a response cache is given, member lookups are answered from it \
+        before the API is called. Failed requests are retried with \
+        exponential backoff and, if they still fail, queued to be retried \
+        once more at the end of the run. When parse workers are given, \
+        samples' raw responses are parsed and modelled in a pool of \
+        processes rather than on the event loop.
     """
 
-    def __init__(self, mailto: str | None = None) -> None:
+    def __init__(
+        self,
+        mailto: str | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        base_url: str = API_BASE,
+        limiter: AdaptiveRateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        parse_workers: int | None = None,
+    ) -> None:
         """
         Prepare for the client to specify a user-agent in the API call.
 
         Args:
             mailto (str | None, optional): The email address to add to the \
                 URI. Defaults to None.
+            concurrency (int, optional): Maximum number of requests in \
+                flight. Defaults to DEFAULT_CONCURRENCY.
+            base_url (str, optional): Root of the API. Defaults to API_BASE.
+            limiter (AdaptiveRateLimiter | None, optional): Scheduler that \
+                paces the requests. Defaults to None.
+            cache (ResponseCache | None, optional): On-disk cache of member \
+                responses. Defaults to None.
+            retries (int, optional): Number of times a failed request is \
+                retried. Defaults to DEFAULT_RETRIES.
+            backoff (float, optional): Base delay, in seconds, of the \
+                exponential backoff. Defaults to DEFAULT_BACKOFF.
+            parse_workers (int | None, optional): Number of processes that \
+                parse the samples' responses. Defaults to None, which parses \
+                them on the event loop.
         """
         if not mailto:
             mailto = os.environ.get("MAILTO")
@@ -32,6 +114,51 @@ class Client:
             self.mailto = f"&mailto={mailto}"
         else:
             self.mailto = ""
+        self.concurrency = concurrency
+        self.base_url = base_url.rstrip("/")
+        self.limiter = limiter
+        self.cache = cache
+        self.retries = retries
+        self.backoff = backoff
+        self.failures: list[RequestFailedException] = []
+        self.parse_workers = parse_workers
+        self.parser: ProcessPoolExecutor | None = None
+        self.session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "AsyncClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Open the shared connection pool, if it is not already open."""
+
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                keepalive_timeout=30,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        if self.parse_workers and self.parser is None:
+            # Spawn, rather than fork, the workers because the event loop's
+            # process has threads of its own
+            self.parser = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    async def close(self) -> None:
+        """Close the connection pool, its keep-alive connections and the \
+            pool of parse workers."""
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.parser is not None:
+            self.parser.shutdown(cancel_futures=True)
+            self.parser = None
 
     def build_members_endpoint(self, id: str) -> str:
         """
@@ -43,64 +170,701 @@ class Client:
         Returns:
             str: URI for the API request.
         """
-        return f"{MEMBERS_BASE}{id}"
+        return f"{self.base_url}/members/{id}"
 
-    def build_works_endpoint(self, has_references: bool) -> str:
+    def build_members_page_endpoint(
+        self,
+        offset: int = 0,
+        rows: int = CURSOR_ROWS,
+    ) -> str:
         """
-        Build the URI for collecting select metadata from samples of works. \
-            The samples are defined by whether the work has references.
+        Build the URI for collecting one page of the list of all members.
 
         Args:
-            has_references (bool): Value of the API's has-references filter.
+            offset (int, optional): Position of the page's first member. \
+                Defaults to 0.
+            rows (int, optional): Number of members per page. Defaults to \
+                CURSOR_ROWS.
 
         Returns:
             str: URI for the API request.
         """
+        base = f"{self.base_url}/members?rows={rows}&offset={offset}"
+        return base + self.mailto
+
+    def build_references_filter(self, has_references: bool) -> str:
+        """
+        Build the URI parameter for the API's has-references filter.
+
+        Args:
+            has_references (bool): Value of the API's has-references filter.
+
+        Returns:
+            str: Filter parameter of the URI.
+        """
 
         ref_filter = "&filter=has-references%3A"
         if has_references:
             ref_filter += "1"
         else:
             ref_filter += "0"
-        return WORKS_BASE + self.mailto + SELECT_FILTER + ref_filter
-
-    def get_members(
-        self, ids: list[str]
-    ) -> Generator[list[CrossrefMember], None, None]:
-        urls = [self.build_members_endpoint(id=id) for id in ids]
-        with HTTPThreadPoolExecutor() as executor:
-            for result in executor.request(urls):
-                if result and result.response and result.response.status == 200:
-                    # Parse the API response
-                    message = result.response.json()["message"]
-                    yield CrossrefMember.load_json(message=message)
+        return ref_filter
 
-    def get_samples(
+    def build_works_endpoint(self, has_references: bool) -> str:
+        """
+        Build the URI for collecting select metadata from samples of works. \
+            The samples are defined by whether the work has references.
+
+        Args:
+            has_references (bool): Value of the API's has-references filter.
+
+        Returns:
+            str: URI for the API request.
+        """
+
+        base = f"{self.base_url}/works?sample=100"
+        ref_filter = self.build_references_filter(has_references)
+        return base + self.mailto + SELECT_FILTER + ref_filter
+
+    def build_cursor_endpoint(
         self,
         has_references: bool,
-        n: int = 10,
-    ) -> Generator[list[CreativeWork], None, None]:
+        cursor: str = "*",
+        rows: int = CURSOR_ROWS,
+    ) -> str:
         """
-        Collect samples of works from the API, and as each sample is \
-            returned, model the works' metadata and yeild the modelled batch.
+        Build the URI for collecting one page of works with the API's deep \
+            paging. Unlike samples, the pages never return the same work \
+            twice.
 
         Args:
             has_references (bool): Value of the API's has-references filter.
-            n (int, optional): Number of samples. Defaults to 10.
+            cursor (str, optional): Cursor returned by the previous page. \
+                Defaults to "*", which starts a new harvest.
+            rows (int, optional): Number of works per page. Defaults to \
+                CURSOR_ROWS.
+
+        Returns:
+            str: URI for the API request.
+        """
+
+        base = f"{self.base_url}/works?rows={rows}&cursor={quote(cursor)}"
+        ref_filter = self.build_references_filter(has_references)
+        return base + self.mailto + SELECT_FILTER + ref_filter
+
+    async def fetch(
+        self,
+        url: str,
+        cached: bool = False,
+        raw: bool = False,
+    ) -> dict | bytes:
+        """
+        Request a URI and parse the JSON response.
+
+        Args:
+            url (str): URI for the API request.
+            cached (bool, optional): Whether to consult and fill the client's \
+                response cache. Defaults to False.
+            raw (bool, optional): Whether to return the response's body \
+                without parsing it. Defaults to False.
+
+        Raises:
+            RequestFailedException: The request failed or its response was \
+                not successful.
+
+        Returns:
+            dict | bytes: Parsed response, or its raw body.
+        """
+
+        if cached and self.cache:
+            body = self.cache.get(url)
+            if body is not None:
+                return body if raw else json.loads(body)
+
+        await self.open()
+        if self.limiter:
+            await self.limiter.acquire()
+        start = time.monotonic()
+        try:
+            async with self.session.get(url) as response:
+                if self.limiter:
+                    self.limiter.update(
+                        status=response.status,
+                        headers=response.headers,
+                        latency=time.monotonic() - start,
+                    )
+                if response.status != 200:
+                    raise RequestFailedException(url, response.status)
+                body = await response.read()
+            response = body if raw else json.loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if self.limiter:
+                self.limiter.update(status=None)
+            raise RequestFailedException(url) from e
+        if cached and self.cache:
+            self.cache.put(url, body)
+        return response
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Compute the delay before retrying a request, with exponential backoff \
+            and full jitter so that failed requests do not retry in lockstep.
+
+        Args:
+            attempt (int): Number of the attempt that failed, from 0.
+
+        Returns:
+            float: Delay in seconds.
+        """
+
+        ceiling = min(MAX_BACKOFF, self.backoff * 2**attempt)
+        return random.uniform(0, ceiling)
+
+    async def fetch_with_retries(
+        self,
+        url: str,
+        cached: bool = False,
+        raw: bool = False,
+    ) -> dict | bytes:
+        """
+        Request a URI, retrying transient failures with exponential backoff.
+
+        Args:
+            url (str): URI for the API request.
+            cached (bool, optional): Whether to consult and fill the client's \
+                response cache. Defaults to False.
+            raw (bool, optional): Whether to return the response's body \
+                without parsing it. Defaults to False.
+
+        Raises:
+            RequestFailedException: Every attempt failed, or the failure is \
+                not worth retrying.
+
+        Returns:
+            dict | bytes: Parsed response, or its raw body.
+        """
+
+        for attempt in range(self.retries + 1):
+            try:
+                return await self.fetch(url, cached, raw)
+            except RequestFailedException as e:
+                if not e.retryable or attempt == self.retries:
+                    raise
+            await asyncio.sleep(self.backoff_delay(attempt))
+
+    @property
+    def window(self) -> int:
+        """Number of requests that may currently be in flight."""
+
+        if self.limiter:
+            return min(self.concurrency, self.limiter.concurrency)
+        return self.concurrency
+
+    async def request(
+        self,
+        urls: Iterable[str],
+        cached: bool = False,
+        raw: bool = False,
+    ) -> AsyncGenerator[dict | bytes, None]:
+        """
+        Request every URI, keeping at most `window` requests in flight, \
+            and yield the parsed responses in order of completion. Requests \
+            that still fail after their retries are queued and retried once \
+            more after every other URI has been requested; those that fail \
+            again are recorded in the client's `failures`.
+
+        Args:
+            urls (Iterable[str]): URIs for the API requests. The iterable is \
+                consumed lazily, so it can be unbounded.
+            cached (bool, optional): Whether to consult and fill the client's \
+                response cache. Defaults to False.
+            raw (bool, optional): Whether to yield the responses' bodies \
+                without parsing them. Defaults to False.
 
         Yields:
-            Generator[list[CreativeWork], None, None]: Modelled works metadata.
+            AsyncGenerator[dict | bytes, None]: Parsed API responses, or \
+                their raw bodies.
         """
 
-        url = self.build_works_endpoint(has_references=has_references)
-        urls = [url] * n
-        with HTTPThreadPoolExecutor() as executor:
-            for result in executor.request(urls):
-                if result.response.status == 200:
-                    # Parse the API response
-                    items = result.response.json()["message"]["items"]
-                    records = [
-                        CreativeWork.load_json(item=i, has_refs=has_references)
-                        for i in items
+        queue = []
+        async for response in self.request_window(urls, cached, raw, queue):
+            yield response
+        if queue:
+            async for response in self.request_window(queue, cached, raw):
+                yield response
+
+    async def request_window(
+        self,
+        urls: Iterable[str],
+        cached: bool = False,
+        raw: bool = False,
+        failure_queue: list[str] | None = None,
+    ) -> AsyncGenerator[dict | bytes, None]:
+        """
+        Request every URI through a sliding window of concurrent requests.
+
+        Args:
+            urls (Iterable[str]): URIs for the API requests.
+            cached (bool, optional): Whether to consult and fill the client's \
+                response cache. Defaults to False.
+            raw (bool, optional): Whether to yield the responses' bodies \
+                without parsing them. Defaults to False.
+            failure_queue (list[str] | None, optional): Where to queue the \
+                URIs of retryable failures. Defaults to None, which records \
+                every failure in the client's `failures`.
+
+        Yields:
+            AsyncGenerator[dict | bytes, None]: Parsed API responses, or \
+                their raw bodies.
+        """
+
+        urls = iter(urls)
+        pending = set()
+        try:
+            while True:
+                while len(pending) < self.window:
+                    url = next(urls, None)
+                    if url is None:
+                        break
+                    task = self.fetch_with_retries(url, cached, raw)
+                    pending.add(asyncio.create_task(task))
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    try:
+                        result = task.result()
+                    except RequestFailedException as e:
+                        if e.retryable and failure_queue is not None:
+                            failure_queue.append(e.url)
+                        else:
+                            self.failures.append(e)
+                        continue
+                    yield result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_members(
+        self, ids: Iterable[str]
+    ) -> AsyncGenerator[CrossrefMember, None]:
+        """
+        Collect members from the API, or from the response cache when it \
+            holds them, and yield each modelled member.
+
+        Args:
+            ids (Iterable[str]): IDs of the Crossref members.
+
+        Yields:
+            AsyncGenerator[CrossrefMember, None]: Modelled member metadata.
+        """
+
+        urls = (self.build_members_endpoint(id=id) for id in ids)
+        async for response in self.request(urls, cached=True):
+            record = load_member(message=response["message"])
+            if record is not None:
+                yield record
+
+    async def get_member_pages(
+        self,
+        ids: Iterable[str],
+        rows: int = CURSOR_ROWS,
+    ) -> AsyncGenerator[CrossrefMemberBatch, None]:
+        """
+        Page through the list of all members, a thousand at a time, and \
+            yield the modelled members of each page that are among the \
+            requested IDs. The pages are requested concurrently, and the \
+            paging stops as soon as every requested member has been found.
+
+        Args:
+            ids (Iterable[str]): IDs of the Crossref members.
+            rows (int, optional): Number of members per page. Defaults to \
+                CURSOR_ROWS.
+
+        Yields:
+            AsyncGenerator[CrossrefMemberBatch, None]: Modelled members.
+        """
+
+        wanted = set(ids)
+        if not wanted:
+            return
+        url = self.build_members_page_endpoint(rows=0)
+        total = (await self.fetch_with_retries(url))["message"]["total-results"]
+        urls = (
+            self.build_members_page_endpoint(offset=offset, rows=rows)
+            for offset in range(0, total, rows)
+        )
+        pages = self.request(urls)
+        try:
+            async for response in pages:
+                records = CrossrefMemberBatch.load_json(
+                    messages=[
+                        item
+                        for item in response["message"]["items"]
+                        if str(item["id"]) in wanted
                     ]
+                )
+                wanted.difference_update(records.column("id").to_pylist())
+                if records:
                     yield records
+                if not wanted:
+                    return
+        finally:
+            await pages.aclose()
+
+    async def get_samples(
+        self,
+        has_references: bool,
+        n: int | None = 10,
+    ) -> AsyncGenerator[CreativeWorkBatch, None]:
+        """
+        Collect samples of works from the API, and as each sample is \
+            returned, model the works' metadata and yield the modelled batch. \
+            The samples whose requests failed, even from the failure queue, \
+            are requested again for as long as each round delivers some \
+            samples, so that n samples are delivered unless the API stops \
+            answering. Only the failures of the last round are recorded in \
+            the client's `failures`.
+
+        Args:
+            has_references (bool): Value of the API's has-references filter.
+            n (int | None, optional): Number of samples. Defaults to 10. If \
+                None, samples are collected in rounds of SAMPLE_ROUND until \
+                the consumer stops, or until a whole round fails.
+
+        Yields:
+            AsyncGenerator[CreativeWorkBatch, None]: Modelled works metadata.
+        """
+
+        url = self.build_works_endpoint(has_references=has_references)
+        while n != 0:
+            failed = len(self.failures)
+            delivered = 0
+            async for records in self.request_samples(
+                urls=itertools.repeat(url, SAMPLE_ROUND if n is None else n),
+                has_references=has_references,
+            ):
+                delivered += 1
+                yield records
+            # The API stopped answering, so the round's failures are kept
+            if not delivered:
+                return
+            if n is not None:
+                n = len(self.failures) - failed
+            # Top up the samples of the failed requests
+            del self.failures[failed:]
+
+    async def request_samples(
+        self,
+        urls: Iterable[str],
+        has_references: bool,
+    ) -> AsyncGenerator[CreativeWorkBatch, None]:
+        """
+        Request samples of works and yield the modelled batches, parsed in \
+            the pool of parse workers if the client has one.
+
+        Args:
+            urls (Iterable[str]): URIs of the samples.
+            has_references (bool): Value of the API's has-references filter.
+
+        Yields:
+            AsyncGenerator[CreativeWorkBatch, None]: Modelled works metadata.
+        """
+
+        if self.parse_workers:
+            await self.open()
+            bodies = self.request(urls, raw=True)
+            async for records in self.parse_in_pool(
+                bodies,
+                parse_works,
+                has_references,
+            ):
+                yield records
+            return
+
+        async for response in self.request(urls):
+            items = response["message"]["items"]
+            yield CreativeWorkBatch.load_json(
+                items=items,
+                has_refs=has_references,
+            )
+
+    async def parse_in_pool(
+        self,
+        bodies: AsyncGenerator[bytes, None],
+        parse: Callable,
+        *args,
+    ) -> AsyncGenerator:
+        """
+        Ship raw response bodies to the pool of parse workers and yield the \
+            parsed results in the order the bodies arrived. Up to two jobs \
+            per worker are queued, while the requests keep running.
+
+        Args:
+            bodies (AsyncGenerator[bytes, None]): Raw response bodies.
+            parse (Callable): Module-level parser of a body.
+            args: Extra arguments of the parser.
+
+        Yields:
+            AsyncGenerator: Parsed results.
+        """
+
+        loop = asyncio.get_running_loop()
+        jobs = deque()
+        try:
+            async for body in bodies:
+                jobs.append(loop.run_in_executor(self.parser, parse, body, *args))
+                while jobs and (jobs[0].done() or len(jobs) >= 2 * self.parse_workers):
+                    yield await jobs.popleft()
+            while jobs:
+                yield await jobs.popleft()
+        finally:
+            for job in jobs:
+                job.cancel()
+            await bodies.aclose()
+
+    async def count_works(self, has_references: bool) -> int:
+        """
+        Count the works that match the has-references filter.
+
+        Args:
+            has_references (bool): Value of the API's has-references filter.
+
+        Returns:
+            int: Total number of matching works.
+        """
+
+        url = self.build_cursor_endpoint(has_references=has_references, rows=0)
+        try:
+            response = await self.fetch_with_retries(url)
+        except RequestFailedException as e:
+            raise HarvestInterruptedException from e
+        return response["message"]["total-results"]
+
+    async def harvest(
+        self,
+        has_references: bool,
+        rows: int = CURSOR_ROWS,
+        limit: int | None = None,
+        arrow: bool = False,
+    ) -> AsyncGenerator[CreativeWorkBatch, None]:
+        """
+        Walk the API's deep-paging cursor and yield each page of modelled \
+            works as it arrives. The next page is requested while the \
+            current one is being consumed.
+
+        Args:
+            has_references (bool): Value of the API's has-references filter.
+            rows (int, optional): Number of works per page. Defaults to \
+                CURSOR_ROWS.
+            limit (int | None, optional): Stop after this many works. \
+                Defaults to None, which walks every page.
+            arrow (bool, optional): Whether to parse each page column by \
+                column, in Arrow's kernels, rather than work by work. \
+                Defaults to False.
+
+        Raises:
+            HarvestInterruptedException: A page could not be collected.
+
+        Yields:
+            AsyncGenerator[CreativeWorkBatch, None]: Modelled works metadata.
+        """
+
+        def request_page(cursor: str) -> asyncio.Task:
+            url = self.build_cursor_endpoint(
+                has_references=has_references,
+                cursor=cursor,
+                rows=rows,
+            )
+            return asyncio.create_task(self.fetch_with_retries(url))
+
+        harvested = 0
+        task = request_page("*")
+        try:
+            while True:
+                try:
+                    response = await task
+                except RequestFailedException as e:
+                    raise HarvestInterruptedException from e
+                message = response["message"]
+                items = message["items"]
+                if limit is not None:
+                    items = items[: limit - harvested]
+                harvested += len(items)
+
+                # Prefetch the next page before handing over the current one
+                done = len(items) == 0 or harvested == limit
+                if not done:
+                    task = request_page(message["next-cursor"])
+
+                if items and arrow:
+                    yield CreativeWorkBatch.load_json(
+                        items=items,
+                        has_refs=has_references,
+                    )
+                elif items:
+                    yield CreativeWorkBatch.from_records(
+                        load_works(items=items, has_refs=has_references)
+                    )
+                if done:
+                    return
+        finally:
+            task.cancel()
+
+
+class Client:
+    """
+    High-level Python API client for the Crossref API and for collecting \
+        select data according to pre-defined models. It is a synchronous \
+        wrapper around the AsyncClient, which runs on the client's own event \
+        loop so that the connection pool is kept between calls.
+    """
+
+    def __init__(self, mailto: str | None = None, **options) -> None:
+        """
+        Prepare for the client to specify a user-agent in the API call.
+
+        Args:
+            mailto (str | None, optional): The email address to add to the \
+                URI. Defaults to None.
+            options: Concurrency, base URL, rate limiter, response cache, \
+                retries and parse workers, passed on to the AsyncClient.
+        """
+        self.async_client = AsyncClient(mailto=mailto, **options)
+        self.loop = asyncio.new_event_loop()
+
+    @property
+    def limiter(self) -> AdaptiveRateLimiter | None:
+        return self.async_client.limiter
+
+    @property
+    def cache(self) -> ResponseCache | None:
+        return self.async_client.cache
+
+    @property
+    def failures(self) -> list[RequestFailedException]:
+        return self.async_client.failures
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection pool and the client's event loop."""
+
+        if not self.loop.is_closed():
+            self.loop.run_until_complete(self.async_client.close())
+            self.loop.close()
+
+    def build_members_endpoint(self, id: str) -> str:
+        return self.async_client.build_members_endpoint(id=id)
+
+    def build_works_endpoint(self, has_references: bool) -> str:
+        return self.async_client.build_works_endpoint(
+            has_references=has_references,
+        )
+
+    def build_cursor_endpoint(
+        self,
+        has_references: bool,
+        cursor: str = "*",
+        rows: int = CURSOR_ROWS,
+    ) -> str:
+        return self.async_client.build_cursor_endpoint(
+            has_references=has_references,
+            cursor=cursor,
+            rows=rows,
+        )
+
+    def iterate(self, agen: AsyncGenerator) -> Generator:
+        """
+        Drive an asynchronous generator on the client's event loop and yield \
+            its items synchronously.
+        """
+
+        try:
+            while True:
+                try:
+                    yield self.loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            self.loop.run_until_complete(agen.aclose())
+
+    def get_members(self, ids: Iterable[str]) -> Generator[CrossrefMember, None, None]:
+        yield from self.iterate(self.async_client.get_members(ids=ids))
+
+    def get_member_pages(
+        self,
+        ids: Iterable[str],
+        rows: int = CURSOR_ROWS,
+    ) -> Generator[CrossrefMemberBatch, None, None]:
+        yield from self.iterate(self.async_client.get_member_pages(ids=ids, rows=rows))
+
+    def get_samples(
+        self,
+        has_references: bool,
+        n: int | None = 10,
+    ) -> Generator[CreativeWorkBatch, None, None]:
+        """
+        Collect samples of works from the API, and as each sample is \
+            returned, model the works' metadata and yield the modelled batch. \
+            The samples of failed requests are requested again, for as long \
+            as the API answers some of them.
+
+        Args:
+            has_references (bool): Value of the API's has-references filter.
+            n (int | None, optional): Number of samples. Defaults to 10. If \
+                None, samples are collected until the consumer stops.
+
+        Yields:
+            Generator[CreativeWorkBatch, None, None]: Modelled works metadata.
+        """
+
+        yield from self.iterate(
+            self.async_client.get_samples(has_references=has_references, n=n)
+        )
+
+    def count_works(self, has_references: bool) -> int:
+        return self.loop.run_until_complete(
+            self.async_client.count_works(has_references=has_references)
+        )
+
+    def harvest(
+        self,
+        has_references: bool,
+        rows: int = CURSOR_ROWS,
+        limit: int | None = None,
+        arrow: bool = False,
+    ) -> Generator[CreativeWorkBatch, None, None]:
+        """
+        Walk the API's deep-paging cursor and yield each page of modelled \
+            works as it arrives.
+
+        Args:
+            has_references (bool): Value of the API's has-references filter.
+            rows (int, optional): Number of works per page. Defaults to \
+                CURSOR_ROWS.
+            limit (int | None, optional): Stop after this many works. \
+                Defaults to None, which walks every page.
+            arrow (bool, optional): Whether to parse each page column by \
+                column, in Arrow's kernels, rather than work by work. \
+                Defaults to False.
+
+        Yields:
+            Generator[CreativeWorkBatch, None, None]: Modelled works metadata.
+        """
+
+        yield from self.iterate(
+            self.async_client.harvest(
+                has_references=has_references,
+                rows=rows,
+                limit=limit,
+                arrow=arrow,
+            )
+        )
@@ -1,3 +1,13 @@
+import os
+
 CLICKHOUSE_HOST = "localhost"
 CLICKHOUSE_PORT = 8123
 CLICKHOUSE_DATABASE = "crossref"
+
+# Settings of the connections to ClickHouse, which the CLI's options and
+# these environment variables can override
+CLICKHOUSE_COMPRESSION = os.environ.get("CLICKHOUSE_COMPRESSION", "lz4")
+CLICKHOUSE_SEND_RECEIVE_TIMEOUT = int(
+    os.environ.get("CLICKHOUSE_SEND_RECEIVE_TIMEOUT", 300)
+)
+CLICKHOUSE_ASYNC_INSERT = os.environ.get("CLICKHOUSE_ASYNC_INSERT") == "1"
@@ -1,46 +1,186 @@
-from datetime import datetime
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable, Sequence
 
 import click
 import clickhouse_connect
+import pyarrow as pa
+from clickhouse_connect.driver.exceptions import OperationalError
 
-from src.api.cli.logs import LOG_DIR
-from src.api.constants import CLICKHOUSE_HOST, CLICKHOUSE_PORT
+from src.api.constants import (
+    CLICKHOUSE_ASYNC_INSERT,
+    CLICKHOUSE_COMPRESSION,
+    CLICKHOUSE_HOST,
+    CLICKHOUSE_PORT,
+    CLICKHOUSE_SEND_RECEIVE_TIMEOUT,
+)
+from src.api.migration import MigrationLog, plan_migration
 from src.api.models.base import BaseModel
+from src.api.models.batch import ModelBatch
+from src.api.quarantine import INSERT_STAGE, Quarantine
 
-INVALID_RECORDS = LOG_DIR.joinpath("invalid_records_chunk.json")
+# Flush thresholds of the buffered inserter
+BUFFER_ROWS = 100_000
+BUFFER_BYTES = 64 * 1024**2
+BUFFER_SECONDS = 10.0
+BUFFER_PENDING = 4
 
 
-class ClickHouseDB:
-    host = CLICKHOUSE_HOST
-    port = CLICKHOUSE_PORT
+COMPRESSION_CHOICES = ["lz4", "zstd", "gzip", "none"]
+
+# Settings of the connections opened by the connection factory
+CONNECTION_SETTINGS = {
+    "compression": CLICKHOUSE_COMPRESSION,
+    "send_receive_timeout": CLICKHOUSE_SEND_RECEIVE_TIMEOUT,
+    "async_insert": CLICKHOUSE_ASYNC_INSERT,
+}
+
+# Clients opened by this process, by database and connection settings
+_clients: dict[tuple, clickhouse_connect.driver.Client] = {}
+_clients_lock = threading.Lock()
+
+
+def configure_connections(**settings) -> None:
+    """
+    Change the settings of the connections opened from now on, such as from \
+        the CLI's options.
+
+    Args:
+        settings: Any of "compression", "send_receive_timeout" and \
+            "async_insert".
+    """
+
+    unknown = set(settings) - set(CONNECTION_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown connection settings: {sorted(unknown)}")
+    CONNECTION_SETTINGS.update(settings)
+
+
+def client_options(
+    compression: str,
+    send_receive_timeout: int,
+    async_insert: bool,
+) -> dict:
+    """
+    Translate the connection settings into clickhouse-connect's options.
+
+    Args:
+        compression (str): Compression of inserts and query results, one of \
+            COMPRESSION_CHOICES.
+        send_receive_timeout (int): Seconds before a request times out.
+        async_insert (bool): Whether the server buffers small inserts and \
+            writes them together, acknowledging them once written.
+
+    Returns:
+        dict: Keyword arguments of clickhouse_connect.get_client.
+    """
+
+    settings = {}
+    if async_insert:
+        settings = {"async_insert": 1, "wait_for_async_insert": 1}
+    return {
+        "compress": False if compression == "none" else compression,
+        "send_receive_timeout": send_receive_timeout,
+        "settings": settings,
+        # Without a session, the client can be shared by the threads of
+        # the process, such as the buffered inserter's
+        "autogenerate_session_id": False,
+    }
+
+
+def connect(database_name: str) -> clickhouse_connect.driver.Client:
+    """
+    Return this process's client of a database, opening it on first use. \
+        Opening a client bootstraps the database, which is created if it \
+        does not exist yet, then keeps the connection for later calls.
+
+    Args:
+        database_name (str): Name of the database in the ClickHouse server \
+            instance.
+
+    Returns:
+        clickhouse_connect.driver.Client: Client set to the database.
+    """
+
+    settings = tuple(sorted(CONNECTION_SETTINGS.items()))
+    key = (os.getpid(), database_name, settings)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = clickhouse_connect.get_client(
+                host=CLICKHOUSE_HOST,
+                port=CLICKHOUSE_PORT,
+                **client_options(**CONNECTION_SETTINGS),
+            )
+            client.command(f"CREATE DATABASE IF NOT EXISTS {database_name}")
+            client.database = database_name
+            _clients[key] = client
+    return client
+
+
+def insert_bisecting(
+    rows: Sequence,
+    insert: Callable[[Sequence], None],
+    reject: Callable[[Sequence, Exception], None],
+) -> int:
+    """
+    Insert rows, and if they are rejected, split them in halves and insert \
+        each half in turn, until the rejected rows are isolated. The rows \
+        that are accepted are inserted and each rejected row is handed over \
+        on its own. A connection error is raised, since no row is at fault.
+
+    Args:
+        rows (Sequence): Rows to insert, such as records or an Arrow table.
+        insert (Callable[[Sequence], None]): Inserts a slice of the rows.
+        reject (Callable[[Sequence, Exception], None]): Receives a rejected \
+            row, as a slice of one row, and the error it raised.
+
+    Returns:
+        int: Number of rejected rows.
+    """
 
-    def __init__(self, database_name: str) -> None:
+    if len(rows) == 0:
+        return 0
+    try:
+        insert(rows)
+        return 0
+    except OperationalError:
+        raise
+    except Exception as e:
+        if len(rows) == 1:
+            reject(rows, e)
+            return 1
+        middle = len(rows) // 2
+        return insert_bisecting(
+            rows=rows[:middle],
+            insert=insert,
+            reject=reject,
+        ) + insert_bisecting(rows=rows[middle:], insert=insert, reject=reject)
+
+
+class ClickHouseDB:
+    def __init__(
+        self,
+        database_name: str,
+        quarantine: Quarantine | None = None,
+    ) -> None:
         """
-        Create an instance of the clickhouse-connect client. If the database \
-            is not already created, create the database.
+        Get this process's clickhouse-connect client of the database. If the \
+            database is not already created, create the database.
 
         Args:
             database_name (str): Name of the database in the ClickHouse \
                 server instance.
+            quarantine (Quarantine | None, optional): Where the rows the \
+                tables reject are kept. Defaults to the log directory's.
         """
-        # Ensure the database is created
+
         self.database_name = database_name
-        self.client = clickhouse_connect.get_client(
-            host=self.host,
-            port=self.port,
-        )
-        db_create_stmt = f"""
-CREATE DATABASE IF NOT EXISTS {database_name}
-"""
-        self.client.command(db_create_stmt)
-
-        # Re-establish the connection and set the client to the database
-        self.client.close()
-        self.client = clickhouse_connect.get_client(
-            host=self.host,
-            port=self.port,
-            database=database_name,
-        )
+        self.client = connect(database_name=database_name)
+        self.quarantine = quarantine or Quarantine()
 
     def insert_single_record(self, record: BaseModel) -> None:
         """
@@ -53,71 +193,99 @@ CREATE DATABASE IF NOT EXISTS {database_name}
             records (BaseModel): An instance of a record's dataclass.
         """
 
-        table = record.name_table()
-        data = [list(record.__dict__.values())]
-        column_names = list(record.__dict__.keys())
-        column_type_names = record.list_column_type_names()
-        try:
-            self.client.insert(
-                table=table,
-                data=data,
-                database=self.database_name,
-                column_names=column_names,
-                column_type_names=column_type_names,
-            )
-
-        # If the SQL command fails, log the invalid records and
-        # abort the process.
-        except Exception as e:
-            import json
-
-            with open(INVALID_RECORDS, "w") as f:
-                obj = {
-                    "error": str(e),
-                    "time": str(datetime.now()),
-                    "items": record.serialize(),
-                }
-                json.dump(obj, f, indent=4)
-            raise e
+        self.insert_records(records=[record])
 
-    def insert_records(self, records: list[BaseModel]) -> None:
+    def insert_records(self, records: list[BaseModel]) -> int:
         """
         Insert a list of modelled data into the relevant ClickHouse DB table. \
             The data needs to be modelled according to a dataclass that \
             inherits from my BaseModel class, which features methods to \
-            prepare the data for insertion into the databaes table.
+            prepare the data for insertion into the databaes table. Rows \
+            rejected by the table are quarantined and the others inserted.
 
         Args:
             records (list[BaseModel]): An instance of a record's dataclass.
+
+        Returns:
+            int: Number of quarantined rows.
         """
 
         model = records[0]
         table = model.name_table()
-        data = [list(r.__dict__.values()) for r in records]
-        column_names = list(model.__dict__.keys())
-        column_type_names = model.list_column_type_names()
-        try:
+        column_names = list(model.schema.columns)
+        column_type_names = list(model.schema.column_types)
+        values = model.schema.values
+
+        def insert(chunk: list[BaseModel]) -> None:
             self.client.insert(
                 table=table,
-                data=data,
+                data=list(map(values, chunk)),
                 database=self.database_name,
                 column_names=column_names,
                 column_type_names=column_type_names,
             )
 
-        # If the SQL command fails, log the invalid records and
-        # abort the process.
-        except Exception as e:
-            import json
+        def reject(chunk: list[BaseModel], error: Exception) -> None:
+            self.quarantine.add(
+                table=table,
+                stage=INSERT_STAGE,
+                items=[r.serialize() for r in chunk],
+                error=error,
+            )
+
+        return insert_bisecting(rows=records, insert=insert, reject=reject)
+
+    def insert_arrow(
+        self,
+        table: BaseModel,
+        batch: pa.RecordBatch | pa.Table,
+    ) -> int:
+        """
+        Insert columnar data into the relevant ClickHouse DB table, without \
+            creating a Python object per row. The data needs to follow the \
+            table's Arrow schema, such as a batch made by the model's \
+            load_arrow method. Rows rejected by the table are quarantined \
+            and the others inserted.
+
+        Args:
+            table (BaseModel): Dataclass that inherits from the BaseModel and \
+                represents a ClickHouse database table.
+            batch (pa.RecordBatch | pa.Table): Rows of the table.
+
+        Returns:
+            int: Number of quarantined rows.
+        """
+
+        if isinstance(batch, pa.RecordBatch):
+            batch = pa.Table.from_batches([batch])
+
+        def insert(chunk: pa.Table) -> None:
+            self.client.insert_arrow(
+                table=table.name_table(),
+                arrow_table=chunk,
+                database=self.database_name,
+            )
 
-            with open(INVALID_RECORDS, "w") as f:
-                obj = {
-                    "error": str(e),
-                    "time": str(datetime.now()),
-                    "items": [r.serialize() for r in records],
-                }
-                json.dump(obj, f, indent=4)
-            raise e
+        def reject(chunk: pa.Table, error: Exception) -> None:
+            self.quarantine.add(
+                table=table.name_table(),
+                stage=INSERT_STAGE,
+                items=chunk.to_pylist(),
+                error=error,
+            )
+
+        return insert_bisecting(rows=batch, insert=insert, reject=reject)
+
+    def buffered_inserter(self, **kwargs) -> "BufferedInserter":
+        """
+        Create a buffered inserter that writes into this database from a \
+            background thread.
+
+        Returns:
+            BufferedInserter: The inserter, to be used as a context manager.
+        """
+
+        return BufferedInserter(db=self, **kwargs)
 
     def recreate_table(self, table: BaseModel, prompt: bool = True) -> None:
         """
@@ -135,6 +303,9 @@ CREATE DATABASE IF NOT EXISTS {database_name}
         q = f"Do you want to drop all the data in table \
 '{table.name_table()}' in database '{self.database_name}'?"
         if not prompt or click.prompt(q):
+            for view in table.materialized_views:
+                for stmt in view.drop_statements():
+                    self.client.command(stmt)
             stmt = table.create_drop_statement()
             self.client.command(stmt)
             self.create_table(table=table)
@@ -142,18 +313,421 @@ CREATE DATABASE IF NOT EXISTS {database_name}
     def create_table(self, table: BaseModel) -> str:
         """
         Create a table in the ClickHouse database to which the client is \
-            connected.
+            connected. If the table already exists, migrate its columns to \
+            the model's in place. A table that could only be migrated by \
+            rebuilding it is left to the 'migrate' command.
 
         Args:
             table (BaseModel): Dataclass that inherits from the BaseModel and \
                 represents a ClickHouse database table.
 
+        Raises:
+            RebuildRequiredException: The table must be rebuilt first.
+
         Returns:
             str: Description of the created table's columns.
         """
 
         table_name = table.name_table()
-        stmt = table.create_table_statement()
-        self.client.command(stmt)
+        self.migrate_table(table=table, rebuild=False)
+        self.create_materialized_views(table=table)
         result = self.client.query(f"DESCRIBE TABLE {table_name}")
         return [r[0:2] for r in result.result_rows]
+
+    def describe_table(self, table: BaseModel) -> dict[str, str]:
+        """
+        Describe the columns of a table as it exists in the database.
+
+        Args:
+            table (BaseModel): Dataclass that inherits from the BaseModel and \
+                represents a ClickHouse database table.
+
+        Returns:
+            dict[str, str]: Types of the columns, by name, or no columns if \
+                the table does not exist.
+        """
+
+        table_name = table.name_table()
+        if not self.client.command(f"EXISTS TABLE {table_name}"):
+            return {}
+        result = self.client.query(f"DESCRIBE TABLE {table_name}")
+        return {r[0]: r[1] for r in result.result_rows}
+
+    def describe_engine(self, table: BaseModel) -> dict[str, str]:
+        """
+        Describe the engine and keys of a table as it exists in the \
+            database, which may predate those its model declares.
+
+        Args:
+            table (BaseModel): Dataclass that inherits from the BaseModel and \
+                represents a ClickHouse database table.
+
+        Returns:
+            dict[str, str]: The table's "engine", "engine_full", \
+                "sorting_key" and "partition_key", or nothing if the table \
+                does not exist.
+        """
+
+        result = self.client.query(
+            """
+SELECT engine, engine_full, sorting_key, partition_key
+FROM system.tables
+WHERE database = currentDatabase() AND name = {table:String}
+""",
+            parameters={"table": table.name_table()},
+        )
+        if not result.result_rows:
+            return {}
+        return dict(zip(result.column_names, result.result_rows[0]))
+
+    def deduplicates(self, table: BaseModel) -> bool:
+        """Whether the table's engine replaces rows with the same key."""
+
+        engine = self.describe_engine(table=table).get("engine", "")
+        return engine.startswith("Replacing")
+
+    def select_from(self, table: BaseModel) -> str:
+        """
+        Compose the FROM target of a query reading a table's unique rows. \
+            With a replacing engine, duplicates not yet merged away are \
+            collapsed at read time with the FINAL modifier. The engine is \
+            the table's own, since a table created before its model declared \
+            a replacing engine rejects the modifier.
+
+        Args:
+            table (BaseModel): Dataclass that inherits from the BaseModel and \
+                represents a ClickHouse database table.
+
+        Returns:
+            str: Table name, with the FINAL modifier if the engine needs it.
+        """
+
+        if self.deduplicates(table=table):
+            return f"{table.name_table()} FINAL"
+        return table.name_table()
+
+    def migrate_table(
+        self,
+        table: BaseModel,
+        dry_run: bool = False,
+        rebuild: bool = True,
+    ) -> list[str]:
+        """
+        Bring a table in line with its model without losing its rows: \
+            create it if it does not exist, otherwise add the columns it \
+            lacks and convert those whose type changed, or rebuild it if its \
+            engine or keys changed. The applied statements are recorded in \
+            the migration log as the table's next version. The views of a \
+            rebuilt table are dropped, to be created again on it.
+
+        Args:
+            table (BaseModel): Dataclass that inherits from the BaseModel and \
+                represents a ClickHouse database table.
+            dry_run (bool, optional): Whether to only compose the statements, \
+                without applying them. Defaults to False.
+            rebuild (bool, optional): Whether the table may be rebuilt, \
+                otherwise only its columns are altered. Defaults to True.
+
+        Raises:
+            RebuildRequiredException: The table must be rebuilt, but may not.
+
+        Returns:
+            list[str]: SQL statements of the migration, empty if the table \
+                is up to date.
+        """
+
+        columns = self.describe_table(table=table)
+        if columns:
+            statements = plan_migration(
+                table=table,
+                columns=columns,
+                engine=self.describe_engine(table=table),
+                rebuild=rebuild,
+            )
+        else:
+            statements = [table.create_table_statement()]
+        if statements and not dry_run:
+            for stmt in statements:
+                self.client.command(stmt)
+            MigrationLog(client=self.client).record(
+                table=table,
+                statements=statements,
+            )
+        return statements
+
+    def create_materialized_views(self, table: BaseModel) -> None:
+        """
+        Create the materialized views declared by a table's model. A view \
+            created after the table already holds rows is filled with its \
+            stored rows once, then kept up to date by ClickHouse at insert \
+            time. The backfill only reads the rows inserted before the view \
+            was created, since the view itself sees the later ones. Like the \
+            view, which sees every insert, the backfill reads every stored \
+            row, duplicates included.
+
+        Args:
+            table (BaseModel): Dataclass that inherits from the BaseModel and \
+                represents a ClickHouse database table.
+        """
+
+        source = table.name_table()
+        for view in table.materialized_views:
+            exists = self.client.command(f"EXISTS TABLE {view.name}")
+            created = self.client.command("SELECT toString(now64(6))")
+            self.client.command(view.create_target_statement())
+            self.client.command(view.create_view_statement(source=source))
+            if not exists:
+                self.client.command(
+                    view.backfill_statement(
+                        source=source,
+                        where=f"{table.ingested_column} <= " "{created:DateTime64(6)}",
+                    ),
+                    parameters={"created": created},
+                )
+
+
+class BufferedInserter:
+    """
+    Buffer of modelled records, or of columnar Arrow batches, that inserts \
+        them into ClickHouse in large batches from a background thread. \
+        Records are accumulated per table and a table's buffer is flushed \
+        once it holds enough rows or bytes, or once its oldest record has \
+        waited long enough. When the \
+        background thread falls behind and its queue of batches is full, \
+        adding records blocks until there is room again.
+    """
+
+    def __init__(
+        self,
+        db: ClickHouseDB,
+        max_rows: int = BUFFER_ROWS,
+        max_bytes: int = BUFFER_BYTES,
+        max_seconds: float = BUFFER_SECONDS,
+        max_pending: int = BUFFER_PENDING,
+    ) -> None:
+        """
+        Start the background thread.
+
+        Args:
+            db (ClickHouseDB): ClickHouse database class instance.
+            max_rows (int, optional): Rows that trigger a table's flush. \
+                Defaults to BUFFER_ROWS.
+            max_bytes (int, optional): Approximate serialized bytes that \
+                trigger a table's flush. Defaults to BUFFER_BYTES.
+            max_seconds (float, optional): Age of a buffer's oldest record \
+                that triggers its flush. Defaults to BUFFER_SECONDS.
+            max_pending (int, optional): Batches that can wait for the \
+                background thread before adding records blocks. Defaults to \
+                BUFFER_PENDING.
+        """
+
+        self.db = db
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.buffers: dict[tuple[type, bool], dict] = {}
+        self.row_bytes: dict[type, int] = {}
+        self.inserted = 0
+        self.error: Exception | None = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BufferedInserter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def add(
+        self,
+        records: list[BaseModel] | ModelBatch,
+        on_inserted: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Add modelled records to their table's buffer. A batch of records \
+            stored column by column is buffered as an Arrow batch.
+
+        Args:
+            records (list[BaseModel] | ModelBatch): Instances of a record's \
+                dataclass, or a batch of them.
+            on_inserted (Callable[[], None] | None, optional): Called, from \
+                the background thread, once the records have been inserted. \
+                Defaults to None.
+        """
+
+        self._raise_error()
+        if not records:
+            if on_inserted:
+                self._call_back_after_buffered(on_inserted)
+            return
+        if isinstance(records, ModelBatch):
+            self.add_arrow(
+                table=records.model,
+                batch=records.to_arrow(),
+                on_inserted=on_inserted,
+            )
+            return
+        model = type(records[0])
+        if model not in self.row_bytes:
+            # Estimate a row's size once per table, from its first record
+            self.row_bytes[model] = len(json.dumps(records[0].serialize()))
+        self._buffer(
+            key=(model, False),
+            items=records,
+            rows=len(records),
+            nbytes=len(records) * self.row_bytes[model],
+            on_inserted=on_inserted,
+        )
+
+    def add_arrow(
+        self,
+        table: BaseModel,
+        batch: pa.RecordBatch,
+        on_inserted: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Add a columnar batch of a table's rows to the table's buffer.
+
+        Args:
+            table (BaseModel): Dataclass that inherits from the BaseModel and \
+                represents a ClickHouse database table.
+            batch (pa.RecordBatch): Rows following the table's Arrow schema.
+            on_inserted (Callable[[], None] | None, optional): Called, from \
+                the background thread, once the rows have been inserted. \
+                Defaults to None.
+        """
+
+        self._raise_error()
+        self._buffer(
+            key=(table, True),
+            items=[batch],
+            rows=batch.num_rows,
+            nbytes=batch.nbytes,
+            on_inserted=on_inserted,
+        )
+
+    def _buffer(
+        self,
+        key: tuple[type, bool],
+        items: list,
+        rows: int,
+        nbytes: int,
+        on_inserted: Callable[[], None] | None,
+    ) -> None:
+        with self._lock:
+            buffer = self.buffers.setdefault(
+                key,
+                {
+                    "table": key[0],
+                    "arrow": key[1],
+                    "items": [],
+                    "rows": 0,
+                    "bytes": 0,
+                    "callbacks": [],
+                    "since": time.monotonic(),
+                },
+            )
+            buffer["items"].extend(items)
+            buffer["rows"] += rows
+            buffer["bytes"] += nbytes
+            if on_inserted:
+                buffer["callbacks"].append(on_inserted)
+            full = buffer["rows"] >= self.max_rows or buffer["bytes"] >= self.max_bytes
+            batch = self.buffers.pop(key) if full else None
+        if batch:
+            # Blocks while the queue is full, which slows down the producer
+            self._queue.put(batch)
+
+    def _call_back_after_buffered(self, callback: Callable[[], None]) -> None:
+        """
+        Call back, from the background thread, once every record added so \
+            far has been inserted, so that callbacks keep the order in which \
+            their records were added even when they have no records.
+        """
+
+        with self._lock:
+            buffers = list(self.buffers.values())
+            if buffers:
+                remaining = [len(buffers)]
+
+                # Called from the background thread only
+                def count_down() -> None:
+                    remaining[0] -= 1
+                    if not remaining[0]:
+                        callback()
+
+                for buffer in buffers:
+                    buffer["callbacks"].append(count_down)
+                return
+        # Nothing is buffered, and the batches already queued are inserted
+        # first, in order
+        self._queue.put({"items": [], "callbacks": [callback]})
+
+    def flush(self) -> None:
+        """Insert every buffered record and wait until they are inserted."""
+
+        with self._lock:
+            batches = list(self.buffers.values())
+            self.buffers.clear()
+        for batch in batches:
+            self._queue.put(batch)
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Flush the buffers and stop the background thread."""
+
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _pop_stale_buffers(self) -> list[dict]:
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                key
+                for key, buffer in self.buffers.items()
+                if now - buffer["since"] >= self.max_seconds
+            ]
+            return [self.buffers.pop(key) for key in stale]
+
+    def _insert(self, batch: dict) -> None:
+        try:
+            if batch["items"] and batch["arrow"]:
+                self.db.insert_arrow(
+                    table=batch["table"],
+                    batch=pa.Table.from_batches(batch["items"]),
+                )
+            elif batch["items"]:
+                self.db.insert_records(records=batch["items"])
+            self.inserted += batch.get("rows", 0)
+            for callback in batch["callbacks"]:
+                callback()
+        except Exception as e:
+            self.error = e
+
+    def _work(self) -> None:
+        while True:
+            try:
+                batch = self._queue.get(timeout=self.max_seconds / 4)
+            except queue.Empty:
+                for stale in self._pop_stale_buffers():
+                    self._insert(stale)
+                continue
+            try:
+                if batch is None:
+                    return
+                self._insert(batch)
+                for stale in self._pop_stale_buffers():
+                    self._insert(stale)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,145 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+
+
+def select_latest_rows(parts: list[str], key: str | None = None) -> str:
+    """
+    Compose the DuckDB query reading the rows of an incremental export's \
+        parts. With a key, only the latest exported version of each row is \
+        kept, which is the one in the part written last.
+
+    Args:
+        parts (list[str]): Paths of the parts, in the order they were written.
+        key (str | None, optional): Columns identifying a row, such as the \
+            sorting key of a table whose rows are replaced. Defaults to None.
+
+    Returns:
+        str: SQL query.
+    """
+
+    files = ", ".join(f"'{fp}'" for fp in parts)
+    source = f"read_parquet([{files}], filename = true, union_by_name = true)"
+    if not key:
+        return f"SELECT * EXCLUDE (filename) FROM {source}"
+    return f"""
+SELECT * EXCLUDE (filename) FROM {source}
+QUALIFY row_number() OVER (
+    PARTITION BY {key} ORDER BY filename DESC
+) = 1
+"""
+
+
+class ManifestMismatchException(Exception):
+    """The directory holds an incremental export of another table. Choose \
+        another directory for this table's export."""
+
+
+class ExportManifest:
+    """
+    Manifest of an incremental export, which is a directory of parquet \
+        parts. The manifest lists the parts in the order they were written \
+        and the watermark up to which rows have been exported, i.e. the \
+        latest insertion time of an exported row.
+    """
+
+    def __init__(self, directory: Path | str, table: str) -> None:
+        """
+        Read the manifest of the export in a directory, if it exists.
+
+        Args:
+            directory (Path | str): Directory of the export.
+            table (str): Name of the exported table.
+
+        Raises:
+            ManifestMismatchException: The directory holds an export of \
+                another table.
+        """
+
+        self.directory = Path(directory)
+        self.path = self.directory.joinpath(MANIFEST_NAME)
+        self.table = table
+        self.watermark: str | None = None
+        self.parts: list[dict] = []
+        self.sequence = 0
+        if self.path.is_file():
+            with open(self.path) as f:
+                manifest = json.load(f)
+            if manifest["table"] != table:
+                raise ManifestMismatchException(manifest["table"])
+            self.watermark = manifest["watermark"]
+            self.parts = manifest["parts"]
+            self.sequence = manifest["sequence"]
+
+    @property
+    def rows(self) -> int:
+        return sum(part["rows"] for part in self.parts)
+
+    def next_part(self) -> Path:
+        """Path of the next part, whose name sorts after those before it."""
+
+        return self.directory.joinpath(f"part-{self.sequence:05d}.parquet")
+
+    def list_part_paths(self) -> list[Path]:
+        return [self.directory.joinpath(part["file"]) for part in self.parts]
+
+    def add_part(self, fp: Path, rows: int, watermark: str) -> None:
+        """
+        Record a newly written part and move the watermark forward.
+
+        Args:
+            fp (Path): Path of the part.
+            rows (int): Number of rows in the part.
+            watermark (str): Latest insertion time of the part's rows.
+        """
+
+        self.parts.append(
+            {
+                "file": fp.name,
+                "rows": rows,
+                "watermark": watermark,
+                "written": str(datetime.now()),
+            }
+        )
+        self.sequence += 1
+        self.watermark = watermark
+
+    def replace_parts(self, fp: Path, rows: int) -> list[Path]:
+        """
+        Replace all the parts with one part that merges them, keeping the \
+            watermark.
+
+        Args:
+            fp (Path): Path of the merged part.
+            rows (int): Number of rows in the merged part.
+
+        Returns:
+            list[Path]: Paths of the replaced parts, to be deleted once the \
+                manifest is saved.
+        """
+
+        replaced = self.list_part_paths()
+        self.parts = []
+        self.add_part(fp=fp, rows=rows, watermark=self.watermark)
+        return replaced
+
+    def save(self) -> None:
+        """Write the manifest, replacing the previous one in a single step."""
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "table": self.table,
+                    "watermark": self.watermark,
+                    "sequence": self.sequence,
+                    "parts": self.parts,
+                },
+                f,
+                indent=4,
+            )
+        os.replace(tmp, self.path)
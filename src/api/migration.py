@@ -0,0 +1,311 @@
+"""
+Online migration of the models' tables. The columns a model declares are \
+    compared with those of its table, as described by ClickHouse, and the \
+    table is altered in place: a missing column is added, filled for the \
+    rows already stored by its default, and a column whose type changed is \
+    converted. Columns the model no longer declares are kept, with their \
+    data. A table whose engine, sorting key or partition key differs from \
+    its model's, or whose key columns changed type, cannot be altered in \
+    place: it is rebuilt as a shadow table, which is filled with its rows \
+    and then exchanged with it. Since a rebuild copies every row and drops \
+    the rows inserted meanwhile, it is only run by the 'migrate' command, \
+    never when a command creates its tables. Each migration applied is \
+    recorded in the database's migration log, under the next version of its \
+    table.
+"""
+
+import re
+
+import clickhouse_connect
+
+from src.api.models.base import BaseModel
+
+# Table of the migration log, in each database
+MIGRATION_TABLE = "schemamigration"
+
+# Types that ClickHouse describes by another of their names
+TYPE_ALIASES = {"Boolean": "Bool"}
+
+# Suffix of the shadow table into which a rebuilt table's rows are copied
+SHADOW_SUFFIX = "_new"
+
+# Clauses that follow the engine and its parameters in system.tables'
+# description of a table's engine
+ENGINE_CLAUSES = re.compile(
+    r"\s+(PARTITION BY|PRIMARY KEY|ORDER BY|SAMPLE BY|TTL|SETTINGS)\s"
+)
+
+
+class RebuildRequiredException(Exception):
+    """The table's engine or keys differ from its model's, or its key \
+        columns changed type, so it can only be migrated by rebuilding it. \
+        Rebuild it with the 'migrate' command while nothing is collected."""
+
+
+def normalize_type(dtype: str) -> str:
+    """Name a ClickHouse type the way DESCRIBE TABLE does."""
+
+    return re.sub(
+        r"\b(" + "|".join(TYPE_ALIASES) + r")\b",
+        lambda m: TYPE_ALIASES[m.group(1)],
+        dtype,
+    )
+
+
+def normalize_key(key: str | None) -> str:
+    """Write a sorting or partition key the way system.tables does."""
+
+    key = re.sub(r"\s+", "", key or "")
+    if key == "tuple()":
+        return ""
+    if key.startswith("(") and key.endswith(")"):
+        key = key[1:-1]
+    return key
+
+
+def normalize_engine(engine: str) -> str:
+    """Write an engine and its parameters without their key clauses."""
+
+    engine = re.sub(r"\s+", "", ENGINE_CLAUSES.split(engine, maxsplit=1)[0])
+    return engine.removesuffix("()")
+
+
+def engine_changed(table: BaseModel, engine: dict[str, str]) -> bool:
+    """
+    Compare the engine and keys of a table with those of its model.
+
+    Args:
+        table (BaseModel): Dataclass that inherits from the BaseModel and \
+            represents a ClickHouse database table.
+        engine (dict[str, str]): The table's "engine_full", "sorting_key" \
+            and "partition_key", as described by system.tables.
+
+    Returns:
+        bool: Whether the table must be rebuilt to match its model.
+    """
+
+    actual = (
+        normalize_engine(engine["engine_full"]),
+        normalize_key(engine["sorting_key"]),
+        normalize_key(engine["partition_key"]),
+    )
+    expected = (
+        normalize_engine(f"{table.engine}({table.version or ''})"),
+        normalize_key(table.order_by),
+        normalize_key(table.partition_by),
+    )
+    return actual != expected
+
+
+def key_columns(table: BaseModel, engine: dict[str, str]) -> set[str]:
+    """
+    List the columns used by the sorting or partition key of a table or of \
+        its model, which ClickHouse cannot convert in place.
+    """
+
+    keys = [
+        engine.get("sorting_key"),
+        engine.get("partition_key"),
+        table.order_by,
+        table.partition_by,
+    ]
+    names = set(re.findall(r"\w+", " ".join(k for k in keys if k)))
+    return names & {column for column, _, _ in table.column_definitions()}
+
+
+def plan_rebuild(table: BaseModel, columns: dict[str, str]) -> list[str]:
+    """
+    Compose the statements rebuilding a table with its model's engine, keys \
+        and columns. A shadow table is created from the model, given the \
+        columns that only the table has, and filled with the table's rows, \
+        which are converted to the model's types. The two tables are then \
+        exchanged and the old one dropped. The views reading the table are \
+        dropped too, to be created again on the rebuilt table. Rows inserted \
+        while the rows are copied are not carried over, so the table should \
+        be rebuilt while nothing is collected.
+
+    Args:
+        table (BaseModel): Dataclass that inherits from the BaseModel and \
+            represents a ClickHouse database table.
+        columns (dict[str, str]): Types of the table's columns, by name, as \
+            described by ClickHouse.
+
+    Returns:
+        list[str]: SQL statements.
+    """
+
+    name = table.name_table()
+    shadow = name + SHADOW_SUFFIX
+    statements = [
+        f"DROP TABLE IF EXISTS {shadow}",
+        table.create_table_statement(name=shadow),
+    ]
+    declared = [column for column, _, _ in table.column_definitions()]
+    for column, dtype in columns.items():
+        if column not in declared:
+            statements.append(
+                f"ALTER TABLE {shadow} " f"ADD COLUMN IF NOT EXISTS {column} {dtype}"
+            )
+    copied = ", ".join(
+        [c for c in declared if c in columns]
+        + [c for c in columns if c not in declared]
+    )
+    statements += [
+        f"INSERT INTO {shadow} ({copied}) SELECT {copied} FROM {name}",
+        f"EXCHANGE TABLES {shadow} AND {name}",
+        f"DROP TABLE {shadow}",
+    ]
+    for view in table.materialized_views:
+        statements.append(f"DROP VIEW IF EXISTS {view.name}_mv")
+    return statements
+
+
+def plan_migration(
+    table: BaseModel,
+    columns: dict[str, str],
+    engine: dict[str, str] | None = None,
+    rebuild: bool = True,
+) -> list[str]:
+    """
+    Compose the statements altering a table's columns into those of its \
+        model. New columns are added at their place in the model's order. \
+        The rows stored before the ingested column existed are stamped with \
+        the time of the migration, since its default would otherwise be \
+        evaluated anew each time they are read. The stamp is awaited, so \
+        that the views then created on the table can be filled with the \
+        rows stamped before them. A table whose engine or \
+        keys differ from its model's, or whose key columns changed type, \
+        is rebuilt instead, since a key column is never modified in place.
+
+    Args:
+        table (BaseModel): Dataclass that inherits from the BaseModel and \
+            represents a ClickHouse database table.
+        columns (dict[str, str]): Types of the table's columns, by name, as \
+            described by ClickHouse.
+        engine (dict[str, str] | None, optional): The table's engine and \
+            keys, as described by system.tables. Defaults to the model's.
+        rebuild (bool, optional): Whether the table may be rebuilt. \
+            Defaults to True.
+
+    Raises:
+        RebuildRequiredException: The table must be rebuilt, but may not.
+
+    Returns:
+        list[str]: SQL statements, empty if the table is up to date.
+    """
+
+    keys = key_columns(table=table, engine=engine or {})
+    converted = {
+        column
+        for column, dtype, _ in table.column_definitions()
+        if column in columns
+        and normalize_type(columns[column]) != normalize_type(dtype)
+    }
+    if (engine and engine_changed(table=table, engine=engine)) or (converted & keys):
+        if not rebuild:
+            raise RebuildRequiredException(table.name_table())
+        return plan_rebuild(table=table, columns=columns)
+
+    name = table.name_table()
+    statements = []
+    previous = None
+    for column, dtype, default in table.column_definitions():
+        definition = f"{column} {dtype}"
+        if default:
+            definition += f" DEFAULT {default}"
+        if column not in columns:
+            position = f"AFTER {previous}" if previous else "FIRST"
+            statements.append(
+                f"ALTER TABLE {name} "
+                f"ADD COLUMN IF NOT EXISTS {definition} {position}"
+            )
+            if column == table.ingested_column:
+                statements.append(
+                    f"ALTER TABLE {name} MATERIALIZE COLUMN {column} "
+                    "SETTINGS mutations_sync = 1"
+                )
+        elif column in converted:
+            statements.append(
+                f"ALTER TABLE {name} MODIFY COLUMN IF EXISTS {definition}"
+            )
+        previous = column
+    return statements
+
+
+class MigrationLog:
+    """
+    Versioned log of the migrations applied to a database's tables. A \
+        table's first version is its creation, or the first migration of a \
+        table created before the log, and each later migration is the next \
+        version.
+    """
+
+    def __init__(self, client: clickhouse_connect.driver.Client) -> None:
+        """
+        Create the log's table if it does not exist yet.
+
+        Args:
+            client (clickhouse_connect.driver.Client): Client set to the \
+                database.
+        """
+
+        self.client = client
+        self.client.command(f"""
+CREATE TABLE IF NOT EXISTS {MIGRATION_TABLE}
+(
+    table_name String,
+    version UInt32,
+    statements Array(String),
+    applied_at DateTime DEFAULT now()
+)
+ENGINE = MergeTree
+ORDER BY (table_name, version)
+""")
+
+    def version(self, table: BaseModel) -> int:
+        """Latest version of a table, or 0 if none was recorded."""
+
+        result = self.client.query(
+            f"SELECT max(version) FROM {MIGRATION_TABLE} "
+            "WHERE table_name = {table:String}",
+            parameters={"table": table.name_table()},
+        )
+        return result.result_rows[0][0] or 0
+
+    def record(self, table: BaseModel, statements: list[str]) -> int:
+        """
+        Record the statements applied to a table as its next version.
+
+        Args:
+            table (BaseModel): Dataclass of the migrated table.
+            statements (list[str]): SQL statements of the migration.
+
+        Returns:
+            int: Version of the table after the migration.
+        """
+
+        version = self.version(table) + 1
+        self.client.insert(
+            table=MIGRATION_TABLE,
+            data=[[table.name_table(), version, statements]],
+            column_names=["table_name", "version", "statements"],
+        )
+        return version
+
+    def history(self, table: BaseModel) -> list[tuple]:
+        """
+        List the migrations of a table, from the first.
+
+        Args:
+            table (BaseModel): Dataclass of the table.
+
+        Returns:
+            list[tuple]: Version, statements and time of each migration.
+        """
+
+        result = self.client.query(
+            f"SELECT version, statements, applied_at FROM {MIGRATION_TABLE} "
+            "WHERE table_name = {table:String} ORDER BY version",
+            parameters={"table": table.name_table()},
+        )
+        return result.result_rows
@@ -1,18 +1,249 @@
+import dataclasses
+import operator
 import typing
+from dataclasses import dataclass, field
 from datetime import datetime
 
+import pyarrow as pa
+
+# ClickHouse, Arrow and DuckDB types of the attributes' annotations. An
+# optional attribute's column is nullable, a dictionary annotated with two
+# of these types is stored as a map, and an attribute with any other
+# annotation is stored as a nullable string.
+TYPES = {
+    datetime: ("DateTime", pa.timestamp("s", tz="UTC"), "TIMESTAMP"),
+    int: ("Int64", pa.int64(), "BIGINT"),
+    float: ("Float64", pa.float64(), "DOUBLE"),
+    bool: ("Boolean", pa.bool_(), "BOOLEAN"),
+    str: ("String", pa.string(), "VARCHAR"),
+}
+
+
+def sql_literal(value: typing.Any) -> str | None:
+    """
+    Write a Python value as a ClickHouse literal, such as an attribute's \
+        default value. None, and values without a literal, are left to the \
+        column's own default.
+
+    Args:
+        value (typing.Any): Python value.
+
+    Returns:
+        str | None: SQL literal of the value.
+    """
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        escaped = value.replace("\\", "\\\\").replace("'", "\\'")
+        return f"'{escaped}'"
+    return None
+
+
+def unwrap_optional(dtype: typing.Any) -> tuple[typing.Any, bool]:
+    """
+    Split an attribute's annotation into its type and whether it is optional.
+
+    Args:
+        dtype (typing.Any): The dataclass attribute's type.
+
+    Returns:
+        tuple[typing.Any, bool]: Type, without Optional, and whether the \
+            attribute can be None.
+    """
+
+    args = typing.get_args(dtype)
+    if typing.get_origin(dtype) is typing.Union and type(None) in args:
+        others = [a for a in args if a is not type(None)]
+        if len(others) == 1:
+            return others[0], True
+    return dtype, False
+
+
+@dataclass
+class MaterializedView:
+    """
+    Table kept up to date by ClickHouse from the rows inserted into a \
+        model's table. The view's query selects from the model's table, \
+        written as "{source}", and its results are written into the view's \
+        own target table.
+    """
+
+    name: str
+    columns: str
+    engine: str
+    order_by: str
+    select: str
+
+    def create_target_statement(self) -> str:
+        return f"""
+CREATE TABLE IF NOT EXISTS {self.name}
+({self.columns})
+ENGINE = {self.engine}
+ORDER BY {self.order_by}
+"""
+
+    def create_view_statement(self, source: str) -> str:
+        return f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS {self.name}_mv TO {self.name}
+AS {self.select.format(source=source)}
+"""
+
+    def backfill_statement(self, source: str, where: str | None = None) -> str:
+        if where:
+            source = f"(SELECT * FROM {source} WHERE {where})"
+        return f"INSERT INTO {self.name} {self.select.format(source=source)}"
+
+    def drop_statements(self) -> list[str]:
+        return [
+            f"DROP VIEW IF EXISTS {self.name}_mv",
+            f"DROP TABLE IF EXISTS {self.name}",
+        ]
+
+
+@dataclass(frozen=True)
+class Schema:
+    """
+    Metadata of a model's table, derived once from the annotations of the \
+        model's attributes: the names of the columns, in order, their \
+        ClickHouse and DuckDB types, which of them are dates or have few \
+        distinct values, and the Arrow schema of the table's columnar \
+        batches.
+    """
+
+    columns: tuple[str, ...]
+    column_types: tuple[str, ...]
+    duckdb_types: tuple[str, ...]
+    date_columns: tuple[str, ...]
+    low_cardinality: tuple[str, ...]
+    arrow: pa.Schema
+    # Values of a record's columns, in the order of the columns
+    values: typing.Callable[[typing.Any], tuple] = field(repr=False)
+
+    @classmethod
+    def from_model(cls, model: type) -> "Schema":
+        """
+        Derive the schema of a model from its attributes' annotations.
+
+        Args:
+            model (type): Dataclass that inherits from the BaseModel.
+
+        Returns:
+            Schema: The model's schema.
+        """
+
+        attrs = model.__annotations__
+        columns = tuple(attrs)
+        low_cardinality = tuple(model.low_cardinality)
+        for name in low_cardinality:
+            if unwrap_optional(attrs.get(name))[0] is not str:
+                raise TypeError(
+                    f"Low-cardinality column '{name}' is not a string "
+                    f"attribute of {model.__name__}"
+                )
+        column_types = tuple(
+            model.__column_type_name__(t, low_cardinality=n in low_cardinality)
+            for n, t in attrs.items()
+        )
+        if len(columns) > 1:
+            values = operator.attrgetter(*columns)
+        else:
+
+            def values(record) -> tuple:
+                return tuple(getattr(record, c) for c in columns)
+
+        return cls(
+            columns=columns,
+            column_types=column_types,
+            duckdb_types=tuple(model.__duckdb_type__(t) for t in attrs.values()),
+            date_columns=tuple(
+                n for n, t in zip(columns, column_types) if t == "DateTime"
+            ),
+            low_cardinality=low_cardinality,
+            arrow=pa.schema(
+                [
+                    model.__arrow_field__(n, t, low_cardinality=n in low_cardinality)
+                    for n, t in attrs.items()
+                ]
+            ),
+            values=values,
+        )
+
+    def duckdb_type(self, column: str) -> str:
+        return self.duckdb_types[self.columns.index(column)]
+
 
 class BaseModel:
-    suffix = "Engine MergeTree ORDER BY tuple()"
+    # Lets a model declared with @dataclass(slots=True) store its rows
+    # without an instance dictionary
+    __slots__ = ()
+
+    # Table engine, sorting key, partition key and version column. A model
+    # whose rows can be collected more than once declares a replacing
+    # engine and a sorting key that identifies a row, so that ClickHouse
+    # deduplicates the rows in its background merges.
+    engine = "MergeTree"
+    order_by = "tuple()"
+    partition_by = None
+    version = None
+
+    # Column stamped by the server with each row's insertion time, which is
+    # not part of the model and lets exports pick up only the newer rows
+    ingested_column = "ingested_at"
+
+    # Views maintained by ClickHouse from the rows inserted into the table
+    materialized_views = ()
+
+    # String columns with few distinct values, such as categories, which are
+    # stored as LowCardinality columns in ClickHouse, as dictionary-encoded
+    # arrays in Arrow and as ENUM columns in DuckDB
+    low_cardinality = ()
+
+    # Schema of the table, derived from the attributes' annotations once,
+    # when a model is defined
+    schema = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.schema = Schema.from_model(cls)
 
     def serialize(self) -> dict:
         j = {}
-        for k, v in self.__dict__.items():
+        for k, v in zip(self.schema.columns, self.schema.values(self)):
             if isinstance(v, datetime):
                 v = str(v)
             j.update({k: v})
         return j
 
+    @classmethod
+    def deserialize(cls, obj: dict) -> "BaseModel":
+        """
+        Model a row from its serialized form, such as a quarantined row.
+
+        Args:
+            obj (dict): Row serialized by the serialize method.
+
+        Returns:
+            BaseModel: An instance of the dataclass.
+        """
+
+        attrs = {}
+        for name in cls.schema.columns:
+            if name not in obj:
+                continue
+            v = obj[name]
+            dtype = cls.__annotations__[name]
+            if v is not None and name in cls.schema.date_columns:
+                v = datetime.fromisoformat(v)
+            elif isinstance(v, dict) and typing.get_origin(dtype) is dict:
+                # JSON objects' keys are strings
+                key = typing.get_args(dtype)[0]
+                v = {key(k): x for k, x in v.items()}
+            attrs[name] = v
+        return cls(**attrs)
+
     @classmethod
     def name_table(cls) -> str:
         """
@@ -25,34 +256,116 @@ class BaseModel:
         return cls.__name__.lower()
 
     @staticmethod
-    def __column_type_name__(dtype: typing.Any) -> str:
+    def __column_type_name__(
+        dtype: typing.Any,
+        low_cardinality: bool = False,
+    ) -> str:
         """
         Convert the type annotation of a class's attribute to the name of \
             a ClickHouse data type.
 
         Args:
             dtype (typing.Any): The dataclass attribute's type.
+            low_cardinality (bool, optional): Whether the column's values \
+                are stored once, in a dictionary. Defaults to False.
 
         Returns:
             str: The name of a data type in ClickHouse.
         """
 
-        if str(dtype) == "<class 'datetime.datetime'>" in str(dtype):
-            return "DateTime"
-        elif str(dtype) == "<class 'int'>":
-            return "Int64"
-        elif str(dtype) == "<class 'float'>":
-            return "Float64"
-        elif str(dtype) == "typing.Optional[float]":
-            return "Nullable(Float64)"
-        elif str(dtype) == "typing.Optional[int]":
-            return "Nullable(Int64)"
-        elif str(dtype) == "<class 'bool'>":
-            return "Boolean"
-        elif str(dtype) == "<class 'str'>":
-            return "String"
+        dtype, optional = unwrap_optional(dtype)
+        if typing.get_origin(dtype) is dict:
+            key, value = map(BaseModel.__column_type_name__, dtype.__args__)
+            return f"Map({key}, {value})"
+        if dtype not in TYPES:
+            name = "Nullable(String)"
         else:
-            return "Nullable(String)"
+            name = TYPES[dtype][0]
+            name = f"Nullable({name})" if optional else name
+        return f"LowCardinality({name})" if low_cardinality else name
+
+    @staticmethod
+    def __arrow_field__(
+        name: str,
+        dtype: typing.Any,
+        low_cardinality: bool = False,
+    ) -> pa.Field:
+        """
+        Convert the type annotation of a class's attribute to an Arrow field \
+            matching the attribute's ClickHouse data type.
+
+        Args:
+            name (str): The dataclass attribute's name.
+            dtype (typing.Any): The dataclass attribute's type.
+            low_cardinality (bool, optional): Whether the column's values \
+                are dictionary-encoded. Defaults to False.
+
+        Returns:
+            pa.Field: The attribute's field in an Arrow schema.
+        """
+
+        dtype, optional = unwrap_optional(dtype)
+        if typing.get_origin(dtype) is dict:
+            key, value = (TYPES[t][1] for t in dtype.__args__)
+            return pa.field(name, pa.map_(key, value), nullable=False)
+        if dtype not in TYPES:
+            dtype, optional = str, True
+        arrow_type = TYPES[dtype][1]
+        if low_cardinality:
+            arrow_type = pa.dictionary(pa.int32(), arrow_type)
+        return pa.field(name, arrow_type, nullable=optional)
+
+    @staticmethod
+    def __duckdb_type__(dtype: typing.Any) -> str:
+        """
+        Convert the type annotation of a class's attribute to the name of \
+            the DuckDB data type it is analysed as.
+
+        Args:
+            dtype (typing.Any): The dataclass attribute's type.
+
+        Returns:
+            str: The name of a data type in DuckDB.
+        """
+
+        dtype, _ = unwrap_optional(dtype)
+        if typing.get_origin(dtype) is dict:
+            key, value = map(BaseModel.__duckdb_type__, dtype.__args__)
+            return f"MAP({key}, {value})"
+        return TYPES.get(dtype, TYPES[str])[2]
+
+    @classmethod
+    def arrow_schema(cls) -> pa.Schema:
+        """
+        Derive the Arrow schema of the table / dataclass that inherits this \
+            base model from its attributes' annotations.
+
+        Returns:
+            pa.Schema: Schema of the table's columnar batches.
+        """
+
+        return cls.schema.arrow
+
+    @classmethod
+    def deduplicates(cls) -> bool:
+        """Whether the model's engine replaces rows with the same key."""
+
+        return cls.engine.startswith("Replacing")
+
+    @classmethod
+    def engine_clause(cls) -> str:
+        """
+        Compose the engine and key clauses of the table's create statement.
+
+        Returns:
+            str: SQL clauses following the table's columns.
+        """
+
+        clauses = [f"ENGINE = {cls.engine}({cls.version or ''})"]
+        if cls.partition_by:
+            clauses.append(f"PARTITION BY {cls.partition_by}")
+        clauses.append(f"ORDER BY {cls.order_by}")
+        return "\n".join(clauses)
 
     @classmethod
     def create_drop_statement(cls) -> str:
@@ -67,22 +380,53 @@ class BaseModel:
         return f"DROP TABLE IF EXISTS {cls.name_table()}"
 
     @classmethod
-    def create_table_statement(cls) -> str:
+    def column_definitions(cls) -> list[tuple[str, str, str | None]]:
+        """
+        List the table's columns, in order, with their ClickHouse types and \
+            the SQL expressions of their defaults. An attribute's default \
+            value is its column's default, which fills the column of the \
+            rows inserted before it was added. The ingested column comes \
+            last.
+
+        Returns:
+            list[tuple[str, str, str | None]]: Name, type and default of \
+                each column.
+        """
+
+        defaults = {
+            f.name: sql_literal(f.default)
+            for f in dataclasses.fields(cls)
+            if f.default is not dataclasses.MISSING
+        }
+        definitions = [
+            (col, dtype, defaults.get(col))
+            for col, dtype in zip(cls.schema.columns, cls.schema.column_types)
+        ]
+        definitions.append((cls.ingested_column, "DateTime64(6)", "now64(6)"))
+        return definitions
+
+    @classmethod
+    def create_table_statement(cls, name: str | None = None) -> str:
         """
         Compose a create table statement for the table / dataclass that \
             inherits this base model.
 
+        Args:
+            name (str | None, optional): Name of the created table. Defaults \
+                to the model's table.
+
         Returns:
             str: SQL statement for creating a table.
         """
 
-        attrs = cls.__annotations__.items()
-        cols = {n: cls.__column_type_name__(dtype) for n, dtype in attrs}
-        c_string = ", ".join(f"{col} {dtype}" for col, dtype in cols.items())
+        c_string = ", ".join(
+            f"{col} {dtype}" + (f" DEFAULT {default}" if default else "")
+            for col, dtype, default in cls.column_definitions()
+        )
         return f"""
-CREATE TABLE IF NOT EXISTS {cls.name_table()}
+CREATE TABLE IF NOT EXISTS {name or cls.name_table()}
 ({c_string})
-{cls.suffix}
+{cls.engine_clause()}
 """
 
     @classmethod
@@ -96,5 +440,4 @@ CREATE TABLE IF NOT EXISTS {cls.name_table()}
                 dataclass that inherits this base model.
         """
 
-        attrs = cls.__annotations__.items()
-        return [cls.__column_type_name__(t) for _, t in attrs]
+        return list(cls.schema.column_types)
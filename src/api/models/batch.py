@@ -0,0 +1,162 @@
+from collections.abc import Iterable, Iterator, Sequence
+
+import pyarrow as pa
+
+from src.api.quarantine import InvalidItemException
+
+from .base import BaseModel
+from .member import CrossrefMember
+from .work import CreativeWork
+
+
+def column_values(array: pa.Array) -> list:
+    """Python values of a column, with a map's entries as a dictionary."""
+
+    values = array.to_pylist()
+    if pa.types.is_map(array.type):
+        return [None if v is None else dict(v) for v in values]
+    return values
+
+
+class ModelBatch(Sequence):
+    """
+    Rows of a model's table stored column by column, in the typed buffers \
+        of an Arrow record batch, where an optional column's missing values \
+        are marked in its validity bitmap. The batch is handed over to \
+        Arrow as is, and read as a sequence of the model's instances, which \
+        are only created when the rows are read.
+    """
+
+    __slots__ = ("batch", "_columns")
+
+    # Model of the batch's rows
+    model = BaseModel
+
+    def __init__(self, batch: pa.RecordBatch) -> None:
+        """
+        Wrap a record batch following the model's Arrow schema.
+
+        Args:
+            batch (pa.RecordBatch): Rows of the model's table.
+        """
+
+        self.batch = batch
+        self._columns = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[BaseModel]) -> "ModelBatch":
+        """
+        Store modelled records column by column.
+
+        Args:
+            records (Iterable[BaseModel]): Instances of the model.
+
+        Returns:
+            ModelBatch: Batch of the records.
+        """
+
+        schema = cls.model.schema
+        rows = list(map(schema.values, records))
+        columns = zip(*rows) if rows else [[] for _ in schema.columns]
+        return cls(
+            pa.RecordBatch.from_arrays(
+                [pa.array(c, f.type) for c, f in zip(columns, schema.arrow)],
+                schema=schema.arrow,
+            )
+        )
+
+    def to_arrow(self) -> pa.RecordBatch:
+        """The rows as an Arrow record batch, without copying them."""
+
+        return self.batch
+
+    def column(self, name: str) -> pa.Array:
+        return self.batch.column(name)
+
+    @property
+    def nbytes(self) -> int:
+        return self.batch.nbytes
+
+    def filter(self, mask: Sequence[bool]) -> "ModelBatch":
+        """Keep the rows whose value in the mask is True."""
+
+        return type(self)(self.batch.filter(pa.array(mask, pa.bool_())))
+
+    def __len__(self) -> int:
+        return self.batch.num_rows
+
+    def __getitem__(self, index: int | slice) -> "BaseModel | ModelBatch":
+        if isinstance(index, slice):
+            rows = range(len(self))[index]
+            if rows.step == 1:
+                return type(self)(self.batch.slice(rows.start, len(rows)))
+            return type(self)(self.batch.take(pa.array(rows, pa.int64())))
+        row = range(len(self))[index]
+        if self._columns is not None:
+            return self.model(*(c[row] for c in self._columns))
+        batch = self.batch.slice(row, 1)
+        return self.model(*(column_values(c)[0] for c in batch.columns))
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        # The columns are converted to Python values once, then the
+        # instances are created one at a time as the rows are read
+        if self._columns is None:
+            self._columns = [column_values(c) for c in self.batch.columns]
+        for values in zip(*self._columns):
+            yield self.model(*values)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} rows)"
+
+
+class CreativeWorkBatch(ModelBatch):
+    __slots__ = ()
+
+    model = CreativeWork
+
+    @classmethod
+    def load_json(
+        cls,
+        items: list[dict],
+        has_refs: bool,
+    ) -> "CreativeWorkBatch":
+        """
+        From the JSON items returned by the API, parse the works' metadata \
+            straight into a batch. The invalid works are quarantined.
+
+        Args:
+            items (list[dict]): JSON objects of works' selected metadata.
+            has_refs (bool): Boolean used in API filter parameter.
+
+        Returns:
+            CreativeWorkBatch: Modelled works metadata.
+        """
+
+        return cls(CreativeWork.load_arrow(items=items, has_refs=has_refs))
+
+
+class CrossrefMemberBatch(ModelBatch):
+    __slots__ = ()
+
+    model = CrossrefMember
+
+    @classmethod
+    def load_json(cls, messages: list[dict]) -> "CrossrefMemberBatch":
+        """
+        Model members from the JSON objects returned by the API and store \
+            them in a batch. The invalid members are quarantined.
+
+        Args:
+            messages (list[dict]): JSON objects of the members' metadata.
+
+        Returns:
+            CrossrefMemberBatch: Modelled members metadata.
+        """
+
+        records = []
+        for message in messages:
+            try:
+                records.append(CrossrefMember.load_json(message=message))
+            except InvalidItemException:
+                continue
+        return cls.from_records(records)
@@ -1,17 +1,22 @@
-import datetime
-import statistics
 import typing
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from src.api.cli.logs import LOG_DIR
+from src.api.quarantine import (
+    PARSE_STAGE,
+    InvalidItemException,
+    Quarantine,
+)
+from src.api.weighted_stats import weighted_geometric_mean, weighted_pvariance
 
 from .base import BaseModel
 
-INVALID_ITEM = LOG_DIR.joinpath("invalid_item.json")
-
 
 @dataclass
 class CrossrefMember(BaseModel):
+    # A member collected again replaces its earlier row
+    engine = "ReplacingMergeTree"
+    order_by = "id"
+
     id: str  # id
     name: str  # primary-name
     total_dois: int  # counts.total-dois
@@ -37,6 +42,10 @@ class CrossrefMember(BaseModel):
     # counts-type.all.proceedings-article
     proceedings_articles: typing.Optional[int] = 0
 
+    # breakdowns.dois-by-issued-year, as the number of DOIs of each year,
+    # from which other statistics can be derived without collecting again
+    creation_years: dict[int, int] = field(default_factory=dict)
+
     @classmethod
     def load_json(cls, message: dict) -> "CrossrefMember":
 
@@ -46,17 +55,15 @@ class CrossrefMember(BaseModel):
             total_dois = message["counts"]["total-dois"]
 
             year_counts = message["breakdowns"]["dois-by-issued-year"]
+            creation_years = {y: c for y, c in year_counts}
             if len(year_counts) > 0:
                 earliest_creation = year_counts[-1][0]
                 latest_creation = year_counts[0][0]
 
-                years = []
-                for y, c in year_counts:
-                    years.extend([y] * c)
                 creation_year_mean = int(
-                    round(statistics.geometric_mean(years), 0),
+                    round(weighted_geometric_mean(year_counts), 0),
                 )
-                creation_year_pvariance = statistics.pvariance(years)
+                creation_year_pvariance = weighted_pvariance(year_counts)
             else:
                 earliest_creation = None
                 latest_creation = None
@@ -71,16 +78,13 @@ class CrossrefMember(BaseModel):
             references_current = message["coverage"]["references-current"]
 
         except Exception as e:
-            import json
-
-            with open(INVALID_ITEM, "w") as f:
-                obj = {
-                    "error": e.args,
-                    "time": str(datetime.datetime.now()),
-                    "item": message,
-                }
-                json.dump(obj, f, indent=4)
-            raise e
+            Quarantine().add(
+                table=cls.name_table(),
+                stage=PARSE_STAGE,
+                items=[message],
+                error=e,
+            )
+            raise InvalidItemException(message.get("id")) from e
 
         return CrossrefMember(
             id=id,
@@ -94,4 +98,5 @@ class CrossrefMember(BaseModel):
             book_chapters=book_chapters or 0,
             proceedings_articles=proceedings_articles or 0,
             references_current=references_current,
+            creation_years=creation_years,
         )
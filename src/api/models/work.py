@@ -2,16 +2,99 @@ import datetime
 import typing
 from dataclasses import dataclass
 
-from src.api.cli.logs import LOG_DIR
+import pyarrow as pa
+import pyarrow.compute as pc
 
-from .base import BaseModel
+from src.api.quarantine import (
+    PARSE_STAGE,
+    InvalidItemException,
+    Quarantine,
+)
 
-# Set up logs for a work's validation
-INVALID_ITEM = LOG_DIR.joinpath("invalid_item.json")
+from .base import BaseModel, MaterializedView
 
 
 @dataclass
 class CreativeWork(BaseModel):
+    # A work sampled again replaces its earlier row, keeping its latest
+    # deposit. The partition key must not change for a DOI, otherwise its
+    # rows would land in different partitions and never be merged, so the
+    # works are partitioned by the year of their creation, which is fixed,
+    # rather than of their deposit, which moves with every update.
+    engine = "ReplacingMergeTree"
+    version = "deposited"
+    order_by = "doi"
+    partition_by = "toYear(created)"
+
+    # A few tens of work types and tens of thousands of members, repeated
+    # across millions of works
+    low_cardinality = ("work_type", "member")
+
+    # The distinct members of the works, which stays small however many
+    # works are collected, and the aggregates of the standard breakdowns of
+    # the analysis. The aggregates are summed by ClickHouse as rows are
+    # inserted, so they count every inserted row, including a work sampled
+    # again before its duplicates are merged away.
+    materialized_views = (
+        MaterializedView(
+            name="workmember",
+            columns="member String",
+            engine="ReplacingMergeTree",
+            order_by="member",
+            select="""
+SELECT assumeNotNull(member) AS member
+FROM {source}
+WHERE member IS NOT NULL
+""",
+        ),
+        MaterializedView(
+            name="worksummary",
+            columns="""
+work_type String,
+has_refs Boolean,
+works UInt64,
+citations_incoming_works UInt64,
+citations_incoming_sum Int64,
+citations_incoming_sumsq Int128,
+citations_outgoing_sum Int64,
+citations_outgoing_sumsq Int128
+""",
+            engine="SummingMergeTree",
+            order_by="(work_type, has_refs)",
+            select="""
+SELECT
+    ifNull(work_type, '') AS work_type,
+    has_refs,
+    count() AS works,
+    count(citations_incoming) AS citations_incoming_works,
+    sum(ifNull(citations_incoming, 0)) AS citations_incoming_sum,
+    sum(
+        toInt128(ifNull(citations_incoming, 0)) * ifNull(citations_incoming, 0)
+    ) AS citations_incoming_sumsq,
+    sum(citations_outgoing) AS citations_outgoing_sum,
+    sum(
+        toInt128(citations_outgoing) * citations_outgoing
+    ) AS citations_outgoing_sumsq
+FROM {source}
+GROUP BY work_type, has_refs
+""",
+        ),
+        MaterializedView(
+            name="workdelay",
+            columns="has_refs Boolean, delay_years Int64, works UInt64",
+            engine="SummingMergeTree",
+            order_by="(has_refs, delay_years)",
+            select="""
+SELECT
+    has_refs,
+    toInt64(ceil(deposit_delay_days / 365)) AS delay_years,
+    count() AS works
+FROM {source}
+GROUP BY has_refs, delay_years
+""",
+        ),
+    )
+
     doi: str
     deposited: datetime.datetime
     created: datetime.datetime
@@ -50,8 +133,8 @@ class CreativeWork(BaseModel):
                 has_refs (bool): Boolean used in API filter parameter.
 
             Raises:
-                e: Key Error raised if metadata's formatting is invalid \
-                    according to the data model.
+                InvalidItemException: The metadata's formatting is invalid \
+                    according to the data model. The item is quarantined.
 
             Returns:
                 CreativeWork: An instance of the CreativeWork dataclass model.
@@ -67,18 +150,16 @@ class CreativeWork(BaseModel):
             citations_outgoing = item.get("references-count")
             deposit_delay_days = (deposited - created).days
 
-        # If the parsing fails, log the invalid data and abort the process.
-        except KeyError as e:
-            import json
-
-            with open(INVALID_ITEM, "w") as f:
-                obj = {
-                    "key-error": e.args,
-                    "time": str(datetime.datetime.now()),
-                    "item": item,
-                }
-                json.dump(obj, f, indent=4)
-            raise e
+        # If the parsing fails, quarantine the invalid item
+        except (KeyError, TypeError, ValueError) as e:
+            Quarantine().add(
+                table=cls.name_table(),
+                stage=PARSE_STAGE,
+                items=[item],
+                error=e,
+                has_refs=has_refs,
+            )
+            raise InvalidItemException(item.get("DOI")) from e
 
         return CreativeWork(
             doi=doi,
@@ -91,3 +172,125 @@ class CreativeWork(BaseModel):
             has_refs=has_refs,
             work_type=work_type,
         )
+
+    @staticmethod
+    def parse_date_column(strings: list[str]) -> pa.Array:
+        """
+        Parse a column of ISO 8601 date-times at once, in Arrow's kernels.
+
+        Args:
+            strings (list[str]): Date-times, such as "2020-10-01T15:50:12Z".
+
+        Returns:
+            pa.Array: Timestamps in seconds.
+        """
+
+        dates = pa.array(strings, pa.string())
+        try:
+            return dates.cast(pa.timestamp("s", tz="UTC"))
+        except pa.ArrowInvalid:
+            # A date-time has a fractional part, which is truncated like in
+            # ClickHouse's DateTime columns
+            dates = dates.cast(pa.timestamp("ms", tz="UTC"))
+            return dates.cast(pa.timestamp("s", tz="UTC"), safe=False)
+
+    @classmethod
+    def load_arrow(cls, items: list[dict], has_refs: bool) -> pa.RecordBatch:
+        """
+        From the JSON items returned by the API, parse the works' metadata \
+            straight into a columnar batch, without creating a dataclass \
+            instance per work.
+
+            Args:
+                items (list[dict]): JSON objects of works' selected metadata.
+                has_refs (bool): Boolean used in API filter parameter.
+
+            Returns:
+                pa.RecordBatch: Batch following the model's Arrow schema.
+        """
+
+        schema = cls.arrow_schema()
+        try:
+            created = cls.parse_date_column([i["created"]["date-time"] for i in items])
+            deposited = cls.parse_date_column(
+                [i["deposited"]["date-time"] for i in items]
+            )
+            # Whole days between the dates, rounded down like timedelta.days
+            seconds = pc.subtract(deposited, created).cast(pa.int64())
+            days = pc.floor(pc.divide(seconds.cast(pa.float64()), 86400))
+            columns = {
+                "doi": pa.array([i["DOI"] for i in items], pa.string()),
+                "deposited": deposited,
+                "created": created,
+                "deposit_delay_days": days.cast(pa.int64()),
+                "has_refs": pa.repeat(pa.scalar(has_refs), len(items)),
+                "citations_incoming": pa.array(
+                    [i.get("is-referenced-by-count") for i in items],
+                    pa.int64(),
+                ),
+                "citations_outgoing": pa.array(
+                    [i.get("references-count") or 0 for i in items],
+                    pa.int64(),
+                ),
+                "member": pa.array(
+                    [i.get("member") for i in items],
+                    schema.field("member").type,
+                ),
+                "work_type": pa.array(
+                    [i.get("type") for i in items],
+                    schema.field("work_type").type,
+                ),
+            }
+        # If a value does not fit its column, model the works one by one and
+        # quarantine the invalid ones
+        except (KeyError, TypeError, pa.ArrowException):
+            return cls.load_arrow_by_item(items=items, has_refs=has_refs)
+
+        return pa.RecordBatch.from_arrays(
+            [columns[name] for name in schema.names],
+            schema=schema,
+        )
+
+    @classmethod
+    def load_arrow_by_item(
+        cls,
+        items: list[dict],
+        has_refs: bool,
+    ) -> pa.RecordBatch:
+        """
+        Model a page of works one by one, when one of them cannot be parsed \
+            into columns, and batch the valid works. The invalid works are \
+            quarantined.
+
+            Args:
+                items (list[dict]): JSON objects of works' selected metadata.
+                has_refs (bool): Boolean used in API filter parameter.
+
+            Returns:
+                pa.RecordBatch: Batch following the model's Arrow schema.
+        """
+
+        rows = []
+        columns = cls.schema.columns
+        schema = cls.arrow_schema()
+        for item in items:
+            try:
+                record = cls.load_json(item=item, has_refs=has_refs)
+            except InvalidItemException:
+                continue
+            row = dict(zip(columns, cls.schema.values(record)))
+            # A value of the wrong type, such as a count given as a string,
+            # does not fit its column
+            try:
+                pa.RecordBatch.from_pylist([row], schema=schema)
+            except pa.ArrowException as e:
+                Quarantine().add(
+                    table=cls.name_table(),
+                    stage=PARSE_STAGE,
+                    items=[item],
+                    error=e,
+                    has_refs=has_refs,
+                )
+                continue
+            rows.append(row)
+        return pa.RecordBatch.from_pylist(rows, schema=schema)
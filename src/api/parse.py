@@ -0,0 +1,67 @@
+"""
+Parsers of the API's raw responses. They are module-level functions so that \
+    they can be shipped to the worker processes of a parse pool.
+"""
+
+import json
+
+from src.api.models.batch import CreativeWorkBatch
+from src.api.models.member import CrossrefMember
+from src.api.models.work import CreativeWork
+from src.api.quarantine import InvalidItemException
+
+
+def load_works(items: list[dict], has_refs: bool) -> list[CreativeWork]:
+    """
+    Model the works of a page, skipping the invalid works, which are \
+        quarantined.
+
+    Args:
+        items (list[dict]): JSON objects of works' selected metadata.
+        has_refs (bool): Boolean used in API filter parameter.
+
+    Returns:
+        list[CreativeWork]: Modelled works metadata.
+    """
+
+    records = []
+    for item in items:
+        try:
+            record = CreativeWork.load_json(item=item, has_refs=has_refs)
+        except InvalidItemException:
+            continue
+        records.append(record)
+    return records
+
+
+def load_member(message: dict) -> CrossrefMember | None:
+    """
+    Model a member, unless it is invalid, in which case it is quarantined.
+
+    Args:
+        message (dict): JSON object of the member's metadata.
+
+    Returns:
+        CrossrefMember | None: Modelled member metadata, if valid.
+    """
+
+    try:
+        return CrossrefMember.load_json(message=message)
+    except InvalidItemException:
+        return None
+
+
+def parse_works(body: bytes, has_refs: bool) -> CreativeWorkBatch:
+    """
+    Parse the raw response of a works request and model its items.
+
+    Args:
+        body (bytes): Body of the API response.
+        has_refs (bool): Boolean used in API filter parameter.
+
+    Returns:
+        CreativeWorkBatch: Modelled works metadata.
+    """
+
+    items = json.loads(body)["message"]["items"]
+    return CreativeWorkBatch.load_json(items=items, has_refs=has_refs)
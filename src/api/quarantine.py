@@ -0,0 +1,125 @@
+"""
+Quarantine of the items and rows that could not be modelled or inserted, so \
+    that one malformed record does not abort a run. Each table has its own \
+    append-only file of gzip-compressed, newline-delimited JSON entries, \
+    which can be replayed once the model or the table handles them.
+"""
+
+import gzip
+import json
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from src.api.cli.logs import LOG_DIR
+
+QUARANTINE_DIR = LOG_DIR.joinpath("quarantine")
+
+# Stages at which an entry was quarantined
+PARSE_STAGE = "parse"
+INSERT_STAGE = "insert"
+
+# Appends of the process's threads are written one at a time
+_lock = threading.Lock()
+
+
+class InvalidItemException(Exception):
+    """The item does not follow the data model. It was quarantined and can be \
+        replayed once the model handles it."""
+
+
+class Quarantine:
+    def __init__(self, directory: Path | str | None = None) -> None:
+        self.directory = Path(directory or QUARANTINE_DIR)
+
+    def path(self, table: str) -> Path:
+        return self.directory.joinpath(f"{table}.ndjson.gz")
+
+    def add(
+        self,
+        table: str,
+        stage: str,
+        items: list[dict],
+        error: Exception | str,
+        **context,
+    ) -> None:
+        """
+        Append entries to a table's quarantine. The entries are compressed \
+            into one gzip member and written in a single call, so that the \
+            appends of threads and processes are not interleaved.
+
+        Args:
+            table (str): Name of the table the items are meant for.
+            stage (str): Stage that failed, PARSE_STAGE or INSERT_STAGE.
+            items (list[dict]): Raw JSON items, or serialized rows.
+            error (Exception | str): Error raised by the failed stage.
+            context: Arguments the items are modelled with, such as has_refs.
+        """
+
+        if not items:
+            return
+        time = str(datetime.now())
+        lines = "".join(
+            json.dumps(
+                {
+                    "stage": stage,
+                    "error": repr(error),
+                    "time": time,
+                    "context": context,
+                    "item": item,
+                },
+                default=str,
+            )
+            + "\n"
+            for item in items
+        )
+        data = gzip.compress(lines.encode())
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with _lock, open(self.path(table), "ab") as f:
+            f.write(data)
+
+    def read(self, table: str) -> Iterator[dict]:
+        """Yield a table's quarantined entries in the order they were added."""
+
+        fp = self.path(table)
+        if fp.is_file():
+            yield from self._read(fp)
+
+    def count(self, table: str) -> int:
+        return sum(1 for _ in self.read(table))
+
+    @contextmanager
+    def drain(self, table: str) -> Iterator[Iterator[dict]]:
+        """
+        Take a table's quarantined entries out of the quarantine, such as to \
+            replay them. The file is first moved aside, so that the entries \
+            failing again are quarantined anew, and it is deleted once the \
+            block using the entries completes. If the block raises, the \
+            entries are drained again next time.
+
+        Args:
+            table (str): Name of the table.
+
+        Yields:
+            Iterator[Iterator[dict]]: Quarantined entries.
+        """
+
+        fp = self.path(table)
+        draining = fp.with_suffix(".draining")
+        with _lock:
+            if fp.is_file() and not draining.is_file():
+                os.replace(fp, draining)
+        if not draining.is_file():
+            yield iter(())
+            return
+        yield self._read(draining)
+        draining.unlink()
+
+    @staticmethod
+    def _read(fp: Path) -> Iterator[dict]:
+        with gzip.open(fp, "rt") as f:
+            for line in f:
+                yield json.loads(line)
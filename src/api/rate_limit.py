@@ -0,0 +1,224 @@
+import asyncio
+import re
+import time
+from typing import Mapping
+
+# Share of the advertised quota that the limiter actually uses
+HEADROOM = 0.9
+
+INTERVAL_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$")
+INTERVAL_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+
+
+def parse_interval(value: str) -> float | None:
+    """
+    Parse the API's rate-limit interval, such as "1s", into seconds.
+
+    Args:
+        value (str): Value of the X-Rate-Limit-Interval header.
+
+    Returns:
+        float | None: Interval in seconds, or None if it cannot be parsed.
+    """
+
+    match = INTERVAL_PATTERN.match(value)
+    if not match:
+        return None
+    number, unit = match.groups()
+    return float(number) * INTERVAL_UNITS[unit]
+
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket scheduler that sits in front of the API client. The bucket's \
+        rate is re-tuned from the API's X-Rate-Limit-Limit and \
+        X-Rate-Limit-Interval headers, and the number of requests allowed in \
+        flight grows additively while responses are healthy and is cut \
+        multiplicatively when the API throttles, fails or slows down. Other \
+        client errors, such as a 404, say nothing about the API's load and \
+        leave the concurrency as it is.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        concurrency: int = 2,
+        min_concurrency: int = 1,
+        max_concurrency: int = 100,
+        decrease_factor: float = 0.5,
+        latency_factor: float = 2.0,
+    ) -> None:
+        """
+        Set up the limiter's initial rate and concurrency.
+
+        Args:
+            rate (float, optional): Requests per second until the API \
+                advertises its limit. Defaults to 10.0.
+            concurrency (int, optional): Initial number of requests in \
+                flight. Defaults to 2.
+            min_concurrency (int, optional): Floor of the concurrency. \
+                Defaults to 1.
+            max_concurrency (int, optional): Ceiling of the concurrency. \
+                Defaults to 100.
+            decrease_factor (float, optional): Factor applied to the \
+                concurrency when it is cut. Defaults to 0.5.
+            latency_factor (float, optional): How many times slower than the \
+                best observed latency a response must be to count as a sign \
+                of congestion. Defaults to 2.0.
+        """
+
+        self.rate = rate
+        self.window = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+
+        self.tokens = self.capacity
+        self.latency: float | None = None
+        self.base_latency: float | None = None
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+        self.rejected = 0
+        self._refilled_at = time.monotonic()
+        self._resume_at = 0.0
+        self._decreased_at = 0.0
+        self._lock: asyncio.Lock | None = None
+
+    @property
+    def capacity(self) -> float:
+        """Size of the bucket, i.e. the largest allowed burst."""
+
+        return max(1.0, self.rate / 10)
+
+    @property
+    def concurrency(self) -> int:
+        """Number of requests currently allowed in flight."""
+
+        return int(self.window)
+
+    def snapshot(self) -> dict:
+        """Report the limiter's current state for monitoring."""
+
+        return {
+            "rate": self.rate,
+            "concurrency": self.concurrency,
+            "latency": self.latency,
+            "successes": self.successes,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "rejected": self.rejected,
+        }
+
+    def describe(self) -> str:
+        """Summarise the limiter's current state in one line."""
+
+        return f"{self.rate:.1f} req/s, {self.concurrency} in flight"
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self._refilled_at = now
+
+    async def acquire(self) -> None:
+        """Wait until the bucket holds a token, then take it."""
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._resume_at:
+                    await asyncio.sleep(self._resume_at - now)
+                    continue
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def update(
+        self,
+        status: int | None,
+        headers: Mapping[str, str] | None = None,
+        latency: float | None = None,
+    ) -> None:
+        """
+        Re-tune the limiter from a response.
+
+        Args:
+            status (int | None): HTTP status of the response, or None if the \
+                request failed before a response was received.
+            headers (Mapping[str, str] | None, optional): Response headers. \
+                Defaults to None.
+            latency (float | None, optional): Seconds the request took. \
+                Defaults to None.
+        """
+
+        if headers:
+            self._update_rate(headers)
+
+        if status == 429:
+            self.throttled += 1
+            retry_after = (headers or {}).get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                self._resume_at = time.monotonic() + int(retry_after)
+            self.tokens = 0
+            self._decrease()
+        elif status is None or status >= 500:
+            self.errors += 1
+            self._decrease()
+        elif not 200 <= status < 300:
+            # The request itself was at fault, not the API's capacity
+            self.rejected += 1
+        else:
+            self.successes += 1
+            if latency is not None and self._is_congested(latency):
+                self._decrease()
+            else:
+                # Additive increase: about one more request per round trip
+                self.window = min(
+                    self.max_concurrency,
+                    self.window + 1 / self.window,
+                )
+
+    def _update_rate(self, headers: Mapping[str, str]) -> None:
+        limit = headers.get("X-Rate-Limit-Limit")
+        interval = headers.get("X-Rate-Limit-Interval")
+        if not limit or not interval:
+            return
+        seconds = parse_interval(interval)
+        try:
+            limit = float(limit)
+        except ValueError:
+            return
+        if seconds and limit > 0:
+            self.rate = limit / seconds * HEADROOM
+            self.tokens = min(self.tokens, self.capacity)
+
+    def _is_congested(self, latency: float) -> bool:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * latency
+        # The baseline drifts upwards so that a lasting change in the API's
+        # latency is eventually accepted as the new normal.
+        if self.base_latency is None:
+            self.base_latency = self.latency
+        else:
+            self.base_latency = min(self.latency, self.base_latency * 1.01)
+        return self.latency > self.base_latency * self.latency_factor
+
+    def _decrease(self) -> None:
+        # Cut at most once per round trip, so that one burst of bad
+        # responses does not collapse the window to its floor.
+        now = time.monotonic()
+        if now - self._decreased_at < (self.latency or 0):
+            return
+        self._decreased_at = now
+        self.window = max(
+            self.min_concurrency,
+            self.window * self.decrease_factor,
+        )
@@ -0,0 +1,89 @@
+import hashlib
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Number of recent hashes kept in a set before being merged into the array
+MERGE_THRESHOLD = 1 << 16
+
+
+class SeenSet:
+    """
+    Memory-compact set of the DOIs already stored. Each DOI is reduced to a \
+        64-bit hash, and the hashes are kept in a sorted array of 8 bytes \
+        per entry, searched by bisection. Recently added hashes wait in a \
+        small set until they are merged into the array in bulk. With 64-bit \
+        hashes, a false positive among a hundred million DOIs has a \
+        probability below 1 in 3,000.
+    """
+
+    def __init__(self, merge_threshold: int = MERGE_THRESHOLD) -> None:
+        self.hashes = array("Q")
+        self.pending: set[int] = set()
+        self.merge_threshold = merge_threshold
+
+    @staticmethod
+    def hash(doi: str) -> int:
+        """Reduce a DOI, which is case-insensitive, to a 64-bit hash."""
+
+        digest = hashlib.blake2b(doi.lower().encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def __len__(self) -> int:
+        return len(self.hashes) + len(self.pending)
+
+    def __contains__(self, doi: str) -> bool:
+        return self._contains_hash(self.hash(doi))
+
+    def _contains_hash(self, h: int) -> bool:
+        if h in self.pending:
+            return True
+        i = bisect_left(self.hashes, h)
+        return i < len(self.hashes) and self.hashes[i] == h
+
+    def add(self, doi: str) -> bool:
+        """
+        Add a DOI to the set.
+
+        Args:
+            doi (str): DOI of a work.
+
+        Returns:
+            bool: Whether the DOI was new to the set.
+        """
+
+        h = self.hash(doi)
+        if self._contains_hash(h):
+            return False
+        self.pending.add(h)
+        if len(self.pending) >= self.merge_threshold:
+            self.merge(array("Q", self.pending))
+            self.pending.clear()
+        return True
+
+    def update(self, dois: Iterable[str]) -> None:
+        """Add many DOIs at once, such as when seeding the set."""
+
+        self.merge(array("Q", (self.hash(doi) for doi in dois)))
+
+    def merge(self, hashes: array) -> None:
+        """Merge hashes into the sorted array, dropping duplicates."""
+
+        if not hashes:
+            return
+        chunks = [
+            pa.Array.from_buffers(pa.uint64(), len(a), [None, pa.py_buffer(a)])
+            for a in (self.hashes, hashes)
+            if len(a)
+        ]
+        merged = pa.concat_arrays(chunks)
+        merged = pc.unique(pc.take(merged, pc.array_sort_indices(merged)))
+        data = merged.buffers()[1]
+        start = merged.offset * 8
+        self.hashes = array("Q")
+        self.hashes.frombytes(memoryview(data)[start : start + len(merged) * 8])
+        # Pending hashes may now be in the array too
+        self.pending.difference_update(hashes)
@@ -0,0 +1,93 @@
+"""
+Statistics of a variable given as a histogram, i.e. as pairs of a value \
+    and the number of times it occurs, such as the number of a member's \
+    DOIs issued each year. They are computed in time proportional to the \
+    number of distinct values, without expanding the histogram into one \
+    element per occurrence, and agree with the functions of the statistics \
+    module applied to the expanded data.
+"""
+
+import math
+from collections.abc import Iterable
+from statistics import StatisticsError
+
+Histogram = Iterable[tuple[float, int]]
+
+
+def _pairs(histogram: Histogram) -> tuple[list[tuple[float, int]], int]:
+    pairs = [(v, c) for v, c in histogram if c]
+    if any(c < 0 for _, c in pairs):
+        raise StatisticsError("counts must be non-negative")
+    n = sum(c for _, c in pairs)
+    if not n:
+        raise StatisticsError("statistics require at least one data point")
+    return pairs, n
+
+
+def weighted_mean(histogram: Histogram) -> float:
+    pairs, n = _pairs(histogram)
+    return math.fsum(v * c for v, c in pairs) / n
+
+
+def weighted_pvariance(histogram: Histogram) -> float:
+    """
+    Population variance of the data, like statistics.pvariance. The squared \
+        deviations are taken from the mean, which keeps their sum accurate \
+        for values far from zero, such as years.
+
+    Args:
+        histogram (Histogram): Pairs of a value and its count.
+
+    Returns:
+        float: Population variance.
+    """
+
+    pairs, n = _pairs(histogram)
+    mean = math.fsum(v * c for v, c in pairs) / n
+    return math.fsum(c * (v - mean) ** 2 for v, c in pairs) / n
+
+
+def weighted_geometric_mean(histogram: Histogram) -> float:
+    """
+    Geometric mean of the data, like statistics.geometric_mean.
+
+    Args:
+        histogram (Histogram): Pairs of a positive value and its count.
+
+    Raises:
+        StatisticsError: A value is not positive.
+
+    Returns:
+        float: Geometric mean.
+    """
+
+    pairs, n = _pairs(histogram)
+    if any(v <= 0 for v, _ in pairs):
+        raise StatisticsError("geometric mean requires positive values")
+    return math.exp(math.fsum(c * math.log(v) for v, c in pairs) / n)
+
+
+def weighted_quantile(histogram: Histogram, q: float) -> float:
+    """
+    Value below which a proportion of the data falls, by the nearest-rank \
+        method: the smallest value whose cumulative count reaches that \
+        proportion of the data. The median, q = 0.5, is then the value of \
+        statistics.median_low.
+
+    Args:
+        histogram (Histogram): Pairs of a value and its count.
+        q (float): Proportion of the data, between 0 and 1.
+
+    Returns:
+        float: Quantile of the data.
+    """
+
+    if not 0 <= q <= 1:
+        raise ValueError("q must be between 0 and 1")
+    pairs, n = _pairs(histogram)
+    rank = max(1, math.ceil(q * n))
+    cumulative = 0
+    for v, c in sorted(pairs):
+        cumulative += c
+        if cumulative >= rank:
+            return v
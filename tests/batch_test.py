@@ -0,0 +1,93 @@
+import pickle
+import unittest
+
+from src.api.models.batch import CreativeWorkBatch, CrossrefMemberBatch
+from src.api.models.member import CrossrefMember
+from src.api.models.work import CreativeWork
+from tests.stand_in_server import make_item
+
+
+class ModelBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.items = [make_item(i) for i in range(10)]
+        self.items[3].pop("is-referenced-by-count")
+        self.records = [
+            CreativeWork.load_json(item=i, has_refs=True) for i in self.items
+        ]
+        self.batch = CreativeWorkBatch.load_json(
+            items=self.items,
+            has_refs=True,
+        )
+
+    def test_rows(self):
+        """
+        The batch should read as the sequence of the works it stores, \
+            whether its rows are iterated over or indexed.
+        """
+        self.assertEqual(len(self.batch), 10)
+        self.assertListEqual(list(self.batch), self.records)
+        self.assertEqual(self.batch[3], self.records[3])
+        self.assertEqual(self.batch[-1], self.records[-1])
+        self.assertIsNone(self.batch[3].citations_incoming)
+        with self.assertRaises(IndexError):
+            self.batch[10]
+
+    def test_columns(self):
+        """
+        A missing optional value should be marked as null in its column, \
+            and the batch handed over to Arrow without a copy.
+        """
+        column = self.batch.column("citations_incoming")
+        self.assertEqual(column.null_count, 1)
+        self.assertFalse(column.is_valid()[3].as_py())
+        arrow = self.batch.to_arrow()
+        self.assertIs(arrow, self.batch.to_arrow())
+        self.assertTrue(arrow.schema.equals(CreativeWork.arrow_schema()))
+
+    def test_from_records(self):
+        """
+        Records stored column by column should be read back unchanged.
+        """
+        batch = CreativeWorkBatch.from_records(self.records)
+        self.assertTrue(batch.to_arrow().equals(self.batch.to_arrow()))
+        self.assertEqual(len(CreativeWorkBatch.from_records([])), 0)
+
+    def test_slice_and_filter(self):
+        """
+        Slicing or filtering the batch should return batches of the rows \
+            kept.
+        """
+        self.assertListEqual(list(self.batch[2:5]), self.records[2:5])
+        self.assertListEqual(list(self.batch[:100]), self.records)
+        self.assertListEqual(list(self.batch[::3]), self.records[::3])
+        mask = [i % 2 == 0 for i in range(10)]
+        kept = self.batch.filter(mask)
+        self.assertIsInstance(kept, CreativeWorkBatch)
+        self.assertListEqual(list(kept), self.records[::2])
+
+    def test_pickle(self):
+        """
+        A batch should be shipped between processes, such as from a parse \
+            worker, as its Arrow buffers.
+        """
+        batch = pickle.loads(pickle.dumps(self.batch))
+        self.assertListEqual(list(batch), self.records)
+
+    def test_members(self):
+        """
+        A batch of members should read back as the modelled members.
+        """
+        message = {
+            "id": 1,
+            "primary-name": "Member",
+            "counts": {"total-dois": 2},
+            "breakdowns": {"dois-by-issued-year": [[2020, 2]]},
+            "counts-type": {"all": {"journal-article": 2}},
+            "coverage": {"references-current": 0.5},
+        }
+        batch = CrossrefMemberBatch.load_json(messages=[message])
+        self.assertEqual(batch[0], CrossrefMember.load_json(message=message))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import tempfile
+import time
+import unittest
+
+from src.api.cache import ResponseCache
+from src.api.client import Client
+from stand_in_server import StandInServer
+
+URL = "https://api.crossref.org/members/3884"
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """
+        A stored response should be returned as is and counted as a hit, \
+            while an unknown URL should count as a miss.
+        """
+        cache = ResponseCache(directory=self.tmp.name)
+        cache.put(URL, b'{"message": {}}')
+        self.assertEqual(cache.get(URL), b'{"message": {}}')
+        self.assertIsNone(cache.get(URL + "5"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_entries_persist_between_instances(self):
+        """
+        A new cache opened on the same directory should find the entries \
+            stored by an earlier one.
+        """
+        ResponseCache(directory=self.tmp.name).put(URL, b"{}")
+        cache = ResponseCache(directory=self.tmp.name)
+        self.assertEqual(len(cache.index), 1)
+        self.assertEqual(cache.get(URL), b"{}")
+
+    def test_expired_entry_is_a_miss(self):
+        """
+        An entry whose TTL has elapsed should be evicted when it is read.
+        """
+        cache = ResponseCache(directory=self.tmp.name)
+        cache.put(URL, b"{}", ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(URL))
+        self.assertEqual(len(cache.index), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        When the cache outgrows its size cap, the entry read least recently \
+            should be evicted first.
+        """
+        cache = ResponseCache(directory=self.tmp.name, max_bytes=800)
+        body = b"x" * 150
+        for i in range(3):
+            cache.put(f"{URL}/{i}", body)
+        # Read the oldest entry, so that the second one becomes the LRU
+        cache.get(f"{URL}/0")
+        cache.put(f"{URL}/3", body)
+        self.assertLessEqual(cache.size, 800)
+        self.assertIsNone(cache.get(f"{URL}/1"))
+        self.assertIsNotNone(cache.get(f"{URL}/0"))
+        self.assertIsNotNone(cache.get(f"{URL}/3"))
+
+    def test_client_consults_cache_before_api(self):
+        """
+        Collecting the same members twice should call the API only the \
+            first time.
+        """
+        ids = ["3884", "3885", "3886"]
+        cache = ResponseCache(directory=self.tmp.name)
+        with StandInServer() as server:
+            with Client(base_url=server.base_url, cache=cache) as client:
+                first = list(client.get_members(ids=ids))
+                requests = server.requests
+                second = list(client.get_members(ids=ids))
+        self.assertEqual(requests, 3)
+        self.assertEqual(server.requests, 3)
+        self.assertCountEqual([m.id for m in first], [m.id for m in second])
+        self.assertEqual(cache.hits, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import tempfile
+import threading
+import unittest
+
+from src.api.checkpoint import CheckpointJournal, UnknownRunException
+
+
+class CheckpointJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_replays_the_journal(self):
+        """
+        A resumed journal should know the run's parameters, the inserted \
+            batches and the planned items that are still to be collected.
+        """
+        journal = CheckpointJournal.start(
+            command="insert-members",
+            params={"database": "testdb"},
+            directory=self.tmp.name,
+        )
+        journal.record_plan(["3884", "3885", "3886"])
+        journal.record_batch(rows=1, keys=["3885"])
+
+        resumed = CheckpointJournal.resume(
+            run_id=journal.run_id,
+            command="insert-members",
+            directory=self.tmp.name,
+        )
+        self.assertEqual(resumed.params, {"database": "testdb"})
+        self.assertEqual(resumed.batches, 1)
+        self.assertListEqual(resumed.remaining(), ["3884", "3886"])
+
+    def test_incomplete_plan(self):
+        """
+        A run that died while planning should know that its plan is \
+            incomplete, until the marker that closes the plan is recorded.
+        """
+        journal = CheckpointJournal.start(
+            command="insert-members",
+            params={"database": "testdb"},
+            directory=self.tmp.name,
+        )
+        journal.record_plan(["3884", "3885"])
+
+        resumed = CheckpointJournal.resume(
+            run_id=journal.run_id,
+            command="insert-members",
+            directory=self.tmp.name,
+        )
+        self.assertFalse(resumed.plan_complete)
+        resumed.record_plan(["3886"])
+        resumed.complete_plan()
+
+        resumed = CheckpointJournal.resume(
+            run_id=journal.run_id,
+            command="insert-members",
+            directory=self.tmp.name,
+        )
+        self.assertTrue(resumed.plan_complete)
+        self.assertListEqual(resumed.remaining(), ["3884", "3885", "3886"])
+
+    def test_concurrent_appends(self):
+        """
+        Batches recorded from several threads at once should each be \
+            written as a whole entry, and all be replayed.
+        """
+        journal = CheckpointJournal.start(
+            command="insert-members",
+            params={"database": "testdb"},
+            directory=self.tmp.name,
+        )
+
+        def record(thread: int):
+            for i in range(200):
+                journal.record_batch(rows=1, keys=[f"{thread}-{i}"])
+
+        threads = [threading.Thread(target=record, args=(t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        resumed = CheckpointJournal.resume(
+            run_id=journal.run_id,
+            command="insert-members",
+            directory=self.tmp.name,
+        )
+        self.assertEqual(resumed.batches, 800)
+        self.assertEqual(len(resumed.completed), 800)
+
+    def test_truncated_entry_is_ignored(self):
+        """
+        A run that died while writing its last entry should resume from the \
+            last complete entry.
+        """
+        journal = CheckpointJournal.start(
+            command="insert-samples",
+            params={"samples": 10},
+            directory=self.tmp.name,
+        )
+        journal.record_batch(rows=100)
+        with open(journal.path, "a") as f:
+            f.write('{"event": "batch", "ro')
+
+        resumed = CheckpointJournal.resume(
+            run_id=journal.run_id,
+            command="insert-samples",
+            directory=self.tmp.name,
+        )
+        self.assertEqual(resumed.batches, 1)
+        self.assertEqual(resumed.rows, 100)
+
+    def test_unknown_run_cannot_be_resumed(self):
+        """
+        Resuming a missing run, or a run of another command, should fail.
+        """
+        journal = CheckpointJournal.start(
+            command="insert-samples",
+            params={"samples": 10},
+            directory=self.tmp.name,
+        )
+        with self.assertRaises(UnknownRunException):
+            CheckpointJournal.resume(
+                run_id="missing",
+                command="insert-samples",
+                directory=self.tmp.name,
+            )
+        with self.assertRaises(UnknownRunException):
+            CheckpointJournal.resume(
+                run_id=journal.run_id,
+                command="insert-members",
+                directory=self.tmp.name,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
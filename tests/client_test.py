@@ -1,8 +1,17 @@
+import asyncio
 import unittest
 
 from rich.progress import BarColumn, Progress, TimeElapsedColumn
 
-from src.api.client import Client
+from src.api.client import (
+    SAMPLE_ROUND,
+    AsyncClient,
+    Client,
+    RequestFailedException,
+)
+from src.api.models.batch import CreativeWorkBatch
+from src.api.models.work import CreativeWork
+from stand_in_server import StandInServer
 
 MAILTO = "user@mail.com"
 
@@ -11,11 +20,16 @@ WITHOUT_REFERENCES_URL = "https://api.crossref.org/works?sample=100&mailto=user%
 
 MEMBERS_URL = "https://api.crossref.org/members/3884"
 
+CURSOR_URL = "https://api.crossref.org/works?rows=1000&cursor=%2A&mailto=user%40mail.com&select=DOI%2Cmember%2Cdeposited%2Ccreated%2Ctype%2Creferences-count%2Cis-referenced-by-count&filter=has-references%3A0"
+
 
 class ClientTest(unittest.TestCase):
     def setUp(self):
         self.client = Client(mailto=MAILTO)
 
+    def tearDown(self):
+        self.client.close()
+
     def test_works_endpoint(self):
         """
         The client should build a URL that filters on whether or not works
@@ -29,6 +43,15 @@ class ClientTest(unittest.TestCase):
         expected = WITHOUT_REFERENCES_URL
         self.assertEqual(actual, expected)
 
+    def test_cursor_endpoint(self):
+        """
+        The client should build a deep-paging URL that starts a new cursor \
+            and keeps the same selection and filter as the samples.
+        """
+        actual = self.client.build_cursor_endpoint(has_references=False)
+        expected = CURSOR_URL
+        self.assertEqual(actual, expected)
+
     def test_works_request(self):
         """
         The client should request and return 2 samples of 100 items each.
@@ -64,5 +87,210 @@ class ClientTest(unittest.TestCase):
             self.assertEqual(expected, actual)
 
 
+class StandInClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(latency=0.05).__enter__()
+
+    def tearDown(self):
+        self.server.__exit__()
+
+    def test_async_samples_are_bounded_by_concurrency(self):
+        """
+        The async client should return every sample while never keeping more \
+            requests in flight than its concurrency ceiling.
+        """
+
+        async def collect():
+            async with AsyncClient(
+                mailto=MAILTO,
+                concurrency=4,
+                base_url=self.server.base_url,
+            ) as client:
+                return [
+                    records
+                    async for records in client.get_samples(
+                        has_references=True,
+                        n=20,
+                    )
+                ]
+
+        samples = asyncio.run(collect())
+        self.assertEqual(len(samples), 20)
+        self.assertTrue(all(len(records) == 100 for records in samples))
+        self.assertLessEqual(self.server.max_in_flight, 4)
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_sync_client_reuses_connections(self):
+        """
+        The synchronous wrapper should keep its connection pool between \
+            calls, so a second call opens no new connections.
+        """
+        with Client(concurrency=2, base_url=self.server.base_url) as client:
+            members = list(client.get_members(ids=["3884", "3885"]))
+            connections = self.server.connections
+            members += list(client.get_members(ids=["3886", "3887"]))
+        self.assertEqual(self.server.connections, connections)
+        actual = [m.id for m in members]
+        self.assertCountEqual(actual, ["3884", "3885", "3886", "3887"])
+
+    def test_harvest_walks_every_page_once(self):
+        """
+        The harvest should follow the cursor to the last page and return \
+            each work exactly once.
+        """
+        with Client(base_url=self.server.base_url) as client:
+            total = client.count_works(has_references=False)
+            pages = list(client.harvest(has_references=False))
+        dois = [r.doi for records in pages for r in records]
+        self.assertEqual(total, 2500)
+        self.assertEqual([len(p) for p in pages], [1000, 1000, 500])
+        self.assertEqual(len(set(dois)), total)
+
+    def test_harvest_stops_at_limit(self):
+        """
+        The harvest should stop once it has returned the requested number \
+            of works.
+        """
+        with Client(base_url=self.server.base_url) as client:
+            pages = list(client.harvest(has_references=False, limit=1200))
+        self.assertEqual([len(p) for p in pages], [1000, 200])
+
+    def test_harvest_arrow_batches(self):
+        """
+        Whether parsed column by column or work by work, the harvest should \
+            yield each page as the same batch of works.
+        """
+        with Client(base_url=self.server.base_url) as client:
+            pages = list(client.harvest(has_references=False, limit=1200, arrow=True))
+            by_item = list(client.harvest(has_references=False, limit=1200))
+        self.assertEqual([len(p) for p in pages], [1000, 200])
+        for page, other in zip(pages, by_item):
+            self.assertIsInstance(page, CreativeWorkBatch)
+            self.assertTrue(page.to_arrow().equals(other.to_arrow()))
+        schema = pages[0].to_arrow().schema
+        self.assertTrue(schema.equals(CreativeWork.arrow_schema()))
+
+    def test_samples_parsed_in_process_pool(self):
+        """
+        With parse workers, the client should ship the raw responses to its \
+            process pool and yield the same modelled batches.
+        """
+        with Client(
+            base_url=self.server.base_url,
+            parse_workers=2,
+        ) as client:
+            samples = list(client.get_samples(has_references=True, n=6))
+        self.assertEqual(len(samples), 6)
+        self.assertTrue(all(len(records) == 100 for records in samples))
+        self.assertTrue(all(r.has_refs for records in samples for r in records))
+        dois = {r.doi for records in samples for r in records}
+        self.assertEqual(len(dois), 600)
+
+    def test_member_pages_keep_only_requested_ids(self):
+        """
+        Paging through the list of members should return only the requested \
+            members, and stop once they have all been found.
+        """
+        ids = ["3884", "3900", "3950"]
+        with Client(base_url=self.server.base_url, concurrency=1) as client:
+            pages = list(client.get_member_pages(ids=ids, rows=50))
+        actual = [m.id for records in pages for m in records]
+        self.assertCountEqual(actual, ids)
+        # 1 request for the total, then 2 pages out of 5
+        self.assertEqual(self.server.requests, 3)
+
+
+class RetryTest(unittest.TestCase):
+    def test_backoff_grows_exponentially_with_jitter(self):
+        """
+        The delay before a retry should stay between 0 and the exponential \
+            ceiling of its attempt.
+        """
+        client = AsyncClient(backoff=0.5)
+        for attempt in range(5):
+            delay = client.backoff_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, 0.5 * 2**attempt)
+
+    def test_failed_samples_are_retried_until_delivered(self):
+        """
+        Transient failures, including dropped connections, should be \
+            retried, first with backoff then from the failure queue, so that \
+            every requested sample is delivered.
+        """
+        faults = [503, "drop", 503, 503, 500, 503]
+        with StandInServer(faults=faults) as server:
+            with Client(
+                base_url=server.base_url,
+                concurrency=1,
+                retries=1,
+                backoff=0.01,
+            ) as client:
+                samples = list(client.get_samples(has_references=True, n=4))
+        self.assertEqual(len(samples), 4)
+        self.assertEqual(client.failures, [])
+        self.assertEqual(server.requests, 4 + len(faults))
+
+    def test_failed_samples_are_topped_up(self):
+        """
+        Samples still failing from the failure queue should be requested \
+            again until the requested number is delivered, and be reported \
+            only once the API stops answering.
+        """
+        with StandInServer(faults=[503, 503, 503]) as server:
+            with Client(
+                base_url=server.base_url,
+                concurrency=1,
+                retries=0,
+            ) as client:
+                samples = list(client.get_samples(has_references=True, n=2))
+        self.assertEqual(len(samples), 2)
+        self.assertEqual(client.failures, [])
+        self.assertEqual(server.requests, 5)
+
+        with StandInServer(faults=[503] * 10) as server:
+            with Client(
+                base_url=server.base_url,
+                concurrency=1,
+                retries=0,
+            ) as client:
+                samples = list(client.get_samples(has_references=True, n=2))
+        self.assertEqual(len(samples), 0)
+        self.assertEqual(len(client.failures), 2)
+        self.assertEqual(server.requests, 4)
+
+    def test_unbounded_samples_stop_when_every_request_fails(self):
+        """
+        Samples collected until the consumer stops should end once a whole \
+            round of requests fails, with only that round's failures kept, \
+            rather than request for ever without yielding.
+        """
+        faults = [503] * (2 * SAMPLE_ROUND)
+        with StandInServer(faults=faults) as server:
+            with Client(
+                base_url=server.base_url,
+                concurrency=50,
+                retries=0,
+            ) as client:
+                samples = list(client.get_samples(has_references=True, n=None))
+        self.assertEqual(samples, [])
+        self.assertEqual(len(client.failures), SAMPLE_ROUND)
+        self.assertEqual(server.requests, 2 * SAMPLE_ROUND)
+
+    def test_permanent_failures_are_not_retried(self):
+        """
+        A missing member should be reported as a failure without being \
+            requested again.
+        """
+        with StandInServer(faults=[404]) as server:
+            with Client(base_url=server.base_url, backoff=0.01) as client:
+                members = list(client.get_members(ids=["1", "2"]))
+        self.assertEqual(len(members), 1)
+        self.assertEqual(server.requests, 2)
+        self.assertEqual(len(client.failures), 1)
+        self.assertIsInstance(client.failures[0], RequestFailedException)
+        self.assertEqual(client.failures[0].status, 404)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,21 @@
 import json
+import tempfile
+import threading
+import time
 import unittest
+from functools import partial
 from pathlib import Path
 
+from src.api.checkpoint import CheckpointJournal
 from src.api.cli.insert_members import get_unique_members
-from src.api.database import ClickHouseDB
+from src.api.database import (
+    CONNECTION_SETTINGS,
+    BufferedInserter,
+    ClickHouseDB,
+    client_options,
+    configure_connections,
+)
+from src.api.models.batch import CreativeWorkBatch
 from src.api.models.member import CrossrefMember
 from src.api.models.work import CreativeWork
 
@@ -109,6 +121,27 @@ class DatabaseTest(unittest.TestCase):
         """
         self.db.create_table(table=CreativeWork)
 
+    def test_engine_of_existing_table(self):
+        """
+        Only a table that was created with a replacing engine should be read \
+            with the FINAL modifier, whatever engine its model declares.
+        """
+        self.assertEqual(
+            self.db.select_from(CreativeWork),
+            "creativework FINAL",
+        )
+        self.db.client.command(CreativeWork.create_drop_statement())
+        self.db.client.command(
+            CreativeWork.create_table_statement().replace(
+                CreativeWork.engine_clause(),
+                "ENGINE = MergeTree()\nORDER BY doi",
+            )
+        )
+        engine = self.db.describe_engine(CreativeWork)
+        self.assertEqual(engine["engine"], "MergeTree")
+        self.assertEqual(engine["sorting_key"], "doi")
+        self.assertEqual(self.db.select_from(CreativeWork), "creativework")
+
     def test_insert_data(self):
         """
         The database client should insert 2 identical rows into the \
@@ -127,5 +160,201 @@ class DatabaseTest(unittest.TestCase):
         self.assertListEqual(expected, actual)
 
 
+class RecordingDB:
+    """Stand-in for the database that records the batches it receives."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False) -> None:
+        self.batches = []
+        self.delay = delay
+        self.fail = fail
+
+    def insert_records(self, records: list) -> None:
+        time.sleep(self.delay)
+        if self.fail:
+            raise ValueError("insert failed")
+        self.batches.append(list(records))
+
+    def insert_arrow(self, table, batch) -> None:
+        self.insert_records(records=batch.to_pylist())
+
+
+class BufferedInserterTest(unittest.TestCase):
+    def setUp(self):
+        self.work = CreativeWork.load_json(ITEM, has_refs=False)
+        self.member = CrossrefMember.load_json(message=MEMBER_3884["message"])
+
+    def test_flush_on_rows(self):
+        """
+        The inserter should insert a table's records once its buffer holds \
+            enough rows, and each table's records separately.
+        """
+        db = RecordingDB()
+        with BufferedInserter(db=db, max_rows=10) as inserter:
+            for _ in range(25):
+                inserter.add([self.work])
+            inserter.add([self.member])
+        sizes = sorted(len(b) for b in db.batches)
+        self.assertListEqual(sizes, [1, 5, 10, 10])
+        self.assertEqual(inserter.inserted, 26)
+
+    def test_flush_on_bytes(self):
+        db = RecordingDB()
+        with BufferedInserter(db=db, max_bytes=1) as inserter:
+            inserter.add([self.work, self.work])
+            inserter.add([self.work])
+        self.assertListEqual([len(b) for b in db.batches], [2, 1])
+
+    def test_arrow_batches(self):
+        """
+        Columnar batches should be buffered apart from records, and be \
+            inserted together once they hold enough rows.
+        """
+        db = RecordingDB()
+        batch = CreativeWork.load_arrow(items=ITEMS, has_refs=False)
+        with BufferedInserter(db=db, max_rows=5) as inserter:
+            inserter.add_arrow(table=CreativeWork, batch=batch)
+            inserter.add([self.work])
+            inserter.add_arrow(table=CreativeWork, batch=batch)
+        self.assertListEqual(sorted(len(b) for b in db.batches), [1, 6])
+        self.assertEqual(inserter.inserted, 7)
+
+    def test_model_batches(self):
+        """
+        A batch of records stored column by column should be buffered with \
+            the table's other columnar batches.
+        """
+        db = RecordingDB()
+        batch = CreativeWork.load_arrow(items=ITEMS, has_refs=False)
+        with BufferedInserter(db=db, max_rows=5) as inserter:
+            inserter.add(CreativeWorkBatch(batch))
+            inserter.add_arrow(table=CreativeWork, batch=batch)
+        self.assertListEqual([len(b) for b in db.batches], [6])
+
+    def test_flush_on_time(self):
+        db = RecordingDB()
+        with BufferedInserter(db=db, max_seconds=0.1) as inserter:
+            inserter.add([self.work])
+            time.sleep(0.5)
+            self.assertEqual(len(db.batches), 1)
+
+    def test_callbacks_after_insert(self):
+        """
+        A batch's callback should be called only once its records, and \
+            those added before them, have been inserted, even for a batch \
+            without records.
+        """
+        db = RecordingDB()
+        calls = []
+        with BufferedInserter(db=db, max_rows=3) as inserter:
+            inserter.add([self.work], on_inserted=lambda: calls.append(1))
+            self.assertListEqual(calls, [])
+            inserter.add([], on_inserted=lambda: calls.append(2))
+            time.sleep(0.1)
+            self.assertListEqual(calls, [])
+            inserter.add([self.work], on_inserted=lambda: calls.append(3))
+            inserter.add([], on_inserted=lambda: calls.append(4))
+        self.assertListEqual(calls, [1, 2, 3, 4])
+        self.assertEqual(len(db.batches), 1)
+
+    def test_journal_after_insert(self):
+        """
+        A run's journal should record a batch only once its records are \
+            stored, so that buffered records lost in a crash, or rejected by \
+            a failed insert, are collected again when the run resumes.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            journal = CheckpointJournal.start(
+                command="insert-samples",
+                params={"samples": 2},
+                directory=directory,
+            )
+            with BufferedInserter(db=RecordingDB(), max_rows=10) as inserter:
+                inserter.add(
+                    [self.work],
+                    on_inserted=partial(journal.record_batch, rows=1),
+                )
+                time.sleep(0.1)
+                self.assertEqual(journal.batches, 0)
+            self.assertEqual(journal.batches, 1)
+
+            inserter = BufferedInserter(db=RecordingDB(fail=True))
+            inserter.add(
+                [self.work],
+                on_inserted=partial(journal.record_batch, rows=1),
+            )
+            with self.assertRaises(ValueError):
+                inserter.close()
+            resumed = CheckpointJournal.resume(
+                run_id=journal.run_id,
+                command="insert-samples",
+                directory=directory,
+            )
+            self.assertEqual(resumed.batches, 1)
+
+    def test_backpressure(self):
+        """
+        While the background thread is busy and its queue is full, adding \
+            records should block.
+        """
+        db = RecordingDB(delay=0.2)
+        inserter = BufferedInserter(db=db, max_rows=1, max_pending=1)
+        added = threading.Event()
+
+        def produce():
+            for _ in range(4):
+                inserter.add([self.work])
+            added.set()
+
+        threading.Thread(target=produce).start()
+        self.assertFalse(added.wait(0.1))
+        inserter.close()
+        self.assertTrue(added.is_set())
+        self.assertEqual(len(db.batches), 4)
+
+    def test_error_is_raised(self):
+        db = RecordingDB(fail=True)
+        inserter = BufferedInserter(db=db)
+        inserter.add([self.work])
+        with self.assertRaises(ValueError):
+            inserter.close()
+
+
+class ConnectionSettingsTest(unittest.TestCase):
+    def setUp(self):
+        self.settings = dict(CONNECTION_SETTINGS)
+
+    def tearDown(self):
+        CONNECTION_SETTINGS.update(self.settings)
+
+    def test_client_options(self):
+        """
+        The connection settings should translate into clickhouse-connect's \
+            options, without a session so that threads can share a client.
+        """
+        options = client_options(
+            compression="zstd",
+            send_receive_timeout=30,
+            async_insert=True,
+        )
+        self.assertEqual(options["compress"], "zstd")
+        self.assertEqual(options["send_receive_timeout"], 30)
+        self.assertEqual(options["settings"]["wait_for_async_insert"], 1)
+        self.assertFalse(options["autogenerate_session_id"])
+
+        options = client_options(
+            compression="none",
+            send_receive_timeout=30,
+            async_insert=False,
+        )
+        self.assertFalse(options["compress"])
+        self.assertDictEqual(options["settings"], {})
+
+    def test_configure_connections(self):
+        configure_connections(compression="gzip")
+        self.assertEqual(CONNECTION_SETTINGS["compression"], "gzip")
+        with self.assertRaises(ValueError):
+            configure_connections(compresion="gzip")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,14 +1,36 @@
+import tempfile
 import unittest
 from pathlib import Path
+
+import duckdb
+import pyarrow as pa
 import pyarrow.parquet as pq
 
+from src.analysis.constants import WORKS_TABLE
+from src.analysis.utils import (
+    create_enum_statements,
+    read_parquet_source,
+    recast_columns,
+)
 from src.api.cli.export_table import (
+    NotIngestedException,
+    PartitionKey,
     build_query_for_selecting_distinct_rows,
+    encode_dictionaries,
+    find_watermark,
+    ingested_between,
     make_sure_outfile_is_parquet,
     fetch_unique_rows_in_pyarrow,
+    parse_partition_key,
+    partition_filter,
+    partition_path,
+    split_partitions,
+    write_partitions_from_stream,
+    write_pyarrow_stream_to_parquet,
     write_pyarrow_table_to_parquet,
 )
 from src.api.database import ClickHouseDB
+from src.api.manifest import ExportManifest
 from src.api.models.work import CreativeWork
 
 ITEMS = [
@@ -118,6 +140,307 @@ class DatabaseTest(unittest.TestCase):
             self.outfile.unlink()
 
 
+class StreamingParquetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.outfile = Path(self.tmp.name).joinpath("works.parquet")
+        self.blocks = [
+            pa.table({"doi": [f"{b}.{i}" for i in range(250)]}) for b in range(8)
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_row_groups(self):
+        """
+        The streamed blocks should be written in full row groups, and every \
+            row should be written once.
+        """
+        written = []
+        rows = write_pyarrow_stream_to_parquet(
+            blocks=iter(self.blocks),
+            fp=self.outfile,
+            row_group_size=500,
+            on_written=written.append,
+        )
+        f = pq.ParquetFile(self.outfile)
+        self.assertEqual(rows, 2000)
+        self.assertEqual(sum(written), 2000)
+        self.assertEqual(f.metadata.num_row_groups, 4)
+        self.assertTrue(f.read().equals(pa.concat_tables(self.blocks)))
+
+    def test_memory_ceiling(self):
+        """
+        Once the buffer reaches its memory ceiling, each block should be \
+            written as soon as it arrives, even before a row group is full.
+        """
+        written = []
+        write_pyarrow_stream_to_parquet(
+            blocks=iter(self.blocks),
+            fp=self.outfile,
+            row_group_size=100_000,
+            max_buffer_bytes=1,
+            on_written=written.append,
+        )
+        self.assertListEqual(written, [250] * 8)
+
+
+class DictionaryEncodingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.outfile = Path(self.tmp.name).joinpath("works.parquet")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_low_cardinality_columns(self):
+        """
+        The work types and members should be exported as dictionaries, \
+            whether ClickHouse sends them as strings or as dictionaries, and \
+            be loaded into DuckDB as ENUM columns.
+        """
+        columns = [c for c in CreativeWork.__annotations__]
+        row = {c: None for c in columns}
+        row.update(
+            doi="10.1123/att.5.5.39",
+            deposited="2020-01-02",
+            created="2019-01-02",
+            deposit_delay_days=365,
+            has_refs=True,
+            citations_outgoing=0,
+            member="100",
+            work_type="journal-article",
+        )
+        block = pa.Table.from_pylist([row])
+        small = block.set_column(
+            block.schema.get_field_index("member"),
+            "member",
+            pa.array(["100"], pa.dictionary(pa.int8(), pa.string())),
+        )
+        blocks = [
+            encode_dictionaries(block=b, table=CreativeWork) for b in (block, small)
+        ]
+        self.assertTrue(blocks[0].schema.equals(blocks[1].schema))
+        expected = CreativeWork.arrow_schema().field("work_type").type
+        self.assertEqual(blocks[0].schema.field("work_type").type, expected)
+
+        write_pyarrow_stream_to_parquet(blocks=blocks, fp=self.outfile)
+        table = pq.read_table(self.outfile)
+        self.assertEqual(table.schema.field("member").type, expected)
+
+        conn = duckdb.connect()
+        source = f"read_parquet('{self.outfile}')"
+        for stmt in create_enum_statements(model=CreativeWork, source=source):
+            conn.execute(stmt)
+        conn.execute(
+            f"CREATE TABLE works AS SELECT {recast_columns(CreativeWork)} "
+            f"FROM {source}"
+        )
+        types = conn.sql(
+            "SELECT typeof(work_type), typeof(member) FROM works"
+        ).fetchone()
+        expected = ("ENUM('journal-article')", "ENUM('100')")
+        self.assertTupleEqual(types, expected)
+        conn.close()
+
+
+class PartitionedDatasetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name).joinpath("works")
+        self.keys = [
+            parse_partition_key(spec="has_refs", table=CreativeWork),
+            parse_partition_key(spec="year(deposited)", table=CreativeWork),
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_partition_keys(self):
+        """
+        A column should be its own partition key, held by the directories, \
+            while the year of a date column should get a key of its own.
+        """
+        self.assertEqual(
+            self.keys,
+            [
+                PartitionKey("has_refs", "has_refs", "has_refs"),
+                PartitionKey("deposited_year", "toYear(deposited)"),
+            ],
+        )
+        with self.assertRaises(ValueError):
+            parse_partition_key(spec="year(doi)", table=CreativeWork)
+        with self.assertRaises(ValueError):
+            parse_partition_key(spec="created", table=CreativeWork)
+
+    def test_partition_filter(self):
+        work_type = parse_partition_key(spec="work_type", table=CreativeWork)
+        where, parameters = partition_filter(
+            keys=[self.keys[0], work_type],
+            values=(True, None),
+        )
+        self.assertEqual(where, "has_refs = {p0:Bool} AND work_type IS NULL")
+        self.assertDictEqual(parameters, {"p0": True})
+
+    def test_duckdb_reads_partitions(self):
+        """
+        DuckDB should read the partitions' keys back from the directory \
+            names, with the types of their columns.
+        """
+        columns = [c for c in CreativeWork.__annotations__ if c != "has_refs"]
+        for has_refs in (True, False):
+            fp = partition_path(self.directory, self.keys, (has_refs, 2020))
+            fp.parent.mkdir(parents=True)
+            row = {c: None for c in columns}
+            row.update(
+                doi=str(has_refs),
+                deposited="2020-01-02",
+                created="2019-01-02",
+                deposit_delay_days=365,
+                citations_outgoing=0,
+            )
+            pq.write_table(pa.Table.from_pylist([row]), fp)
+
+        source = read_parquet_source(str(self.directory), WORKS_TABLE)
+        rows = duckdb.sql(
+            f"SELECT doi, has_refs, deposited_year FROM {source} ORDER BY doi"
+        ).fetchall()
+        expected = [("False", False, 2020), ("True", True, 2020)]
+        self.assertListEqual(rows, expected)
+
+    def test_split_stream(self):
+        """
+        Rows streamed in blocks should be split into the partitions of their \
+            keys' values, each write to a new file of its partition without \
+            the columns that the directory names hold.
+        """
+        blocks = [
+            pa.Table.from_pylist(
+                [
+                    {"doi": doi, "has_refs": doi < "c", "deposited": date}
+                    for doi, date in rows
+                ]
+            )
+            for rows in [
+                [("a", "2020-01-02"), ("b", "2021-05-06")],
+                [("c", "2020-03-04"), ("d", "2020-07-08")],
+                [("e", "2020-09-10")],
+            ]
+        ]
+        written = write_partitions_from_stream(
+            blocks=blocks,
+            keys=self.keys,
+            directory=self.directory,
+            row_group_size=1,
+        )
+        self.assertEqual(written, 5)
+        fp = partition_path(self.directory, self.keys, (False, 2020))
+        self.assertEqual(pq.read_schema(fp).names, ["doi", "deposited"])
+        self.assertListEqual(
+            sorted(p.name for p in fp.parent.iterdir()),
+            ["part-0.parquet", "part-1.parquet"],
+        )
+
+        source = read_parquet_source(str(self.directory), WORKS_TABLE)
+        rows = duckdb.sql(
+            f"SELECT doi, has_refs, deposited_year FROM {source} ORDER BY doi"
+        ).fetchall()
+        expected = [
+            ("a", True, 2020),
+            ("b", True, 2021),
+            ("c", False, 2020),
+            ("d", False, 2020),
+            ("e", False, 2020),
+        ]
+        self.assertListEqual(rows, expected)
+
+    def test_split_dictionary_key(self):
+        """
+        A dictionary-encoded key, such as the member, should be split by its \
+            values, a null value included, in the order they first appear.
+        """
+        block = pa.table(
+            {
+                "doi": ["a", "b", "c", "d"],
+                "member": pa.array(["1", None, "2", "1"]).dictionary_encode(),
+            }
+        )
+        keys = [parse_partition_key(spec="member", table=CreativeWork)]
+        actual = [
+            (values, rows.column("doi").to_pylist())
+            for values, rows in split_partitions(block=block, keys=keys)
+        ]
+        expected = [(("1",), ["a", "d"]), ((None,), ["b"]), (("2",), ["c"])]
+        self.assertListEqual(actual, expected)
+
+
+class IncrementQueryTest(unittest.TestCase):
+    def test_latest_rows_of_window(self):
+        """
+        An increment should be read without merging the whole table, \
+            keeping the latest version of each work inserted in its window.
+        """
+        where, _ = ingested_between(
+            table=CreativeWork,
+            after="2024-01-01 00:00:00",
+            until="2024-01-02 00:00:00",
+        )
+        query = build_query_for_selecting_distinct_rows(
+            table=CreativeWork,
+            where=where,
+            deduplicates=True,
+            latest=True,
+        )
+        self.assertNotIn("FINAL", query)
+        self.assertIn(f"WHERE {where}", query)
+        self.assertIn(
+            "ORDER BY deposited DESC, ingested_at DESC LIMIT 1 BY doi",
+            query,
+        )
+
+    def test_table_without_insertion_time(self):
+        """
+        A table created before its rows were stamped with their insertion \
+            time should be refused, rather than fail on an unknown column.
+        """
+
+        class UnstampedDB:
+            def describe_table(self, table):
+                return {"doi": "String"}
+
+        with self.assertRaises(NotIngestedException):
+            find_watermark(table=CreativeWork, db=UnstampedDB())
+
+
+class IncrementalSourceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name).joinpath("works-backup")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_latest_version_is_read(self):
+        """
+        Read from the directory of an incremental export, a work exported \
+            in two parts should be read once, in its latest version.
+        """
+        manifest = ExportManifest(self.directory, table="creativework")
+        self.directory.mkdir()
+        for citations, dois in [(1, ["a", "b"]), (2, ["b", "c"])]:
+            fp = manifest.next_part()
+            rows = [{"doi": doi, "citations_outgoing": citations} for doi in dois]
+            pq.write_table(pa.Table.from_pylist(rows), fp)
+            manifest.add_part(fp=fp, rows=len(rows), watermark=str(citations))
+        manifest.save()
+
+        source = read_parquet_source(str(self.directory), WORKS_TABLE)
+        rows = duckdb.sql(
+            f"SELECT doi, citations_outgoing FROM {source} ORDER BY doi"
+        ).fetchall()
+        self.assertListEqual(rows, [("a", 1), ("b", 2), ("c", 2)])
+
+
 class OutfilePathTest(unittest.TestCase):
     expected = Path("works.parquet")
 
@@ -0,0 +1,103 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.api.cli.compact_export import compact_export
+from src.api.cli.export_table import ingested_between
+from src.api.manifest import ExportManifest, ManifestMismatchException
+from src.api.models.work import CreativeWork
+
+
+class ExportManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name).joinpath("works")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_part(
+        self,
+        manifest: ExportManifest,
+        rows: list,
+        watermark: str,
+    ):
+        fp = manifest.next_part()
+        self.directory.mkdir(exist_ok=True)
+        pq.write_table(pa.Table.from_pylist(rows), fp)
+        manifest.add_part(fp=fp, rows=len(rows), watermark=watermark)
+        manifest.save()
+
+    def test_reload(self):
+        """
+        A reopened manifest should list the parts in the order they were \
+            written and hold the latest watermark.
+        """
+        manifest = ExportManifest(self.directory, table="creativework")
+        self.write_part(manifest, [{"doi": "1"}], "2024-01-01 00:00:00")
+        self.write_part(manifest, [{"doi": "2"}], "2024-01-02 00:00:00")
+
+        manifest = ExportManifest(self.directory, table="creativework")
+        self.assertEqual(manifest.watermark, "2024-01-02 00:00:00")
+        self.assertEqual(manifest.rows, 2)
+        self.assertListEqual(
+            [fp.name for fp in manifest.list_part_paths()],
+            ["part-00000.parquet", "part-00001.parquet"],
+        )
+        with self.assertRaises(ManifestMismatchException):
+            ExportManifest(self.directory, table="crossrefmember")
+
+    def test_ingested_between(self):
+        where, parameters = ingested_between(
+            table=CreativeWork,
+            after="2024-01-01 00:00:00",
+            until="2024-01-02 00:00:00",
+        )
+        self.assertEqual(
+            where,
+            "ingested_at > {after:DateTime64(6)} "
+            "AND ingested_at <= {until:DateTime64(6)}",
+        )
+        self.assertEqual(len(parameters), 2)
+
+    def test_compaction_keeps_latest_rows(self):
+        """
+        Compaction should merge the parts into one, keeping only the latest \
+            exported version of a work, and keep the watermark.
+        """
+        manifest = ExportManifest(self.directory, table="creativework")
+        self.write_part(
+            manifest,
+            [
+                {"doi": "1", "citations_outgoing": 0},
+                {"doi": "2", "citations_outgoing": 0},
+            ],
+            "2024-01-01 00:00:00",
+        )
+        self.write_part(
+            manifest,
+            [{"doi": "1", "citations_outgoing": 5}],
+            "2024-01-02 00:00:00",
+        )
+        compact_export(table_choice="works", directory=self.directory)
+
+        manifest = ExportManifest(self.directory, table="creativework")
+        parts = manifest.list_part_paths()
+        self.assertEqual(len(parts), 1)
+        self.assertEqual(manifest.watermark, "2024-01-02 00:00:00")
+        self.assertEqual(list(self.directory.glob("*.parquet")), parts)
+        rows = pq.read_table(parts[0]).sort_by("doi").to_pylist()
+        self.assertListEqual(
+            rows,
+            [
+                {"doi": "1", "citations_outgoing": 5},
+                {"doi": "2", "citations_outgoing": 0},
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
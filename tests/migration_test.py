@@ -0,0 +1,202 @@
+import unittest
+
+from src.api.database import ClickHouseDB
+from src.api.migration import (
+    MigrationLog,
+    RebuildRequiredException,
+    engine_changed,
+    normalize_type,
+    plan_migration,
+)
+from src.api.models.base import BaseModel
+from src.api.models.member import CrossrefMember
+from src.api.models.work import CreativeWork
+
+# Engine of an up-to-date works table, as described by system.tables
+WORKS_ENGINE = {
+    "engine_full": "ReplacingMergeTree(deposited) PARTITION BY "
+    "toYear(created) ORDER BY doi SETTINGS index_granularity = 8192",
+    "sorting_key": "doi",
+    "partition_key": "toYear(created)",
+}
+
+
+def described(table) -> dict[str, str]:
+    """Columns of an up-to-date table, named as DESCRIBE TABLE does."""
+
+    return {
+        column: normalize_type(dtype) for column, dtype, _ in table.column_definitions()
+    }
+
+
+class PlanMigrationTest(unittest.TestCase):
+    def test_up_to_date(self):
+        """
+        A table with the model's columns should need no migration, even \
+            though ClickHouse names some of their types differently.
+        """
+        columns = described(CreativeWork)
+        self.assertListEqual(
+            plan_migration(table=CreativeWork, columns=columns),
+            [],
+        )
+        self.assertEqual(normalize_type("Nullable(Boolean)"), "Nullable(Bool)")
+
+    def test_add_columns(self):
+        """
+        A members table created before the histogram of years and the \
+            ingestion time should gain both columns in place, and its rows \
+            be stamped with the time of the migration.
+        """
+        columns = described(CrossrefMember)
+        columns.pop("creation_years")
+        columns.pop("ingested_at")
+        actual = plan_migration(table=CrossrefMember, columns=columns)
+        expected = [
+            "ALTER TABLE crossrefmember ADD COLUMN IF NOT EXISTS "
+            "creation_years Map(Int64, Int64) AFTER proceedings_articles",
+            "ALTER TABLE crossrefmember ADD COLUMN IF NOT EXISTS "
+            "ingested_at DateTime64(6) DEFAULT now64(6) AFTER creation_years",
+            "ALTER TABLE crossrefmember MATERIALIZE COLUMN ingested_at "
+            "SETTINGS mutations_sync = 1",
+        ]
+        self.assertListEqual(actual, expected)
+
+    def test_defaults_and_types(self):
+        """
+        An added column should be filled by its attribute's default, and a \
+            column whose type changed converted, while a column the model \
+            no longer declares is kept.
+        """
+        columns = described(CrossrefMember)
+        columns.pop("id")
+        columns.pop("journal_articles")
+        columns["total_dois"] = "Int32"
+        columns["retired"] = "String"
+        actual = plan_migration(table=CrossrefMember, columns=columns)
+        expected = [
+            "ALTER TABLE crossrefmember ADD COLUMN IF NOT EXISTS " "id String FIRST",
+            "ALTER TABLE crossrefmember MODIFY COLUMN IF EXISTS " "total_dois Int64",
+            "ALTER TABLE crossrefmember ADD COLUMN IF NOT EXISTS "
+            "journal_articles Nullable(Int64) DEFAULT 0 "
+            "AFTER creation_mean",
+        ]
+        self.assertListEqual(actual, expected)
+
+
+class PlanRebuildTest(unittest.TestCase):
+    def test_same_engine(self):
+        """
+        A table with the model's engine and keys should need no migration, \
+            even though ClickHouse describes them in its own words.
+        """
+        columns = described(CreativeWork)
+        actual = plan_migration(
+            table=CreativeWork,
+            columns=columns,
+            engine=WORKS_ENGINE,
+        )
+        self.assertListEqual(actual, [])
+        engine = {
+            "engine_full": "MergeTree ORDER BY tuple() SETTINGS "
+            "index_granularity = 8192",
+            "sorting_key": "",
+            "partition_key": "",
+        }
+        self.assertFalse(engine_changed(table=BaseModel, engine=engine))
+
+    def test_rebuild_on_engine_change(self):
+        """
+        A works table created with a plain engine and no keys should be \
+            rebuilt as a shadow table, keeping the column that only the \
+            table has, and then exchanged with it.
+        """
+        columns = described(CreativeWork)
+        columns["retired"] = "String"
+        engine = {
+            "engine_full": "MergeTree ORDER BY tuple() SETTINGS "
+            "index_granularity = 8192",
+            "sorting_key": "",
+            "partition_key": "",
+        }
+        actual = plan_migration(
+            table=CreativeWork,
+            columns=columns,
+            engine=engine,
+        )
+        self.assertEqual(actual[0], "DROP TABLE IF EXISTS creativework_new")
+        self.assertIn("CREATE TABLE IF NOT EXISTS creativework_new", actual[1])
+        self.assertIn("ENGINE = ReplacingMergeTree(deposited)", actual[1])
+        self.assertEqual(
+            actual[2],
+            "ALTER TABLE creativework_new ADD COLUMN IF NOT EXISTS " "retired String",
+        )
+        self.assertTrue(actual[3].startswith("INSERT INTO creativework_new"))
+        self.assertTrue(actual[3].endswith(", retired FROM creativework"))
+        self.assertListEqual(
+            actual[4:],
+            [
+                "EXCHANGE TABLES creativework_new AND creativework",
+                "DROP TABLE creativework_new",
+                "DROP VIEW IF EXISTS workmember_mv",
+                "DROP VIEW IF EXISTS worksummary_mv",
+                "DROP VIEW IF EXISTS workdelay_mv",
+            ],
+        )
+
+    def test_key_column_is_not_modified(self):
+        """
+        A sorting key column whose type changed should be converted by \
+            rebuilding the table, never by modifying the column in place.
+        """
+        columns = described(CreativeWork)
+        columns["doi"] = "Nullable(String)"
+        actual = plan_migration(table=CreativeWork, columns=columns)
+        self.assertFalse(any("MODIFY COLUMN" in stmt for stmt in actual))
+        self.assertIn(
+            "EXCHANGE TABLES creativework_new AND creativework",
+            actual,
+        )
+
+    def test_rebuild_not_allowed(self):
+        """
+        A table that must be rebuilt should be refused when only in-place \
+            changes are allowed, as when a command creates its tables.
+        """
+        columns = described(CreativeWork)
+        columns["doi"] = "Nullable(String)"
+        with self.assertRaises(RebuildRequiredException):
+            plan_migration(table=CreativeWork, columns=columns, rebuild=False)
+        columns = described(CreativeWork)
+        del columns["work_type"]
+        actual = plan_migration(
+            table=CreativeWork,
+            columns=columns,
+            engine=WORKS_ENGINE,
+            rebuild=False,
+        )
+        self.assertEqual(len(actual), 1)
+        self.assertIn("ADD COLUMN IF NOT EXISTS work_type", actual[0])
+
+
+class MigrateTableTest(unittest.TestCase):
+    def setUp(self):
+        self.db = ClickHouseDB(database_name="testdb")
+        self.db.recreate_table(table=CrossrefMember, prompt=False)
+
+    def test_migrate_table(self):
+        """
+        A column dropped from the table should be added back by the next \
+            use of the table, and the migration logged as its next version.
+        """
+        log = MigrationLog(client=self.db.client)
+        version = log.version(table=CrossrefMember)
+        self.db.client.command("ALTER TABLE crossrefmember DROP COLUMN creation_years")
+        self.db.create_table(table=CrossrefMember)
+        self.assertIn("creation_years", self.db.describe_table(CrossrefMember))
+        self.assertEqual(log.version(table=CrossrefMember), version + 1)
+        self.assertListEqual(self.db.migrate_table(CrossrefMember), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,13 @@
 import json
+import typing
 import unittest
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 
+import pyarrow as pa
+
+from src.api.models.base import BaseModel
 from src.api.models.member import CrossrefMember
 from src.api.models.work import CreativeWork
 
@@ -63,6 +69,41 @@ class ModelTest(unittest.TestCase):
         expected = 366
         self.assertEqual(actual, expected)
 
+    def test_arrow_batch_matches_dataclasses(self):
+        """
+        Parsed straight into an Arrow batch, the works should hold the same \
+            values as their dataclass instances, including the delays that \
+            depend on the time of day.
+        """
+        items = [ITEM1, ITEM2]
+        batch = CreativeWork.load_arrow(items=items, has_refs=False)
+        self.assertTrue(batch.schema.equals(CreativeWork.arrow_schema()))
+        expected = [
+            CreativeWork.load_json(item=i, has_refs=False).__dict__ for i in items
+        ]
+        self.assertListEqual(batch.to_pylist(), expected)
+
+    def test_date_column_parsing(self):
+        """
+        Parsed as a column, date-times with an offset or a fractional part \
+            should match those parsed one by one, to the second.
+        """
+        strings = [
+            "2020-10-01T15:50:12Z",
+            "2020-10-01T17:50:12+02:00",
+            "2020-10-01T15:50:12.999Z",
+        ]
+        expected = [
+            CreativeWork.parse_date({"date-time": s}).replace(microsecond=0)
+            for s in strings
+        ]
+        actual = CreativeWork.parse_date_column(strings).to_pylist()
+        self.assertListEqual(actual, expected)
+        self.assertListEqual(
+            CreativeWork.parse_date_column(strings[:2]).to_pylist(),
+            expected[:2],
+        )
+
     def test_class_string_attribute_conversion_to_sql(self):
         """
         The required and optional string attributes of the dataclass should \
@@ -105,6 +146,54 @@ class ModelTest(unittest.TestCase):
         expected = "Float64"
         self.assertEqual(actual, expected)
 
+    def test_create_table_statement_keys(self):
+        """
+        The works table should be created with a replacing engine, keyed \
+            by DOI and partitioned by a fixed property of the work, while a \
+            model without keys should keep an unsorted MergeTree.
+        """
+        stmt = CreativeWork.create_table_statement()
+        self.assertIn("ENGINE = ReplacingMergeTree(deposited)", stmt)
+        self.assertIn("PARTITION BY toYear(created)", stmt)
+        self.assertIn("ORDER BY doi", stmt)
+        self.assertTrue(CreativeWork.deduplicates())
+
+        stmt = BaseModel.engine_clause()
+        self.assertEqual(stmt, "ENGINE = MergeTree()\nORDER BY tuple()")
+        self.assertFalse(BaseModel.deduplicates())
+
+    def test_materialized_view_statements(self):
+        """
+        The works' view of their members should write into its own target \
+            table, selecting from the works table.
+        """
+        view = CreativeWork.materialized_views[0]
+        stmt = view.create_view_statement(source=CreativeWork.name_table())
+        self.assertIn("workmember_mv TO workmember", stmt)
+        self.assertIn("FROM creativework", stmt)
+        expected = [
+            "DROP VIEW IF EXISTS workmember_mv",
+            "DROP TABLE IF EXISTS workmember",
+        ]
+        self.assertListEqual(view.drop_statements(), expected)
+
+    def test_bounded_backfill(self):
+        """
+        A view's backfill should only read the rows matching its condition, \
+            before the view's own filter and grouping.
+        """
+        view = CreativeWork.materialized_views[0]
+        stmt = view.backfill_statement(
+            source="creativework",
+            where="ingested_at <= '2024-01-01'",
+        )
+        self.assertTrue(stmt.startswith("INSERT INTO workmember"))
+        self.assertIn(
+            "FROM (SELECT * FROM creativework WHERE ingested_at <= '2024-01-01')",
+            stmt,
+        )
+        self.assertIn("WHERE member IS NOT NULL", stmt)
+
     def test_member_year_breakdowns_parsing(self):
         """
         From the breakdown of years and deposits, which is a list of tuples, \
@@ -123,6 +212,90 @@ class ModelTest(unittest.TestCase):
         expected = 1991
         self.assertEqual(actual, expected)
 
+    def test_member_year_histogram(self):
+        """
+        The member's DOIs should be counted per year of issue, in a map \
+            column of the members table.
+        """
+        model = CrossrefMember.load_json(message=MEMBER["message"])
+        self.assertEqual(model.creation_years[2018], 4660)
+        self.assertEqual(sum(model.creation_years.values()), 169856)
+        self.assertIn(
+            "creation_years Map(Int64, Int64)",
+            CrossrefMember.create_table_statement(),
+        )
+
+
+@dataclass(slots=True)
+class SlottedModel(BaseModel):
+    id: str
+    created: datetime
+    flagged: typing.Optional[bool] = None
+
+
+class SchemaTest(unittest.TestCase):
+    def test_schema_of_model(self):
+        """
+        A model's schema should list its columns in the order they are \
+            declared, with their ClickHouse and DuckDB types.
+        """
+        schema = CrossrefMember.schema
+        self.assertEqual(schema.columns[:3], ("id", "name", "total_dois"))
+        self.assertEqual(
+            schema.column_types[:4],
+            ("String", "String", "Int64", "Float64"),
+        )
+        self.assertEqual(schema.duckdb_type("references_current"), "DOUBLE")
+        self.assertEqual(
+            CreativeWork.schema.date_columns,
+            ("deposited", "created"),
+        )
+        self.assertIs(CreativeWork.arrow_schema(), CreativeWork.schema.arrow)
+
+    def test_low_cardinality_columns(self):
+        """
+        The works' types and members should be stored once per distinct \
+            value, in ClickHouse as in Arrow, and only a string attribute \
+            be marked as such.
+        """
+        schema = CreativeWork.schema
+        self.assertEqual(schema.low_cardinality, ("work_type", "member"))
+        self.assertEqual(
+            schema.column_types[schema.columns.index("member")],
+            "LowCardinality(Nullable(String))",
+        )
+        member = schema.arrow.field("member")
+        self.assertTrue(pa.types.is_dictionary(member.type))
+        self.assertEqual(schema.duckdb_type("work_type"), "VARCHAR")
+        batch = CreativeWork.load_arrow(items=[ITEM1], has_refs=False)
+        dictionary = batch.column("member").dictionary
+        self.assertEqual(dictionary.to_pylist(), ["3884"])
+
+        with self.assertRaises(TypeError):
+
+            @dataclass
+            class Mislabelled(BaseModel):
+                low_cardinality = ("count",)
+
+                count: int
+
+    def test_slotted_model(self):
+        """
+        A model with slots should be described and serialized like the \
+            others, its rows having no instance dictionary.
+        """
+        row = SlottedModel(id="1", created=datetime(2024, 1, 2))
+        self.assertFalse(hasattr(row, "__dict__"))
+        self.assertEqual(
+            SlottedModel.schema.column_types,
+            ("String", "DateTime", "Nullable(Boolean)"),
+        )
+        self.assertEqual(
+            SlottedModel.schema.values(row),
+            ("1", datetime(2024, 1, 2), None),
+        )
+        self.assertEqual(SlottedModel.deserialize(row.serialize()), row)
+
 
 if __name__ == "__main__":
     unittest.main()
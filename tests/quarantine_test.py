@@ -0,0 +1,168 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pyarrow as pa
+from clickhouse_connect.driver.exceptions import OperationalError
+
+from src.api import quarantine as quarantine_module
+from src.api.cli.replay_quarantine import model_entry
+from src.api.database import insert_bisecting
+from src.api.models.work import CreativeWork
+from src.api.quarantine import InvalidItemException, Quarantine
+
+ITEM = {
+    "DOI": "10.5840/ancientphil201434222",
+    "member": "3884",
+    "deposited": {
+        "date-time": "2020-10-01T15:50:12Z",
+    },
+    "created": {
+        "date-time": "2019-10-01T16:59:28Z",
+    },
+    "type": "journal-article",
+    "references-count": 0,
+    "is-referenced-by-count": 2,
+}
+
+INVALID_ITEM = {"DOI": "10.1000/invalid", "created": {}}
+
+
+class QuarantineTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        self.patch = patch.object(
+            quarantine_module,
+            "QUARANTINE_DIR",
+            self.directory,
+        )
+        self.patch.start()
+        self.quarantine = Quarantine()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def test_append(self):
+        """
+        Entries added at different times should all be read back from the \
+            table's compressed file, in the order they were added.
+        """
+        self.quarantine.add("t", "insert", [{"a": 1}], error="first")
+        self.quarantine.add("t", "insert", [{"a": 2}, {"a": 3}], error="2nd")
+        entries = list(self.quarantine.read("t"))
+        self.assertListEqual([e["item"]["a"] for e in entries], [1, 2, 3])
+        self.assertEqual(entries[1]["error"], repr("2nd"))
+        self.assertTrue(self.quarantine.path("t").name.endswith(".gz"))
+
+    def test_drain(self):
+        """
+        Draining should keep the entries if the block using them raises, \
+            and empty the quarantine once a block completes.
+        """
+        self.quarantine.add("t", "insert", [{"a": 1}], error="e")
+        with self.assertRaises(RuntimeError):
+            with self.quarantine.drain("t") as entries:
+                next(entries)
+                raise RuntimeError
+        with self.quarantine.drain("t") as entries:
+            self.assertEqual(len(list(entries)), 1)
+        self.assertEqual(self.quarantine.count("t"), 0)
+        with self.quarantine.drain("t") as entries:
+            self.assertListEqual(list(entries), [])
+
+    def test_invalid_item(self):
+        """
+        An invalid work should be quarantined with the context needed to \
+            model it again, and skipped by the columnar parser.
+        """
+        with self.assertRaises(InvalidItemException):
+            CreativeWork.load_json(item=INVALID_ITEM, has_refs=True)
+        batch = CreativeWork.load_arrow(
+            items=[ITEM, INVALID_ITEM],
+            has_refs=True,
+        )
+        self.assertEqual(batch.column("doi").to_pylist(), [ITEM["DOI"]])
+
+        entries = list(self.quarantine.read("creativework"))
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]["stage"], "parse")
+        self.assertDictEqual(entries[0]["context"], {"has_refs": True})
+        self.assertIsNone(model_entry(table=CreativeWork, entry=entries[0]))
+
+    def test_wrong_typed_value(self):
+        """
+        A count of the wrong type should send the page down the per-item \
+            path, which quarantines the work instead of raising.
+        """
+        item = dict(ITEM, DOI="10.1000/typed")
+        item["is-referenced-by-count"] = "many"
+        batch = CreativeWork.load_arrow(items=[ITEM, item], has_refs=True)
+        self.assertEqual(batch.column("doi").to_pylist(), [ITEM["DOI"]])
+        entries = list(self.quarantine.read("creativework"))
+        self.assertEqual([e["item"]["DOI"] for e in entries], [item["DOI"]])
+
+    def test_replay_serialized_row(self):
+        """
+        A row quarantined at insertion should be modelled back as it was.
+        """
+        record = CreativeWork.load_json(item=ITEM, has_refs=False)
+        self.quarantine.add(
+            "creativework",
+            "insert",
+            [record.serialize()],
+            error="e",
+        )
+        entry = next(self.quarantine.read("creativework"))
+        self.assertEqual(model_entry(table=CreativeWork, entry=entry), record)
+
+
+class InsertBisectingTest(unittest.TestCase):
+    def insert(self, chunk):
+        rows = chunk.to_pylist() if isinstance(chunk, pa.Table) else chunk
+        if any(r["bad"] for r in rows):
+            raise ValueError("rejected")
+        self.inserted.extend(r["id"] for r in rows)
+
+    def reject(self, chunk, error):
+        rows = chunk.to_pylist() if isinstance(chunk, pa.Table) else chunk
+        self.rejected.extend(r["id"] for r in rows)
+
+    def setUp(self):
+        self.inserted, self.rejected = [], []
+        self.rows = [{"id": i, "bad": i in (3, 10)} for i in range(16)]
+
+    def test_isolates_rejected_rows(self):
+        """
+        The rows accepted should be inserted and each rejected row handed \
+            over on its own, whether the rows are records or a table.
+        """
+        for rows in (self.rows, pa.Table.from_pylist(self.rows)):
+            self.inserted, self.rejected = [], []
+            rejected = insert_bisecting(
+                rows=rows,
+                insert=self.insert,
+                reject=self.reject,
+            )
+            self.assertEqual(rejected, 2)
+            self.assertListEqual(self.rejected, [3, 10])
+            self.assertListEqual(
+                sorted(self.inserted),
+                [i for i in range(16) if i not in (3, 10)],
+            )
+
+    def test_connection_error(self):
+        """A connection error should be raised rather than bisected."""
+
+        def insert(chunk):
+            raise OperationalError("connection refused")
+
+        with self.assertRaises(OperationalError):
+            insert_bisecting(rows=self.rows, insert=insert, reject=self.reject)
+        self.assertListEqual(self.rejected, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
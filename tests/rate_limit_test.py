@@ -0,0 +1,116 @@
+import asyncio
+import time
+import unittest
+
+from src.api.client import AsyncClient
+from src.api.rate_limit import AdaptiveRateLimiter, parse_interval
+from stand_in_server import StandInServer
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_interval_parsing(self):
+        """
+        The API's interval header should be converted into seconds.
+        """
+        self.assertEqual(parse_interval("1s"), 1)
+        self.assertEqual(parse_interval("500ms"), 0.5)
+        self.assertEqual(parse_interval("2m"), 120)
+        self.assertIsNone(parse_interval("soon"))
+
+    def test_rate_is_tuned_from_headers(self):
+        """
+        The limiter should adopt the rate advertised by the API, less its \
+            headroom.
+        """
+        limiter = AdaptiveRateLimiter(rate=1)
+        headers = {"X-Rate-Limit-Limit": "50", "X-Rate-Limit-Interval": "1s"}
+        limiter.update(status=200, headers=headers)
+        self.assertAlmostEqual(limiter.rate, 45)
+
+    def test_additive_increase_multiplicative_decrease(self):
+        """
+        Healthy responses should grow the concurrency by about one per round \
+            trip, and a throttled response should halve it.
+        """
+        limiter = AdaptiveRateLimiter(concurrency=4, max_concurrency=10)
+        for _ in range(4):
+            limiter.update(status=200)
+        self.assertEqual(limiter.concurrency, 4)
+        for _ in range(4):
+            limiter.update(status=200)
+        self.assertEqual(limiter.concurrency, 5)
+        limiter.update(status=429)
+        self.assertEqual(limiter.concurrency, 2)
+        self.assertEqual(limiter.snapshot()["throttled"], 1)
+
+    def test_client_errors_leave_concurrency(self):
+        """
+        Responses to requests at fault, such as missing works, should \
+            neither grow nor cut the concurrency, nor count as successes.
+        """
+        limiter = AdaptiveRateLimiter(concurrency=4)
+        for _ in range(20):
+            limiter.update(status=404)
+        limiter.update(status=400)
+        self.assertEqual(limiter.concurrency, 4)
+        self.assertEqual(limiter.snapshot()["successes"], 0)
+        self.assertEqual(limiter.snapshot()["rejected"], 21)
+
+    def test_concurrency_stays_within_bounds(self):
+        """
+        The concurrency should never leave its floor and ceiling.
+        """
+        limiter = AdaptiveRateLimiter(concurrency=2, max_concurrency=3)
+        for _ in range(100):
+            limiter.update(status=200)
+        self.assertEqual(limiter.concurrency, 3)
+        for _ in range(10):
+            limiter._decreased_at = 0
+            limiter.update(status=None)
+        self.assertEqual(limiter.concurrency, 1)
+
+    def test_rising_latency_cuts_concurrency(self):
+        """
+        Responses that are much slower than usual should count as a sign of \
+            congestion and cut the concurrency.
+        """
+        limiter = AdaptiveRateLimiter(concurrency=8)
+        for _ in range(5):
+            limiter.update(status=200, latency=0.01)
+        before = limiter.concurrency
+        for _ in range(5):
+            limiter.update(status=200, latency=1.0)
+        self.assertLess(limiter.concurrency, before)
+
+
+class StandInRateLimitTest(unittest.TestCase):
+    def test_limiter_respects_server_limit(self):
+        """
+        Against a server that allows 20 requests per second, the limiter \
+            should adopt that rate and spread the requests out instead of \
+            being throttled, and the few throttled requests should be retried.
+        """
+        N = 40
+        limiter = AdaptiveRateLimiter(rate=100, concurrency=2)
+
+        async def collect(base_url):
+            async with AsyncClient(
+                base_url=base_url,
+                limiter=limiter,
+                backoff=0.1,
+            ) as c:
+                return [r async for r in c.get_samples(False, n=N)]
+
+        with StandInServer(latency=0.01, rate_limit=(20, 1.0)) as server:
+            start = time.monotonic()
+            samples = asyncio.run(collect(server.base_url))
+            elapsed = time.monotonic() - start
+
+        self.assertAlmostEqual(limiter.rate, 18)
+        self.assertLessEqual(server.rejected, 2)
+        self.assertEqual(len(samples), N)
+        self.assertGreater(elapsed, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
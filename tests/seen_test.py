@@ -0,0 +1,46 @@
+import unittest
+
+from src.api.seen import SeenSet
+
+
+class SeenSetTest(unittest.TestCase):
+    def test_add_reports_new_dois(self):
+        """
+        Adding a DOI should report whether it was new, regardless of case.
+        """
+        seen = SeenSet()
+        self.assertTrue(seen.add("10.1021/ac00002a012"))
+        self.assertFalse(seen.add("10.1021/AC00002A012"))
+        self.assertIn("10.1021/ac00002a012", seen)
+        self.assertNotIn("10.1123/att.5.5.39", seen)
+        self.assertEqual(len(seen), 1)
+
+    def test_pending_hashes_are_merged(self):
+        """
+        Once the pending hashes reach the threshold, they should be merged \
+            into the sorted array without losing any DOI.
+        """
+        seen = SeenSet(merge_threshold=10)
+        dois = [f"10.0000/{i}" for i in range(25)]
+        for doi in dois:
+            seen.add(doi)
+        self.assertEqual(len(seen.hashes), 20)
+        self.assertEqual(len(seen), 25)
+        self.assertListEqual(list(seen.hashes), sorted(seen.hashes))
+        self.assertTrue(all(doi in seen for doi in dois))
+        self.assertFalse(any(seen.add(doi) for doi in dois))
+
+    def test_seeding_drops_duplicates(self):
+        """
+        Seeding the set with a table's DOIs should count each DOI once, \
+            even when the table or the pending set hold duplicates.
+        """
+        seen = SeenSet()
+        seen.add("10.0000/1")
+        seen.update(["10.0000/1", "10.0000/2", "10.0000/2", "10.0000/3"])
+        self.assertEqual(len(seen), 3)
+        self.assertFalse(seen.add("10.0000/3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Local stand-in for the Crossref API, used by the tests and the benchmarks so \
+    that the clients can be exercised without calling the real API.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+with open(Path(__file__).parent.joinpath("member_result.json")) as f:
+    MEMBER = json.load(f)
+
+
+def make_item(i: int) -> dict:
+    """Compose a work's selected metadata, as returned by the API."""
+
+    return {
+        "DOI": f"10.0000/stand-in.{i}",
+        "member": str(3884 + i % 50),
+        "deposited": {"date-time": "2020-10-01T15:50:12Z"},
+        "created": {"date-time": "2019-10-01T16:59:28Z"},
+        "type": "journal-article",
+        "references-count": i % 7,
+        "is-referenced-by-count": i % 11,
+    }
+
+
+class Server(ThreadingHTTPServer):
+    # Accept bursts of hundreds of simultaneous connections
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StandInServer:
+    """
+    Threaded HTTP server that answers the works and members endpoints with \
+        canned payloads. It supports HTTP/1.1 keep-alive, an artificial \
+        latency per request, and it records the highest number of requests \
+        that were in flight at the same time. When given a rate limit, it \
+        advertises it in the same headers as the API and answers 429 to the \
+        requests that exceed it. When given faults, the first requests are \
+        answered with those statuses, or their connection is dropped.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        total_works: int = 2500,
+        total_members: int = 250,
+        rate_limit: tuple[int, float] | None = None,
+        faults: list[int | str] | None = None,
+    ) -> None:
+        self.latency = latency
+        self.total_works = total_works
+        self.total_members = total_members
+        self.rate_limit = rate_limit
+        self.faults = deque(faults or [])
+        self.rejected = 0
+        self._accepted = deque()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.httpd = Server(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            daemon=True,
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def works_payload(self, query: dict) -> dict:
+        if "cursor" in query:
+            return self.cursor_payload(query)
+        with self._lock:
+            start = self._counter
+            self._counter += 100
+        items = [make_item(i) for i in range(start, start + 100)]
+        return {"status": "ok", "message": {"items": items}}
+
+    def cursor_payload(self, query: dict) -> dict:
+        # The stand-in's cursor is simply the offset of the next page
+        cursor = query["cursor"][0]
+        offset = 0 if cursor == "*" else int(cursor)
+        rows = int(query["rows"][0])
+        stop = min(offset + rows, self.total_works)
+        message = {
+            "total-results": self.total_works,
+            "next-cursor": str(stop),
+            "items": [make_item(i) for i in range(offset, stop)],
+        }
+        return {"status": "ok", "message": message}
+
+    def member_payload(self, id: str) -> dict:
+        message = dict(MEMBER["message"], id=int(id))
+        return {"status": "ok", "message": message}
+
+    def members_list_payload(self, query: dict) -> dict:
+        offset = int(query.get("offset", ["0"])[0])
+        rows = int(query["rows"][0])
+        stop = min(offset + rows, self.total_members)
+        items = [dict(MEMBER["message"], id=3884 + i) for i in range(offset, stop)]
+        message = {"total-results": self.total_members, "items": items}
+        return {"status": "ok", "message": message}
+
+    def throttle(self) -> tuple[bool, dict]:
+        """Decide whether a request exceeds the rate limit."""
+
+        if self.rate_limit is None:
+            return False, {}
+        limit, interval = self.rate_limit
+        headers = {
+            "X-Rate-Limit-Limit": str(limit),
+            "X-Rate-Limit-Interval": f"{interval:g}s",
+        }
+        now = time.monotonic()
+        with self._lock:
+            while self._accepted and now - self._accepted[0] >= interval:
+                self._accepted.popleft()
+            if len(self._accepted) >= limit:
+                self.rejected += 1
+                return True, headers
+            self._accepted.append(now)
+        return False, headers
+
+    def respond(
+        self,
+        path: str,
+        query: dict,
+    ) -> tuple[int | str, dict, dict]:
+        """Return the status, extra headers and JSON body for a request."""
+
+        with self._lock:
+            fault = self.faults.popleft() if self.faults else None
+        if fault is not None:
+            return fault, {}, {"status": "error"}
+        throttled, headers = self.throttle()
+        if throttled:
+            return 429, headers, {"status": "error"}
+        if path == "/works":
+            return 200, headers, self.works_payload(query)
+        if path == "/members":
+            return 200, headers, self.members_list_payload(query)
+        if path.startswith("/members/"):
+            member_id = path.rsplit("/", 1)[-1]
+            return 200, headers, self.member_payload(member_id)
+        return 404, headers, {"status": "error"}
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self) -> None:
+                with server._lock:
+                    server.requests += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(
+                        server.max_in_flight,
+                        server.in_flight,
+                    )
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    url = urlsplit(self.path)
+                    query = parse_qs(url.query)
+                    status, headers, payload = server.respond(url.path, query)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+                if status == "drop":
+                    self.close_connection = True
+                    return
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
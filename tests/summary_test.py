@@ -0,0 +1,81 @@
+import statistics
+import unittest
+
+from src.api.cli.summarize_works import (
+    SUMMARY_VIEWS,
+    Moments,
+    citation_moments,
+    point_biserial,
+)
+from src.api.models.work import CreativeWork
+
+WITHOUT = [0, 2, 2, 5, 1]
+WITH = [3, 8, 4, 10, 12, 7]
+
+
+def moments(values: list[int]) -> Moments:
+    return Moments(
+        n=len(values),
+        total=sum(values),
+        squares=sum(v * v for v in values),
+    )
+
+
+class MomentsTest(unittest.TestCase):
+    def test_mean_and_variance(self):
+        """
+        The mean and variance derived from the sums should match those of \
+            the values, including after two groups are added together.
+        """
+        m = moments(WITHOUT) + moments(WITH)
+        self.assertAlmostEqual(m.mean, statistics.mean(WITHOUT + WITH))
+        self.assertAlmostEqual(
+            m.pvariance,
+            statistics.pvariance(WITHOUT + WITH),
+        )
+        self.assertIsNone(Moments().mean)
+
+    def test_point_biserial(self):
+        """
+        The point-biserial correlation should equal Pearson's correlation \
+            of the group coded 0 or 1 and the values.
+        """
+        groups = [0] * len(WITHOUT) + [1] * len(WITH)
+        expected = statistics.correlation(groups, WITHOUT + WITH)
+        actual = point_biserial(moments(WITHOUT), moments(WITH))
+        self.assertAlmostEqual(actual, expected)
+        self.assertIsNone(point_biserial(moments(WITHOUT), Moments()))
+
+    def test_summary_row(self):
+        """
+        The incoming citations of a summary row should be averaged over the \
+            works whose count is known.
+        """
+        row = {
+            "works": 3,
+            "citations_incoming_works": 2,
+            "citations_incoming_sum": 6,
+            "citations_incoming_sumsq": 20,
+            "citations_outgoing_sum": 3,
+            "citations_outgoing_sumsq": 5,
+        }
+        incoming, outgoing = citation_moments(row)
+        self.assertEqual(incoming.mean, 3)
+        self.assertEqual(outgoing.mean, 1)
+
+    def test_summary_views(self):
+        """
+        The works should declare summing views of their breakdowns, which \
+            are written from the works table and read by the summary.
+        """
+        views = {v.name: v for v in CreativeWork.materialized_views}
+        self.assertLessEqual(set(SUMMARY_VIEWS), set(views))
+        self.assertEqual(views["worksummary"].engine, "SummingMergeTree")
+        self.assertEqual(views["workdelay"].engine, "SummingMergeTree")
+        stmt = views["workdelay"].create_view_statement(source="creativework")
+        self.assertIn("workdelay_mv TO workdelay", stmt)
+        self.assertIn("FROM creativework", stmt)
+
+
+if __name__ == "__main__":
+    unittest.main()
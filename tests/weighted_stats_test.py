@@ -0,0 +1,73 @@
+import json
+import statistics
+import unittest
+from pathlib import Path
+
+from src.api.weighted_stats import (
+    weighted_geometric_mean,
+    weighted_mean,
+    weighted_pvariance,
+    weighted_quantile,
+)
+
+with open(Path(__file__).parent.joinpath("member_result.json")) as f:
+    MEMBER = json.load(f)
+
+YEAR_COUNTS = MEMBER["message"]["breakdowns"]["dois-by-issued-year"]
+
+
+def expand(histogram: list) -> list:
+    data = []
+    for value, count in histogram:
+        data.extend([value] * count)
+    return data
+
+
+class WeightedStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.years = expand(YEAR_COUNTS)
+
+    def test_moments(self):
+        """
+        The statistics of a member's histogram of years should match those \
+            of the years expanded one per DOI.
+        """
+        self.assertAlmostEqual(
+            weighted_mean(YEAR_COUNTS),
+            statistics.mean(self.years),
+        )
+        self.assertAlmostEqual(
+            weighted_pvariance(YEAR_COUNTS),
+            statistics.pvariance(self.years),
+        )
+        self.assertAlmostEqual(
+            weighted_geometric_mean(YEAR_COUNTS),
+            statistics.geometric_mean(self.years),
+        )
+
+    def test_quantiles(self):
+        """
+        The median should be the low median of the data, and the extreme \
+            quantiles its smallest and largest values.
+        """
+        self.assertEqual(
+            weighted_quantile(YEAR_COUNTS, 0.5),
+            statistics.median_low(self.years),
+        )
+        self.assertEqual(weighted_quantile(YEAR_COUNTS, 0), min(self.years))
+        self.assertEqual(weighted_quantile(YEAR_COUNTS, 1), max(self.years))
+        self.assertEqual(weighted_quantile([(1, 1), (2, 1)], 0.5), 1)
+        self.assertEqual(weighted_quantile([(1, 1), (2, 2)], 0.5), 2)
+
+    def test_empty(self):
+        """Zero counts should be ignored, and no data be an error."""
+
+        self.assertEqual(weighted_mean([(1, 2), (100, 0)]), 1)
+        with self.assertRaises(statistics.StatisticsError):
+            weighted_pvariance([(2020, 0)])
+        with self.assertRaises(statistics.StatisticsError):
+            weighted_geometric_mean([(0, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()